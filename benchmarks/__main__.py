@@ -0,0 +1,55 @@
+"""Run the benchmark suite: python -m benchmarks [--filter PATTERN] [--repeat N] [--output PATH] [--compare PATH]."""
+
+import argparse
+import importlib
+import json
+import pkgutil
+import sys
+from pathlib import Path
+
+import benchmarks
+
+from .harness import compare, run
+
+
+def main() -> int:
+    """Run the benchmarks, write their results as JSON and report the regressions against a baseline if provided."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the OpenHEXA SDK benchmarks.")
+    parser.add_argument("-k", "--filter", help="Only run the cases whose identifier matches this regular expression")
+    parser.add_argument("-r", "--repeat", type=int, help="Override the number of timed runs of each case")
+    parser.add_argument("-o", "--output", type=Path, help="Results file (default: benchmarks/results/<date>.json)")
+    parser.add_argument("-c", "--compare", type=Path, help="Results file to compare the results with")
+    parser.add_argument(
+        "--threshold", type=float, default=1.2, help="Slowdown ratio reported as a regression (default: 1.2)"
+    )
+    args = parser.parse_args()
+
+    for module in pkgutil.iter_modules(benchmarks.__path__):
+        if module.name.startswith("bench_"):
+            importlib.import_module(f"benchmarks.{module.name}")
+
+    def report(result: dict):
+        throughput = f"  {result['throughput'] / 1024**2:10.1f} MiB/s" if result.get("throughput") else ""
+        print(f"{result['id']:<70} {result['median'] * 1000:10.2f} ms ± {result['stdev'] * 1000:.2f}{throughput}")
+
+    results = run(args.filter, args.repeat, on_result=report)
+    output = (
+        args.output
+        or Path(__file__).parent / "results" / f"{results['environment']['date'][:19].replace(':', '-')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare is not None:
+        regressions = compare(json.loads(args.compare.read_text()), results, args.threshold)
+        for case_id, ratio in regressions:
+            print(f"Regression: {case_id} is {ratio:.2f}x slower than in {args.compare}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Throughput of dataset file uploads and downloads, against a local storage server."""
+
+import io
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from openhexa.sdk.datasets.dataset import DatasetFile
+from openhexa.sdk.datasets.upload import upload
+from openhexa.sdk.datasets.url_cache import download_urls
+
+from .harness import Timer, benchmark
+from .servers import storage_server
+
+MiB = 1024 * 1024
+
+
+def stored_file(url: str, objects: dict, size: int) -> DatasetFile:
+    """Store a random file of the provided size, and return a dataset file whose download URL points to it."""
+    objects["/data.bin"] = os.urandom(size)
+    file = DatasetFile(version=None, id="file-id", uri="data.bin", filename="data.bin", content_type="", created_at="")
+    download_urls.set(file.id, f"{url}/data.bin")
+
+    return file
+
+
+@benchmark(params={"size": [10 * MiB, 100 * MiB]}, repeat=3)
+def upload_file(timer: Timer, size: int):
+    """Stream a file to its upload URL."""
+    content = os.urandom(size)
+    with storage_server() as (url, objects):
+        timer.size = size
+        with timer:
+            upload(f"{url}/data.bin", io.BytesIO(content), "application/octet-stream")
+    assert len(objects["/data.bin"]) == size
+
+
+@benchmark(params={"size": [10 * MiB, 100 * MiB], "max_concurrency": [1, 8]}, repeat=3)
+def download_file(timer: Timer, size: int, max_concurrency: int):
+    """Download a file to disk, by several ranged requests when max_concurrency > 1."""
+    with storage_server() as (url, objects), tempfile.TemporaryDirectory() as directory:
+        file = stored_file(url, objects, size)
+        # Files are downloaded in parallel above the threshold
+        with patch("openhexa.sdk.datasets.download.PARALLEL_THRESHOLD", 8 * MiB):
+            timer.size = size
+            with timer:
+                path = file.download_to(Path(directory) / "data.bin", max_concurrency=max_concurrency)
+        assert path.stat().st_size == size
+
+
+@benchmark(params={"size": [10 * MiB, 100 * MiB]}, repeat=3)
+def iter_chunks(timer: Timer, size: int):
+    """Iterate over the content of a file by chunks."""
+    with storage_server() as (url, objects):
+        file = stored_file(url, objects, size)
+        timer.size = size
+        with timer:
+            received = sum(len(chunk) for chunk in file.iter_chunks())
+    assert received == size
@@ -0,0 +1,32 @@
+"""Iteration over paginated API results (Iterator), against a local GraphQL server with a simulated latency."""
+
+from openhexa.sdk.datasets.dataset import DatasetVersion
+
+from .harness import Timer, benchmark
+from .servers import graphql_server
+
+PER_PAGE = 50
+
+
+def files_resolver(pages: int):
+    """Return a resolver answering requests for the files of a version with the provided number of pages."""
+
+    def resolve(query: str, variables: dict) -> dict:
+        page = variables["page"]
+        items = [
+            {"id": f"{page}-{i}", "uri": "", "filename": f"{i}.csv", "contentType": "text/csv", "createdAt": ""}
+            for i in range(variables["perPage"])
+        ]
+        return {"datasetVersion": {"files": {"items": items, "totalPages": pages}}}
+
+    return resolve
+
+
+@benchmark(params={"pages": [10, 100], "latency_ms": [0, 20], "max_concurrency": [1, 4]}, repeat=3)
+def version_files(timer: Timer, pages: int, latency_ms: int, max_concurrency: int):
+    """Iterate over all the files of a dataset version."""
+    version = DatasetVersion(dataset=None, id="version-id", name="v1", created_at="")
+    with graphql_server(files_resolver(pages), latency=latency_ms / 1000):
+        with timer:
+            files = list(version.list_files(per_page=PER_PAGE, max_concurrency=max_concurrency))
+    assert len(files) == pages * PER_PAGE
@@ -0,0 +1,44 @@
+"""Parsing of pipeline files by runtime.get_pipeline(), used by the CLI and the OpenHEXA backend."""
+
+import tempfile
+from pathlib import Path
+
+from openhexa.sdk.pipelines.runtime import get_pipeline
+
+from .harness import Timer, benchmark
+
+
+def write_pipeline_file(directory: Path, parameters: int, tasks: int):
+    """Write a pipeline file with the provided number of parameters and tasks (and some unrelated code)."""
+    lines = ["from openhexa.sdk import parameter, pipeline", ""]
+    for i in range(parameters):
+        lines.append(f'@parameter("param_{i}", name="Parameter {i}", type=int, default={i}, help="Help {i}")')
+    lines.append('@pipeline("Large pipeline", timeout=3600)')
+    lines.append(f"def large_pipeline({', '.join(f'param_{i}' for i in range(parameters))}):")
+    lines.extend(f"    task_{i}()" for i in range(tasks))
+    lines.append("")
+    for i in range(tasks):
+        lines.extend(
+            [
+                "",
+                "@large_pipeline.task(retries=2, timeout=60)",
+                f"def task_{i}():",
+                f'    """Task {i}."""',
+                f"    values = [value * {i} for value in range(100)]",
+                "    return sum(values)",
+                "",
+            ]
+        )
+    (directory / "pipeline.py").write_text("\n".join(lines))
+
+
+@benchmark(params={"parameters": [10, 100], "tasks": [10, 1000], "cached": [False, True]}, repeat=5)
+def parse_pipeline(timer: Timer, parameters: int, tasks: int, cached: bool):
+    """Parse the pipeline file of a directory, or read its spec from the cache of a previous parse."""
+    with tempfile.TemporaryDirectory() as directory:
+        write_pipeline_file(Path(directory), parameters, tasks)
+        if cached:
+            get_pipeline(Path(directory))
+        with timer:
+            pipeline = get_pipeline(Path(directory))
+        assert len(pipeline.parameters) == parameters
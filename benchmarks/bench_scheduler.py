@@ -0,0 +1,57 @@
+"""Scheduling overhead of the task scheduler, for task graphs of several shapes and sizes."""
+
+from openhexa.sdk.pipelines.executor import PoolGroup
+from openhexa.sdk.pipelines.pipeline import Pipeline
+
+from .harness import Timer, benchmark
+
+
+def source() -> int:
+    """Return 1."""
+    return 1
+
+
+def step(*values: int) -> int:
+    """Return the sum of the values of the upstream tasks."""
+    return sum(values)
+
+
+def build_pipeline(shape: str, tasks: int) -> Pipeline:
+    """Build a pipeline of no-op tasks.
+
+    - wide: independent tasks
+    - deep: a chain of tasks, each depending on the previous one
+    - diamond: a source task, fanned out to intermediate tasks, joined by a final task
+    """
+
+    def pipeline_function():
+        if shape == "wide":
+            for _ in range(tasks):
+                source_task()
+        elif shape == "deep":
+            task = source_task()
+            for _ in range(tasks - 1):
+                task = step_task(task)
+        elif shape == "diamond":
+            root = source_task()
+            step_task(*[step_task(root) for _ in range(tasks - 2)])
+
+    pipeline = Pipeline(f"{shape}-{tasks}", pipeline_function, [])
+    source_task = pipeline.task(source)
+    step_task = pipeline.task(step)
+    pipeline.function()
+
+    return pipeline
+
+
+@benchmark(
+    params={"executor": ["thread", "process"], "shape": ["wide", "deep", "diamond"], "tasks": [10, 100, 1000]},
+    repeat=3,
+)
+def execute_tasks(timer: Timer, executor: str, shape: str, tasks: int):
+    """Run all the tasks of a pipeline, in pools started beforehand."""
+    pipeline = build_pipeline(shape, tasks)
+    with PoolGroup(executor, max_workers=4) as pools:
+        pools.get()  # start the workers before timing
+        with timer:
+            pipeline._execute_tasks(pools)
@@ -0,0 +1,30 @@
+"""Transfer of task results from worker processes, through the pool pipes or through spill files."""
+
+import tempfile
+
+from openhexa.sdk.pipelines.executor import PoolGroup
+from openhexa.sdk.pipelines.task import TaskWorkItem
+from openhexa.sdk.pipelines.transport import ResultTransport, load_result
+
+from .harness import Timer, benchmark
+
+MiB = 1024 * 1024
+
+
+def make_payload(size: int) -> bytes:
+    """Return a payload of the provided size."""
+    return bytes(size)
+
+
+@benchmark(params={"size": [1 * MiB, 100 * MiB], "transport": ["pipe", "spill"]}, repeat=5)
+def task_result(timer: Timer, size: int, transport: str):
+    """Run a task in a worker process, and load its result in the main process."""
+    with tempfile.TemporaryDirectory() as directory, PoolGroup("process", max_workers=1) as pools:
+        pool = pools.get()
+        # Results larger than the threshold are spilled to disk instead of being pickled through the pool pipes
+        result_transport = ResultTransport(directory, threshold=0 if transport == "spill" else size + 1)
+        work_item = TaskWorkItem("make_payload", make_payload, [size], {}, transport=result_transport)
+        timer.size = size
+        with timer:
+            result = load_result(pool.apply(work_item.run).result)
+        assert len(result) == size
@@ -0,0 +1,37 @@
+"""Packaging of pipeline directories by generate_zip_file(), when pushing or running pipelines."""
+
+import tempfile
+from pathlib import Path
+
+from openhexa.cli.api import generate_zip_file
+
+from .harness import Timer, benchmark
+
+
+def write_repository(directory: Path, files: int):
+    """Write a pipeline directory with source files in nested packages, data files and a virtual environment."""
+    (directory / "pipeline.py").write_text("from openhexa.sdk import pipeline\n")
+    for i in range(files):
+        package = directory / "src" / f"package_{i % 20}" / f"module_{i % 7}"
+        package.mkdir(parents=True, exist_ok=True)
+        (package / f"file_{i}.py").write_text(f"VALUE = {i}\n" * 50)
+    data = directory / "data"
+    data.mkdir()
+    for i in range(files // 10):
+        (data / f"data_{i}.csv").write_bytes(b"a,b\n" + b"1,2\n" * 1000)
+    site_packages = directory / ".venv" / "lib" / "site-packages"
+    site_packages.mkdir(parents=True)
+    (directory / ".venv" / "bin").mkdir()
+    (directory / ".venv" / "bin" / "python").write_text("")
+    for i in range(files):
+        (site_packages / f"dependency_{i}.py").write_text("")
+
+
+@benchmark(params={"files": [100, 10_000]}, repeat=3)
+def generate_zip(timer: Timer, files: int):
+    """Generate the ZIP file of a pipeline directory."""
+    with tempfile.TemporaryDirectory() as directory:
+        write_repository(Path(directory), files)
+        with timer:
+            zip_file = generate_zip_file(Path(directory))
+        timer.size = len(zip_file.getbuffer())
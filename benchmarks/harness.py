@@ -0,0 +1,175 @@
+"""Minimal benchmark harness.
+
+Benchmarks are functions decorated with @benchmark, receiving a Timer and one value of each of their parameters. The
+setup code of a benchmark runs outside of the timed section, which is delimited by ``with timer:`` (exactly once per
+call). Each combination of parameters is run ``warmup + repeat`` times, and the statistics of the timed sections are
+returned (and written) as JSON, so that results can be compared across releases (see compare()).
+"""
+
+import contextlib
+import datetime
+import itertools
+import os
+import platform
+import re
+import statistics
+import subprocess
+import time
+import typing
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+BENCHMARKS = []
+
+
+class Timer:
+    """Time the sections of a benchmark run in its context, and record the size of the processed data if any."""
+
+    def __init__(self):
+        self.times = []
+        self.size = None
+        """int: The number of bytes processed by the timed section, used to compute the throughput."""
+        self._start = None
+
+    def __enter__(self) -> "Timer":
+        """Start timing."""
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop timing, and record the elapsed time."""
+        self.times.append(time.perf_counter() - self._start)
+
+
+class Benchmark:
+    """A benchmark function, with the values of its parameters (all their combinations are run)."""
+
+    def __init__(
+        self, function: typing.Callable, params: dict[str, list[typing.Any]], repeat: int = 5, warmup: int = 1
+    ):
+        self.function = function
+        self.name = f"{function.__module__.rpartition('.')[2].removeprefix('bench_')}.{function.__name__}"
+        self.params = params
+        self.repeat = repeat
+        self.warmup = warmup
+
+    def cases(self) -> list[dict[str, typing.Any]]:
+        """Return all the combinations of parameter values."""
+        return [dict(zip(self.params, values)) for values in itertools.product(*self.params.values())]
+
+    def run(self, params: dict[str, typing.Any], repeat: int | None = None) -> dict[str, typing.Any]:
+        """Run the benchmark with the provided parameter values, and return the statistics of its timed sections."""
+        timer = Timer()
+        repeat = repeat or self.repeat
+        # The output of the code under benchmark (task logs for instance) is discarded
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for i in range(self.warmup + repeat):
+                self.function(timer, **params)
+                if len(timer.times) != i + 1:
+                    raise RuntimeError(f"Benchmark {self.name} must time exactly one section per call (with timer:)")
+
+        times = timer.times[self.warmup :]
+        median = statistics.median(times)
+        result = {
+            "name": self.name,
+            "params": params,
+            "id": get_case_id(self.name, params),
+            "times": times,
+            "min": min(times),
+            "median": median,
+            "mean": statistics.mean(times),
+            "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        }
+        if timer.size is not None:
+            result["bytes"] = timer.size
+            result["throughput"] = timer.size / median if median > 0 else None
+
+        return result
+
+
+def benchmark(
+    params: dict[str, list[typing.Any]] | None = None, repeat: int = 5, warmup: int = 1
+) -> typing.Callable[[typing.Callable], typing.Callable]:
+    """Register the decorated function as a benchmark, run for each combination of the parameter values."""
+
+    def decorator(function: typing.Callable) -> typing.Callable:
+        BENCHMARKS.append(Benchmark(function, params or {}, repeat=repeat, warmup=warmup))
+        return function
+
+    return decorator
+
+
+def get_case_id(name: str, params: dict[str, typing.Any]) -> str:
+    """Return the identifier of a benchmark case, such as "scheduler.execute_tasks[shape=wide,tasks=10]"."""
+    if not params:
+        return name
+
+    return f"{name}[{','.join(f'{key}={value}' for key, value in params.items())}]"
+
+
+def get_environment() -> dict[str, typing.Any]:
+    """Return the description of the environment the benchmarks run in."""
+    try:
+        sdk_version = version("openhexa.sdk")
+    except PackageNotFoundError:
+        sdk_version = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "sdk_version": sdk_version,
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "date": datetime.datetime.now(datetime.UTC).isoformat(),
+    }
+
+
+def run(
+    pattern: str | None = None,
+    repeat: int | None = None,
+    on_result: typing.Callable[[dict[str, typing.Any]], None] | None = None,
+) -> dict[str, typing.Any]:
+    """Run the registered benchmarks whose case identifier matches the pattern (a regular expression).
+
+    Returns
+    -------
+    dict
+        The environment and the results of each case.
+    """
+    results = []
+    for bench in BENCHMARKS:
+        for params in bench.cases():
+            if pattern is not None and not re.search(pattern, get_case_id(bench.name, params)):
+                continue
+            result = bench.run(params, repeat)
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    return {"environment": get_environment(), "results": results}
+
+
+def compare(
+    baseline: dict[str, typing.Any], current: dict[str, typing.Any], threshold: float = 1.2
+) -> list[tuple[str, float]]:
+    """Return the cases of the current results whose median time is more than threshold times the baseline one.
+
+    Returns
+    -------
+    list[tuple[str, float]]
+        The identifier of each regressed case, with the ratio between the current and baseline medians.
+    """
+    baseline_medians = {result["id"]: result["median"] for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        reference = baseline_medians.get(result["id"])
+        if reference and result["median"] / reference > threshold:
+            regressions.append((result["id"], result["median"] / reference))
+
+    return regressions
@@ -0,0 +1,95 @@
+"""Local stand-ins of the OpenHEXA GraphQL API and of the object storage, served over HTTP on localhost."""
+
+import json
+import os
+import re
+import threading
+import time
+import typing
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and bodies are written separately: without this, small responses wait for delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: dict[str, str] | None = None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+
+@contextmanager
+def serve(handler_class: type[BaseHTTPRequestHandler]) -> typing.Iterator[str]:
+    """Serve the handler on a free port of localhost in a background thread, and return the URL of the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def graphql_server(resolve: typing.Callable[[str, dict], dict], latency: float = 0) -> typing.Iterator[str]:
+    """Serve a GraphQL API answering each request with resolve(query, variables), after latency seconds.
+
+    The SDK is configured to use the server (HEXA_SERVER_URL and HEXA_TOKEN) while in the context.
+    """
+
+    class GraphQLHandler(_Handler):
+        def do_POST(self):
+            request = json.loads(self._read_body())
+            time.sleep(latency)
+            data = resolve(request["query"], request.get("variables") or {})
+            self._send(200, json.dumps({"data": data}).encode(), {"Content-Type": "application/json"})
+
+    with serve(GraphQLHandler) as url:
+        with patch.dict(os.environ, {"HEXA_SERVER_URL": url, "HEXA_TOKEN": "token"}):
+            yield url
+
+
+@contextmanager
+def storage_server() -> typing.Iterator[tuple[str, dict[str, bytes]]]:
+    """Serve an in-memory object storage, storing PUT objects and serving them to GET (and range) requests.
+
+    Returns the URL of the server and the stored objects, by path.
+    """
+    objects = {}
+
+    class StorageHandler(_Handler):
+        def do_PUT(self):
+            objects[self.path] = self._read_body()
+            self._send(200)
+
+        def do_GET(self):
+            content = objects.get(self.path)
+            if content is None:
+                self._send(404)
+                return
+            requested = self.headers.get("Range")
+            if requested is None:
+                self._send(200, content)
+                return
+            start, end = re.match(r"bytes=(\d+)-(\d*)", requested).groups()
+            start, end = int(start), min(int(end or len(content) - 1), len(content) - 1)
+            headers = {"Content-Range": f"bytes {start}-{end}/{len(content)}"}
+            self._send(206, content[start : end + 1], headers)
+
+    with serve(StorageHandler) as url:
+        yield url, objects
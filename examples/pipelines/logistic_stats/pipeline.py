@@ -36,7 +36,7 @@ def logistic_stats(deg: str, periods: str, oul: int):
     model(dhis2_data, gadm_data, worldpop_data)
 
 
-@logistic_stats.task
+@logistic_stats.task(executor="thread")
 def dhis2_download(data_element_group: str, periods: str, org_unit_level: int) -> dict[str, typing.Any]:
     """Download DHIS2 data."""
     connection = workspace.dhis2_connection("dhis2-play")
@@ -63,7 +63,7 @@ def dhis2_download(data_element_group: str, periods: str, org_unit_level: int) -
     return json.loads(analytics_response.text)
 
 
-@logistic_stats.task
+@logistic_stats.task(executor="thread")
 def gadm_download():
     """Download administrative boundaries data from UCDavis."""
     url = "https://geodata.ucdavis.edu/gadm/gadm4.1/gpkg/gadm41_SLE.gpkg"
@@ -72,7 +72,7 @@ def gadm_download():
     return r.content
 
 
-@logistic_stats.task
+@logistic_stats.task(executor="thread")
 def worldpop_download():
     """Download population data from worldpop.org."""
     base_url = "https://data.worldpop.org/"
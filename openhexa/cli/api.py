@@ -23,12 +23,16 @@ from graphql import build_client_schema, build_schema, get_introspection_query
 from graphql.utilities import find_breaking_changes
 from jinja2 import Template
 
+from openhexa.cli.packaging import collect_files, get_manifest, get_manifest_digest, write_zip
 from openhexa.cli.settings import settings
 from openhexa.graphql import BUNDLED_SCHEMA_PATH, BaseOpenHexaClient
 from openhexa.sdk.pipelines import get_local_workspace_config
 from openhexa.sdk.pipelines.runtime import get_pipeline
 from openhexa.utils import create_requests_session, stringcase
 
+# Versions pushed from a pipeline directory, relative to the pipeline directory
+PUSHED_VERSIONS_FILE = Path(".openhexa") / "pushed_versions.json"
+
 
 def handle_ssl_error(e):
     """Handle SSL certificate verification errors with helpful message."""
@@ -315,7 +319,7 @@ def _build_pipeline_version_input(
         "name": name,
         "description": description,
         "externalLink": external_link,
-        "zipfile": base64.b64encode(zip_file.read()).decode("ascii"),
+        "zipfile": base64.b64encode(zip_file.getbuffer()).decode("ascii"),
         "parameters": [p.to_dict() for p in pipeline.parameters],
         "timeout": pipeline.timeout,
     }
@@ -480,8 +484,19 @@ def ensure_is_pipeline_dir(pipeline_path: str):
     return True
 
 
-def run_pipeline(path: Path, config: dict, image: str = None, debug: bool = False) -> Container:
-    """Run a pipeline using the provided configuration."""
+def run_pipeline(
+    path: Path,
+    config: dict,
+    image: str = None,
+    debug: bool = False,
+    profile: str = None,
+    profile_path: Path = None,
+) -> Container:
+    """Run a pipeline using the provided configuration.
+
+    If a profiling mode is provided ("cpu" or "memory", see openhexa.sdk.pipelines.code_profile), the pipeline code is
+    profiled, and the profiles are written to profile_path (mounted in the container).
+    """
     ensure_is_pipeline_dir(path)
     ensure_pipeline_config_exists(path)
     env_vars = get_local_workspace_config(path)
@@ -518,6 +533,9 @@ def run_pipeline(path: Path, config: dict, image: str = None, debug: bool = Fals
         "REMOTE_DEBUGGER": "true" if debug else None,
         **env_vars,
     }
+    if profile is not None:
+        volumes[str(Path(profile_path).absolute())] = {"bind": "/home/hexa/profiles", "mode": "rw"}
+        environment.update({"HEXA_PROFILE": profile, "HEXA_PROFILE_PATH": "/home/hexa/profiles"})
 
     command = f"pipeline run --config {base64.b64encode(json.dumps(config).encode('utf-8')).decode('utf-8')}"
     try:
@@ -633,21 +651,8 @@ def create_pipeline_structure(pipeline_name: str, base_path: Path, workspace: st
     return output_directory
 
 
-def generate_zip_file(pipeline_directory_path: str | Path) -> io.BytesIO:
-    """Generate a ZIP file containing the pipeline code.
-
-    Args:
-        pipeline_directory_path (str | Path): The path to the pipeline directory.
-
-    Returns
-    -------
-        io.BytesIO: A BytesIO object containing the ZIP file.
-    """
-    if settings.debug:
-        click.echo("Generating ZIP file:")
-    zip_file = io.BytesIO(b"")
-    files = []
-
+def _get_excluded_paths(pipeline_directory_path: Path) -> list[Path]:
+    """Return the directories of the pipeline directory that must not be packaged."""
     # We exclude the workspace directory since it can break the mount of the bucket on /home/hexa/workspace
     # This is also the default value of the WORKSPACE_FILES_PATH env var
     excluded_paths = [pipeline_directory_path / "workspace"]
@@ -658,35 +663,88 @@ def generate_zip_file(pipeline_directory_path: str | Path) -> io.BytesIO:
     except FileNotFoundError:
         # No workspace.yaml file found, we can ignore this error and assume the default value of WORKSPACE_FILES_PATH
         pass
-    with ZipFile(zip_file, "w") as zipObj:
-        for path in pipeline_directory_path.glob("**/*"):
-            if path.name == "python":
-                # We are in a virtual environment
-                excluded_paths.append(path.parent.parent)  # ./<venv>/bin/python -> ./<venv>
 
-            if not path.suffix:
-                continue
-            if path.suffix.lower() not in (".py", ".ipynb", ".txt", ".md", ".r", ".sql"):
-                continue
+    return excluded_paths
 
-            files.append(path)
 
-        if settings.debug:
-            click.echo(f"Excluded dirs: {[p.absolute() for p in excluded_paths]}")
+def generate_zip_file(pipeline_directory_path: str | Path) -> io.BytesIO:
+    """Generate a ZIP file containing the pipeline code.
+
+    The archive is reproducible: packaging the same files always produces the same bytes. Directories ignored by the
+    .gitignore and .openhexaignore files of the pipeline directory are not packaged.
+
+    Args:
+        pipeline_directory_path (str | Path): The path to the pipeline directory.
 
+    Returns
+    -------
+        io.BytesIO: A BytesIO object containing the ZIP file.
+    """
+    pipeline_directory_path = Path(pipeline_directory_path)
+    excluded_paths = _get_excluded_paths(pipeline_directory_path)
+    files = collect_files(pipeline_directory_path, excluded_paths)
+    if settings.debug:
+        click.echo("Generating ZIP file:")
+        click.echo(f"Excluded dirs: {[p.absolute() for p in excluded_paths]}")
         for file_path in files:
-            # Do not include files from the excluded paths
-            if any([file_path.is_relative_to(excluded_dir) for excluded_dir in excluded_paths]):
-                if settings.debug:
-                    click.echo(f"\t{file_path.name} (excluded)")
-                continue
-            if settings.debug:
-                click.echo(f"\t{file_path.name}")
-            zipObj.write(file_path, file_path.relative_to(pipeline_directory_path))
+            click.echo(f"\t{file_path}")
+
+    zip_file = io.BytesIO()
+    write_zip(zip_file, pipeline_directory_path, files)
     zip_file.seek(0)
     return zip_file
 
 
+def get_pipeline_manifest_digest(pipeline_directory_path: str | Path) -> str:
+    """Return a digest of the content of the files packaged by generate_zip_file(), without packaging them."""
+    pipeline_directory_path = Path(pipeline_directory_path)
+    files = collect_files(pipeline_directory_path, _get_excluded_paths(pipeline_directory_path))
+
+    return get_manifest_digest(get_manifest(pipeline_directory_path, files))
+
+
+def _get_pushed_versions_key(pipeline_code: str) -> str:
+    return f"{settings.api_url}/{settings.current_workspace}/{pipeline_code}"
+
+
+def is_pipeline_unchanged(pipeline_directory_path: str | Path, pipeline: dict[str, typing.Any], digest: str) -> bool:
+    """Return whether the current version of the pipeline was pushed from this directory with the same files.
+
+    Args:
+        pipeline_directory_path (str | Path): The path to the pipeline directory.
+        pipeline (dict): The pipeline, as returned by get_pipelines() or get_pipeline_from_code().
+        digest (str): The digest of the files of the pipeline directory (see get_pipeline_manifest_digest()).
+    """
+    try:
+        pushed_versions = json.loads((Path(pipeline_directory_path) / PUSHED_VERSIONS_FILE).read_text())
+    except (OSError, ValueError):
+        return False
+    pushed_version = pushed_versions.get(_get_pushed_versions_key(pipeline["code"]))
+    current_version = pipeline.get("currentVersion") or {}
+
+    return (
+        isinstance(pushed_version, dict)
+        and current_version.get("id") is not None
+        and pushed_version.get("version_id") == current_version["id"]
+        and pushed_version.get("digest") == digest
+    )
+
+
+def save_pushed_version(pipeline_directory_path: str | Path, pipeline_code: str, version_id: str, digest: str):
+    """Record the version of the pipeline pushed from this directory, and the digest of its files."""
+    path = Path(pipeline_directory_path) / PUSHED_VERSIONS_FILE
+    try:
+        pushed_versions = json.loads(path.read_text())
+    except (OSError, ValueError):
+        pushed_versions = {}
+    pushed_versions[_get_pushed_versions_key(pipeline_code)] = {"version_id": version_id, "digest": digest}
+    try:
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(json.dumps(pushed_versions, indent=2))
+    except (OSError, TypeError) as e:
+        logging.debug("Could not record the pushed version: %s", e)
+
+
 def upload_pipeline(
     target_pipeline_code: str,
     pipeline_directory_path: str | Path,
@@ -3,6 +3,7 @@
 import functools
 import json
 import signal
+import tempfile
 import urllib
 from datetime import datetime
 from importlib.metadata import version
@@ -27,13 +28,18 @@ from openhexa.cli.api import (
     ensure_is_pipeline_dir,
     get_library_versions,
     get_pipeline_from_code,
+    get_pipeline_manifest_digest,
     get_pipelines_pages,
     get_workspace,
+    is_pipeline_unchanged,
     run_pipeline,
+    save_pushed_version,
     upload_pipeline,
 )
 from openhexa.cli.settings import settings, setup_logging
 from openhexa.graphql.graphql_client.enums import PipelineType
+from openhexa.sdk.pipelines.code_profile import MODES as PROFILE_MODES
+from openhexa.sdk.pipelines.code_profile import summarize as summarize_profiles
 from openhexa.sdk.pipelines.exceptions import PipelineNotFound
 from openhexa.sdk.pipelines.runtime import get_pipeline
 
@@ -400,6 +406,7 @@ def normalize_tag(tag: str) -> str:
     help="Tags to associate with the pipeline",
 )
 @click.option("--yes", is_flag=True, help="Skip confirmation")
+@click.option("--force", is_flag=True, help="Push a new version even if the pipeline files did not change")
 @handle_ssl_errors
 def pipelines_push(
     path: str,
@@ -410,6 +417,7 @@ def pipelines_push(
     functional_type: str = None,
     tag: tuple = (),
     yes: bool = False,
+    force: bool = False,
 ):
     """Push a pipeline to the backend. If the pipeline already exists, it will be updated otherwise it will be created.
 
@@ -452,6 +460,21 @@ def pipelines_push(
         else:
             selected_pipeline = select_pipeline(workspace_pipelines, number_of_pages, pipeline)
 
+        digest = get_pipeline_manifest_digest(path)
+        # Version options (name, description...) are only set by pushing a new version
+        has_version_options = any([name, description, link, functional_type, tag])
+        if (
+            selected_pipeline
+            and not force
+            and not has_version_options
+            and is_pipeline_unchanged(path, selected_pipeline, digest)
+        ):
+            click.echo(
+                f"✅ No changes since version '{selected_pipeline['currentVersion']['name']}' was pushed, "
+                "skipping (use --force to push a new version anyway)."
+            )
+            return
+
         if not yes:
             name_text = f" with name {click.style(name, bold=True)}" if name else ""
             confirmation_message = (
@@ -485,6 +508,7 @@ def pipelines_push(
                 )
                 uploaded_pipeline_version = create_result["pipelineVersion"]
                 selected_pipeline = create_result["pipeline"]
+            save_pushed_version(path, selected_pipeline["code"], uploaded_pipeline_version["id"], digest)
             version_url = click.style(
                 f"{settings.public_api_url}/workspaces/{workspace}/pipelines/{selected_pipeline['code']}",
                 fg="bright_blue",
@@ -601,12 +625,21 @@ def pipelines_delete(code: str):
     help="Docker image to use",
 )
 @click.option("--debug", "-d", is_flag=True, help="Run the pipeline in debug mode (with debugpy)")
+@click.option(
+    "--profile",
+    type=click.Choice(PROFILE_MODES),
+    default=None,
+    help="Profile the pipeline function and tasks (cpu: cProfile, memory: tracemalloc) and print the hot spots",
+)
+@click.option("--profile-top", type=int, default=20, show_default=True, help="Number of hot spots to print")
 def pipelines_run(
     path: str,
     image: str = None,
     config_str: str = "{}",
     config_file: click.File = None,
     debug: bool = False,
+    profile: str = None,
+    profile_top: int = 20,
 ):
     """Run a pipeline locally."""
     if config_str and config_file:
@@ -618,7 +651,8 @@ def pipelines_run(
         else:
             config = json.loads(config_str or "{}", strict=False)
 
-        container = run_pipeline(path, config, image, debug=debug)
+        profile_path = Path(tempfile.mkdtemp(prefix="openhexa-profile-")) if profile else None
+        container = run_pipeline(path, config, image, debug=debug, profile=profile, profile_path=profile_path)
         # Listen to ctrl+c to stop the container
         signal.signal(signal.SIGINT, lambda _, __: container.kill())
 
@@ -638,6 +672,8 @@ def pipelines_run(
 
         result = container.wait()
         click.echo()
+        if profile_path is not None:
+            _print_profile_summary(profile_path, profile_top)
         if result["StatusCode"] != 0:
             _terminate("❌ Error in pipeline", err=True)
         else:
@@ -650,6 +686,17 @@ def pipelines_run(
         _terminate(f"❌ Error while running pipeline: {e}", err=True, exception=e)
 
 
+def _print_profile_summary(profile_path: Path, top: int):
+    summary = summarize_profiles(profile_path, top)
+    if not summary:
+        click.secho("No profile has been written by the pipeline run", fg="yellow")
+        return
+
+    click.secho("Profile", underline=True)
+    click.echo(summary)
+    click.echo(f"\nProfiles and run metrics: {profile_path}\n")
+
+
 @pipelines.command("list")
 @handle_ssl_errors
 def pipelines_list():
@@ -0,0 +1,321 @@
+"""Packaging of pipeline directories into reproducible ZIP archives."""
+
+import hashlib
+import os
+import re
+import struct
+import typing
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+# Only these files are packaged, other files (data files, images...) are not part of the pipeline code
+PACKAGED_SUFFIXES = (".py", ".ipynb", ".txt", ".md", ".r", ".sql")
+
+# Directories that never contain pipeline code
+EXCLUDED_DIRECTORY_NAMES = frozenset(
+    {".git", ".hg", ".svn", ".openhexa", "__pycache__", "node_modules", ".mypy_cache", ".pytest_cache", ".ruff_cache"}
+)
+
+IGNORE_FILE_NAMES = (".gitignore", ".openhexaignore")
+
+# Fixed timestamp of the archive entries (the earliest one supported by the ZIP format), for reproducible archives
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+_DOS_TIME = 0
+_DOS_DATE = ((ZIP_DATE_TIME[0] - 1980) << 9) | (ZIP_DATE_TIME[1] << 5) | ZIP_DATE_TIME[2]
+_UTF8_FLAG = 0x800
+_ZIP32_LIMIT = 0xFFFFFFFF
+_ZIP32_MAX_ENTRIES = 0xFFFF
+
+
+@dataclass
+class IgnorePattern:
+    """A pattern of an ignore file (.gitignore syntax)."""
+
+    regex: re.Pattern
+    negated: bool
+    directory_only: bool
+
+
+def _translate_pattern(pattern: str) -> str:
+    """Translate a .gitignore glob pattern to a regular expression matching relative POSIX paths."""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            content = pattern[i + 1 : end].replace("\\", "\\\\")
+            regex += f"[^{content[1:]}]" if content.startswith("!") else f"[{content}]"
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            regex += re.escape(pattern[i + 1])
+            i += 2
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+
+    return regex
+
+
+class IgnoreRules:
+    """Patterns of an ignore file, relative to the directory of the file.
+
+    The supported syntax is the one of .gitignore files: blank lines and lines starting with # are ignored, a leading
+    ! negates the pattern, a trailing / only matches directories, patterns containing a / (other than a trailing one)
+    are relative to the directory of the file, others match at any depth, and * / ? / [...] / ** are supported.
+    """
+
+    def __init__(self, lines: typing.Iterable[str]):
+        self.patterns = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            directory_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            regex = _translate_pattern(line.lstrip("/"))
+            if not anchored:
+                regex = f"(?:.*/)?{regex}"
+            self.patterns.append(IgnorePattern(re.compile(regex, re.DOTALL), negated, directory_only))
+
+    @classmethod
+    def from_file(cls, path: Path) -> "IgnoreRules":
+        """Read the rules of an ignore file."""
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return cls(f)
+
+    def match(self, relative_path: str, is_dir: bool) -> bool | None:
+        """Return True if the path is ignored, False if it is explicitly re-included and None if no pattern matches.
+
+        Parameters
+        ----------
+        relative_path : str
+            The POSIX path relative to the directory of the ignore file.
+        is_dir : bool
+            Whether the path is a directory.
+        """
+        result = None
+        for pattern in self.patterns:
+            if pattern.directory_only and not is_dir:
+                continue
+            if pattern.regex.fullmatch(relative_path):
+                result = not pattern.negated
+
+        return result
+
+
+def _is_virtual_environment(path: Path) -> bool:
+    return (path / "pyvenv.cfg").is_file() or (path / "bin" / "python").exists()
+
+
+def collect_files(directory: Path, excluded_paths: typing.Iterable[Path] = ()) -> list[Path]:
+    """Return the paths of the files to package, relative to the directory and sorted.
+
+    Excluded directories are pruned during the walk instead of being filtered out afterwards: the provided excluded
+    paths, version control and cache directories, virtual environments and the directories ignored by the .gitignore
+    and .openhexaignore files of the directory and of its subdirectories.
+
+    Parameters
+    ----------
+    directory : Path
+        The pipeline directory.
+    excluded_paths : typing.Iterable[Path]
+        Directories to exclude (absolute, or relative to the current working directory).
+    """
+    directory = Path(directory).absolute()
+    excluded = {Path(path).absolute() for path in excluded_paths}
+    # Rules of the ignore files of the directories being walked, from the root to the deepest directory
+    rules_by_directory: dict[str, list[IgnoreRules]] = {}
+    files = []
+
+    def is_ignored(relative_path: str, is_dir: bool) -> bool:
+        ignored = False
+        for base, rules in rules_by_directory.items():
+            if base and not relative_path.startswith(f"{base}/"):
+                continue
+            path_from_base = relative_path[len(base) + 1 :] if base else relative_path
+            for rule in rules:
+                result = rule.match(path_from_base, is_dir)
+                if result is not None:
+                    ignored = result
+
+        return ignored
+
+    for root, dir_names, file_names in os.walk(directory):
+        root_path = Path(root)
+        relative_root = root_path.relative_to(directory).as_posix()
+        relative_root = "" if relative_root == "." else relative_root
+        for base in [base for base in rules_by_directory if base and not f"{relative_root}/".startswith(f"{base}/")]:
+            del rules_by_directory[base]
+        ignore_files = [root_path / name for name in IGNORE_FILE_NAMES if name in file_names]
+        if ignore_files:
+            rules_by_directory[relative_root] = [IgnoreRules.from_file(path) for path in ignore_files]
+
+        def relative(name: str) -> str:
+            return f"{relative_root}/{name}" if relative_root else name
+
+        dir_names[:] = sorted(
+            name
+            for name in dir_names
+            if name not in EXCLUDED_DIRECTORY_NAMES
+            and root_path / name not in excluded
+            and not _is_virtual_environment(root_path / name)
+            and not is_ignored(relative(name), is_dir=True)
+        )
+        for name in sorted(file_names):
+            if Path(name).suffix.lower() in PACKAGED_SUFFIXES and not is_ignored(relative(name), is_dir=False):
+                files.append(Path(relative(name)))
+
+    return files
+
+
+def _hash_file(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def get_manifest(directory: Path, files: list[Path], max_workers: int | None = None) -> dict[str, str]:
+    """Return the manifest of the provided files: the SHA-256 hash of their content by relative POSIX path."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        hashes = executor.map(_hash_file, [directory / file for file in files])
+        return {file.as_posix(): file_hash for file, file_hash in zip(files, hashes)}
+
+
+def get_manifest_digest(manifest: dict[str, str]) -> str:
+    """Return a digest of a manifest, identifying the content of a package."""
+    digest = hashlib.sha256()
+    for name in sorted(manifest):
+        digest.update(f"{name}\0{manifest[name]}\n".encode())
+
+    return digest.hexdigest()
+
+
+def _get_mode(path: Path) -> int:
+    """Return the normalized permissions of a file in archives: executable or not."""
+    return 0o755 if path.stat().st_mode & 0o111 else 0o644
+
+
+@dataclass
+class _Entry:
+    name: bytes
+    mode: int
+    crc: int
+    size: int
+    compress_type: int
+    data: bytes
+
+
+def _compress_file(path: Path, name: bytes, compress_level: int) -> _Entry:
+    content = path.read_bytes()
+    compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    compressed = compressor.compress(content) + compressor.flush()
+    # Files that do not shrink (already compressed, or tiny) are stored as is
+    compress_type, data = (ZIP_DEFLATED, compressed) if len(compressed) < len(content) else (ZIP_STORED, content)
+
+    return _Entry(
+        name=name,
+        mode=_get_mode(path),
+        crc=zlib.crc32(content),
+        size=len(content),
+        compress_type=compress_type,
+        data=data,
+    )
+
+
+def _write_entries(fp: typing.BinaryIO, entries: list[_Entry]):
+    """Write a ZIP archive of already compressed entries (without ZIP64 extensions)."""
+    central_directory = []
+    offset = 0
+    for entry in entries:
+        flags = 0 if entry.name.isascii() else _UTF8_FLAG
+        fields = (flags, entry.compress_type, _DOS_TIME, _DOS_DATE, entry.crc, len(entry.data), entry.size)
+        local_header = struct.pack("<IH4H3IHH", 0x04034B50, 20, *fields, len(entry.name), 0)
+        fp.write(local_header + entry.name)
+        fp.write(entry.data)
+        central_directory.append(
+            struct.pack(
+                "<I2H4H3I5HII",
+                0x02014B50,
+                (3 << 8) | 20,  # Made by a UNIX system, so that the permissions of the files are restored
+                20,
+                *fields,
+                len(entry.name),
+                0,
+                0,
+                0,
+                0,
+                (0o100000 | entry.mode) << 16,
+                offset,
+            )
+            + entry.name
+        )
+        offset += len(local_header) + len(entry.name) + len(entry.data)
+
+    central_directory_size = sum(len(record) for record in central_directory)
+    fp.write(b"".join(central_directory))
+    fp.write(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, len(entries), len(entries), central_directory_size, offset, 0))
+
+
+def write_zip(
+    fp: typing.BinaryIO,
+    directory: Path,
+    files: list[Path],
+    compress_level: int = 6,
+    max_workers: int | None = None,
+):
+    """Write a ZIP archive of the provided files to a binary file object.
+
+    Files are read and compressed in parallel (zlib releases the GIL). The archive is byte-for-byte reproducible: the
+    entries are written in the order of the provided files, with a fixed timestamp and normalized permissions.
+
+    Parameters
+    ----------
+    fp : typing.BinaryIO
+        The file object to write the archive to.
+    directory : Path
+        The directory the file paths are relative to.
+    files : list[Path]
+        The paths of the files to archive, relative to the directory.
+    compress_level : int
+        The deflate compression level (0 to 9).
+    max_workers : int | None
+        The maximum number of threads compressing files.
+    """
+    names = [file.as_posix().encode() for file in files]
+    upper_bound = sum((directory / file).stat().st_size + 76 + 2 * len(name) for file, name in zip(files, names)) + 22
+    if len(files) >= _ZIP32_MAX_ENTRIES or upper_bound >= _ZIP32_LIMIT:
+        # Archives too large for the ZIP32 format are written (serially) by zipfile, which supports ZIP64
+        with ZipFile(fp, "w", compression=ZIP_DEFLATED, compresslevel=compress_level) as zip_file:
+            for file in files:
+                info = ZipInfo(file.as_posix(), date_time=ZIP_DATE_TIME)
+                info.compress_type = ZIP_DEFLATED
+                info.external_attr = (0o100000 | _get_mode(directory / file)) << 16
+                zip_file.writestr(info, (directory / file).read_bytes())
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        entries = list(
+            executor.map(lambda file, name: _compress_file(directory / file, name, compress_level), files, names)
+        )
+    _write_entries(fp, entries)
@@ -2,7 +2,7 @@
 
 from pathlib import Path
 
-from .base_openhexa_client import BaseOpenHexaClient  # noqa: F401 -> Expose base client class
+from .base_openhexa_client import BaseAsyncOpenHexaClient, BaseOpenHexaClient  # noqa: F401 -> Expose base clients
 from .graphql_client import *  # noqa: F403 -> Expose autogenerated types
 
 BUNDLED_SCHEMA_PATH = Path(__file__).parent / "schema.generated.graphql"
@@ -2,10 +2,13 @@
 
 import logging
 from importlib.metadata import version
+from typing import Any
 
 import httpx
 
 from openhexa.graphql.graphql_client import Client
+from openhexa.graphql.graphql_client.async_base_client import AsyncBaseClient
+from openhexa.utils.session import get_shared_httpx_async_transport, get_shared_httpx_transport
 
 
 class BaseOpenHexaClient(Client):
@@ -24,7 +27,8 @@ class BaseOpenHexaClient(Client):
             "User-Agent": f"openhexa-sdk/{version('openhexa.sdk')}",
             "Authorization": f"Bearer {self.token}",
         }
-        http_client = httpx.Client(headers=headers, verify=verify)
+        # Clients only differ by their headers: they share the connection pool of the process
+        http_client = httpx.Client(headers=headers, verify=verify, transport=get_shared_httpx_transport(verify))
         super().__init__(
             url=url,
             headers=headers,
@@ -33,3 +37,36 @@ class BaseOpenHexaClient(Client):
         logging.getLogger("httpx").setLevel(
             logging.WARNING
         )  # HTTPX logs queries by default, we disable them here with WARNING level
+
+
+class BaseAsyncOpenHexaClient(AsyncBaseClient):
+    """Asynchronous client for the OpenHexa GraphQL API.
+
+    The generated client methods are synchronous: this client exposes the raw GraphQL operations through query().
+    It must be created within a running event loop, as it uses the connection pool of that loop.
+    """
+
+    def __init__(self, url: str, token: str, verify: bool = True):
+        """Initialize the client with the OpenHexa API URL and headers.
+
+        Args:
+            url: GraphQL API URL.
+            token: Authentication token.
+            verify: Whether to verify SSL certificates.
+        """
+        self.token = token
+        headers = {
+            "User-Agent": f"openhexa-sdk/{version('openhexa.sdk')}",
+            "Authorization": f"Bearer {self.token}",
+        }
+        http_client = httpx.AsyncClient(
+            headers=headers, verify=verify, transport=get_shared_httpx_async_transport(verify)
+        )
+        super().__init__(url=url, headers=headers, http_client=http_client)
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    async def query(self, operation: str, variables: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Run a GraphQL operation and return its data (errors are raised as GraphQLClientError exceptions)."""
+        response = await self.execute(query=operation, variables=variables or {})
+
+        return self.get_data(response)
@@ -4,7 +4,7 @@ from .datasets import Dataset
 from .files import File
 from .pipelines import current_pipeline, current_run, parameter, pipeline
 from .pipelines.parameter import DHIS2Widget, IASOWidget, Secret
-from .utils import OpenHexaClient
+from .utils import AsyncOpenHexaClient, OpenHexaClient
 from .workspaces import workspace
 from .workspaces.connection import (
     CustomConnection,
@@ -31,6 +31,7 @@ __all__ = [
     "CustomConnection",
     "Dataset",
     "OpenHexaClient",
+    "AsyncOpenHexaClient",
     "File",
     "Secret",
 ]
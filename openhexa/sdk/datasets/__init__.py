@@ -5,6 +5,6 @@ https://github.com/BLSQ/openhexa/wiki/Using-the-OpenHEXA-SDK#working-with-datase
 dataset.
 """
 
-from .dataset import Dataset, DatasetFile
+from .dataset import BulkUploadError, Dataset, DatasetFile, prepare_downloads
 
-__all__ = ["Dataset", "DatasetFile"]
+__all__ = ["BulkUploadError", "Dataset", "DatasetFile", "prepare_downloads"]
@@ -0,0 +1,73 @@
+"""Local cache of downloaded dataset files, shared by the tasks and runs of a workspace."""
+
+import hashlib
+import os
+import shutil
+import typing
+from pathlib import Path
+
+from openhexa.sdk.utils import Settings
+from openhexa.utils import DiskCache
+
+
+class DatasetFileCache:
+    """Size-bounded cache of dataset file contents, keyed by file id.
+
+    Dataset files cannot be replaced once added to a version: the content of a file id never changes, and cached
+    entries never need to be invalidated. The least recently used entries are evicted when the cache is full.
+
+    Parameters
+    ----------
+    directory : str
+        The cache directory.
+    max_size : int
+        The maximum total size of the cache, in bytes.
+    """
+
+    def __init__(self, directory: str, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+
+    @classmethod
+    def from_settings(cls) -> "DatasetFileCache | None":
+        """Build a dataset file cache using the location and size from the settings.
+
+        The cache lives in the workspace tmp directory by default. It is disabled when running outside of a workspace
+        (unless a cache directory is set), or when its maximum size is 0.
+        """
+        from openhexa.sdk.workspaces import workspace
+
+        directory = Settings.dataset_cache_path()
+        if directory is None and "WORKSPACE_TMP_PATH" in os.environ:
+            directory = os.path.join(workspace.tmp_path, ".cache", "openhexa", "datasets")
+        max_size = Settings.dataset_cache_max_size()
+        if directory is None or max_size <= 0:
+            return None
+
+        return cls(directory, max_size=max_size)
+
+    def get(self, file_id: str) -> Path | None:
+        """Return the path of the cached content of a file, if any."""
+        return DiskCache(self.directory, self.max_size).get(self._key(file_id))
+
+    def put(self, file_id: str, chunks: typing.Iterable[bytes]) -> Path:
+        """Store the content of a file, provided as an iterable of chunks, and return the path of the entry."""
+
+        def write(f):
+            for chunk in chunks:
+                f.write(chunk)
+
+        return DiskCache(self.directory, self.max_size).put(self._key(file_id), write)
+
+    def put_file(self, file_id: str, path: str | os.PathLike[str]) -> Path:
+        """Store a copy of a downloaded file, and return the path of the entry."""
+
+        def write(f):
+            with open(path, "rb") as source:
+                shutil.copyfileobj(source, f)
+
+        return DiskCache(self.directory, self.max_size).put(self._key(file_id), write)
+
+    @staticmethod
+    def _key(file_id: str) -> str:
+        return hashlib.sha256(file_id.encode()).hexdigest()
@@ -4,21 +4,204 @@ See https://github.com/BLSQ/openhexa/wiki/User-manual#datasets and
 https://github.com/BLSQ/openhexa/wiki/Using-the-OpenHEXA-SDK#working-with-datasets for more information about datasets.
 """
 
+import asyncio
+import io
 import mimetypes
+import os
+import shutil
+import time
 import typing
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from os import PathLike
 from pathlib import Path
 
+import httpx
 import requests
 
-from openhexa.sdk.utils import Iterator, Page, Settings, graphql, read_content
+from openhexa.sdk.utils import Iterator, Page, Settings, get_timestamp, graphql, graphql_async, read_content
+from openhexa.utils import get_shared_httpx_async_transport
+
+from .cache import DatasetFileCache
+from .download import DEFAULT_CHUNK_SIZE as DEFAULT_DOWNLOAD_CHUNK_SIZE
+from .download import download, iter_chunks, open_url
+from .upload import DEFAULT_CHUNK_SIZE, ProgressCallback, _remaining_size, upload
+from .url_cache import download_urls
+
+GET_DOWNLOAD_URL = """
+    mutation getDownloadUrl($input: PrepareVersionFileDownloadInput!) {
+        prepareVersionFileDownload(input: $input) {
+            downloadUrl
+            success
+            errors
+        }
+    }
+"""
+
+GET_VERSIONS = """
+    query getDatasetVersions($datasetId: ID!, $page: Int!, $perPage: Int) {
+        dataset (id: $datasetId) {
+            versions (page: $page, perPage: $perPage) {
+                items {
+                    id
+                    name
+                    createdAt
+                }
+                totalPages
+            }
+        }
+    }
+"""
+
+GET_FILES = """
+    query getDatasetFiles($versionId: ID!, $page: Int!, $perPage: Int) {
+        datasetVersion (id: $versionId) {
+            files (page: $page, perPage: $perPage) {
+                items {
+                    id
+                    uri
+                    filename
+                    contentType
+                    createdAt
+                }
+                totalPages
+            }
+        }
+    }
+"""
+
+GET_FILE_BY_NAME = """
+    query getDatasetFile($versionId: ID!, $filename: String!) {
+        datasetVersion(id: $versionId) {
+            fileByName(name: $filename) {
+                id
+                uri
+                filename
+                contentType
+                createdAt
+            }
+        }
+    }
+"""
+
+GENERATE_UPLOAD_URL = """
+    mutation generateDatasetUploadUrl ($input: GenerateDatasetUploadUrlInput!) {
+        generateDatasetUploadUrl(input: $input) {
+            uploadUrl
+            success
+            errors
+        }
+    }
+"""
+
+CREATE_VERSION_FILE = """
+    mutation CreateDatasetVersionFile ($input: CreateDatasetVersionFileInput!) {
+        createDatasetVersionFile(input: $input) {
+            file {
+                id
+                filename
+                uri
+                contentType
+                createdAt
+            }
+            success
+            errors
+        }
+    }
+"""
+
+CREATE_VERSION = """
+    mutation createDatasetVersion($input: CreateDatasetVersionInput!) {
+        createDatasetVersion(input: $input) {
+            version {
+                id
+                name
+                description
+                createdAt
+            }
+            errors
+            success
+        }
+    }
+"""
+
+GET_LATEST_VERSION = """
+    query getLatestVersion($datasetId: ID!) {
+        dataset(id: $datasetId) {
+            latestVersion {
+                id
+                name
+                createdAt
+            }
+        }
+    }
+"""
+
+# Size of the chunks read from files uploaded asynchronously
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Maximum number of files prepared or registered by a single GraphQL request in DatasetVersion.add_files()
+ADD_FILES_BATCH_SIZE = 50
+# Maximum number of download URLs prepared by a single GraphQL request
+PREPARE_DOWNLOADS_BATCH_SIZE = 50
+
+FILE_FIELDS = "id filename uri contentType createdAt"
+
+
+def _build_batch_mutation(field: str, input_type: str, selection: str, inputs: list[dict]) -> tuple[str, dict]:
+    """Build a single GraphQL mutation running the same mutation once per input, aliased as "op<index>"."""
+    definitions = ", ".join(f"$input{i}: {input_type}!" for i in range(len(inputs)))
+    fields = "\n  ".join(f"op{i}: {field}(input: $input{i}) {{ {selection} }}" for i in range(len(inputs)))
+    variables = {f"input{i}": value for i, value in enumerate(inputs)}
+
+    return f"mutation {field}Batch({definitions}) {{\n  {fields}\n}}", variables
+
+
+def _run_batch_mutation(field: str, input_type: str, selection: str, inputs: list[dict]) -> list[dict | Exception]:
+    """Run a batch mutation, and return the result of each input (the error of the request if it failed)."""
+    # A failed request fails all the inputs of the batch, so that callers can handle them one by one
+    try:
+        data = graphql(*_build_batch_mutation(field, input_type, selection, inputs))
+    except Exception as e:
+        return [e] * len(inputs)
+
+    return [data[f"op{i}"] for i in range(len(inputs))]
+
+
+def prepare_downloads(file_ids: typing.Iterable[str]):
+    """Prepare the download URLs of several files, using one GraphQL request per PREPARE_DOWNLOADS_BATCH_SIZE files.
+
+    URLs are added to the shared URL cache: files whose URL could not be prepared are prepared one by one when needed.
+
+    Parameters
+    ----------
+    file_ids : typing.Iterable[str]
+        The ids of the files (files whose URL is already cached are skipped).
+    """
+    file_ids = [file_id for file_id in dict.fromkeys(file_ids) if download_urls.get(file_id) is None]
+    for start in range(0, len(file_ids), PREPARE_DOWNLOADS_BATCH_SIZE):
+        batch = file_ids[start : start + PREPARE_DOWNLOADS_BATCH_SIZE]
+        results = _run_batch_mutation(
+            "prepareVersionFileDownload",
+            "PrepareVersionFileDownloadInput",
+            "downloadUrl success errors",
+            [{"fileId": file_id} for file_id in batch],
+        )
+        for file_id, result in zip(batch, results):
+            if not isinstance(result, Exception) and result["success"]:
+                download_urls.set(file_id, result["downloadUrl"])
+
+
+def _async_http_client() -> httpx.AsyncClient:
+    verify = Settings.verify_ssl()
+    return httpx.AsyncClient(verify=verify, transport=get_shared_httpx_async_transport(verify))
 
 
 class DatasetFile:
     """Represent a single file within a dataset. Files are attached to dataset through versions."""
 
-    _download_url = None
     version = None
+    # Ids of the files whose download URLs are prepared along with the URL of this file (the files of the same page)
+    _prepare_with = ()
 
     def __init__(
         self,
@@ -37,92 +220,262 @@ class DatasetFile:
         self.created_at = created_at
 
     def read(self):
-        """Download the file content and return it."""
-        response = requests.get(self.download_url, stream=True, verify=Settings.verify_ssl())
-        response.raise_for_status()
-        return response.content
+        """Download the file content and return it.
+
+        When the dataset file cache is enabled, the content is downloaded to the cache on the first read, and read from
+        it afterwards (see DatasetFileCache).
+        """
+        cache = DatasetFileCache.from_settings()
+        if cache is not None:
+            path = cache.get(self.id) or cache.put(self.id, self._iter_remote_chunks(DEFAULT_DOWNLOAD_CHUNK_SIZE))
+            try:
+                return path.read_bytes()
+            except FileNotFoundError:  # Evicted right away (larger than the cache)
+                pass
+
+        def get_content(download_url: str) -> bytes:
+            response = requests.get(download_url, stream=True, verify=Settings.verify_ssl())
+            response.raise_for_status()
+            return response.content
+
+        return self._with_download_url(get_content)
+
+    def iter_chunks(self, chunk_size: int = DEFAULT_DOWNLOAD_CHUNK_SIZE) -> typing.Iterator[bytes]:
+        """Iterate over the file content by chunks of (at most) chunk_size bytes, without loading it in memory."""
+        cached_path = self._get_cached_path()
+        if cached_path is not None:
+            return _iter_file_chunks(cached_path, chunk_size)
+
+        return self._iter_remote_chunks(chunk_size)
+
+    def _iter_remote_chunks(self, chunk_size: int) -> typing.Iterator[bytes]:
+        return self._with_download_url(lambda url: iter_chunks(url, chunk_size, verify=Settings.verify_ssl()))
+
+    def download_to(self, path: str | PathLike[str], *, max_concurrency: int = 8) -> Path:
+        """Download the file to the provided path, and return the path of the downloaded file.
+
+        The file is written to a temporary file, renamed once the download is complete. An interrupted download is
+        resumed where it stopped, and large files are downloaded by several ranged requests in parallel. When the
+        dataset file cache is enabled, the file is copied from the cache if it was already downloaded, and added to
+        the cache otherwise.
+
+        Parameters
+        ----------
+        path : str | PathLike[str]
+            The path of the downloaded file, or the directory to download the file to (using its filename).
+        max_concurrency : int
+            The maximum number of ranged requests sent at the same time for large files.
+        """
+        path = Path(path)
+        if path.is_dir():
+            path = path / self.filename
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+        cache = DatasetFileCache.from_settings()
+        cached_path = cache.get(self.id) if cache is not None else None
+        if cached_path is not None:
+            part_path = path.with_name(f"{path.name}.part")
+            try:
+                shutil.copyfile(cached_path, part_path)
+                os.replace(part_path, path)
+                return path
+            except FileNotFoundError:  # Evicted in the meantime
+                part_path.unlink(missing_ok=True)
+
+        self._with_download_url(
+            lambda url: download(
+                url, path, max_concurrency=max_concurrency, verify=Settings.verify_ssl(), file_id=self.id
+            )
+        )
+        if cache is not None:
+            cache.put_file(self.id, path)
+
+        return path
+
+    def open(self, buffer_size: int = DEFAULT_DOWNLOAD_CHUNK_SIZE) -> io.BufferedReader:
+        """Open the file as a seekable binary file object, reading its content on demand through HTTP range requests.
+
+        Libraries reading only parts of files (such as pandas or pyarrow for Parquet files) only download these parts.
+        Files already in the dataset file cache are opened from the cache.
+
+        Examples
+        --------
+        >>> with dataset_file.open() as f:
+        ...     table = pyarrow.parquet.read_table(f, columns=["district", "value"])
+        """
+        cached_path = self._get_cached_path()
+        if cached_path is not None:
+            try:
+                return open(cached_path, "rb", buffering=buffer_size)
+            except FileNotFoundError:  # Evicted in the meantime
+                pass
+
+        return self._with_download_url(
+            lambda url: open_url(
+                url, buffer_size=buffer_size, verify=Settings.verify_ssl(), refresh_url=self._refresh_download_url
+            )
+        )
+
+    def _get_cached_path(self) -> Path | None:
+        cache = DatasetFileCache.from_settings()
+        return cache.get(self.id) if cache is not None else None
+
+    async def read_async(self) -> bytes:
+        """Download the file content and return it, without blocking the event loop.
+
+        As with read(), expired download URLs are refreshed and the dataset file cache is used when enabled.
+        """
+        cache = DatasetFileCache.from_settings()
+        if cache is not None:
+            cached_path = await asyncio.to_thread(cache.get, self.id)
+            if cached_path is not None:
+                try:
+                    return await asyncio.to_thread(cached_path.read_bytes)
+                except FileNotFoundError:  # Evicted in the meantime
+                    pass
+
+        async def get_content(download_url: str) -> bytes:
+            async with _async_http_client() as client:
+                response = await client.get(download_url)
+                response.raise_for_status()
+            return response.content
+
+        content = await self._with_download_url_async(get_content)
+        if cache is not None:
+            await asyncio.to_thread(cache.put, self.id, [content])
+
+        return content
 
     @property
     def download_url(self):
-        """Build and return a pre-signed URL for the file."""
-        if self._download_url is None:
-            response = graphql(
-                """
-                mutation getDownloadUrl($input: PrepareVersionFileDownloadInput!) {
-                    prepareVersionFileDownload(input: $input) {
-                        downloadUrl
-                        success
-                        errors
-                    }
-                }
-            """,
-                {"input": {"fileId": self.id}},
-            )
-            if response["prepareVersionFileDownload"]["success"] is False:
-                raise Exception(response["prepareVersionFileDownload"]["errors"])
-            self._download_url = response["prepareVersionFileDownload"]["downloadUrl"]
-        return self._download_url
+        """Build and return a pre-signed URL for the file.
+
+        URLs are shared by all the instances of a file, and reused until shortly before they expire. The URLs of the
+        files listed in the same page of a version are prepared together, the first time one of them is needed.
+        """
+        download_url = download_urls.get(self.id)
+        if download_url is None and len(self._prepare_with) > 1:
+            prepare_downloads(self._prepare_with)
+            download_url = download_urls.get(self.id)
+        if download_url is None:
+            download_url = self._parse_download_url(graphql(GET_DOWNLOAD_URL, {"input": {"fileId": self.id}}))
+            download_urls.set(self.id, download_url)
+
+        return download_url
+
+    async def get_download_url_async(self) -> str:
+        """Build and return a pre-signed URL for the file, without blocking the event loop."""
+        download_url = download_urls.get(self.id)
+        if download_url is None:
+            response = await graphql_async(GET_DOWNLOAD_URL, {"input": {"fileId": self.id}})
+            download_url = self._parse_download_url(response)
+            download_urls.set(self.id, download_url)
+
+        return download_url
+
+    def _refresh_download_url(self) -> str:
+        download_urls.invalidate(self.id)
+        return self.download_url
+
+    def _with_download_url(self, function: typing.Callable[[str], typing.Any]) -> typing.Any:
+        """Call the function with the download URL, and again with a new URL if the storage rejects it (expired)."""
+        try:
+            return function(self.download_url)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 403:
+                raise
+
+        return function(self._refresh_download_url())
+
+    async def _with_download_url_async(
+        self, function: typing.Callable[[str], typing.Awaitable[typing.Any]]
+    ) -> typing.Any:
+        """Asynchronous version of _with_download_url()."""
+        try:
+            return await function(await self.get_download_url_async())
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 403:
+                raise
+
+        download_urls.invalidate(self.id)
+        return await function(await self.get_download_url_async())
+
+    @staticmethod
+    def _parse_download_url(response: dict) -> str:
+        if response["prepareVersionFileDownload"]["success"] is False:
+            raise Exception(response["prepareVersionFileDownload"]["errors"])
+        return response["prepareVersionFileDownload"]["downloadUrl"]
 
     def __repr__(self) -> str:
         """Safe representation of the dataset file."""
         return f"<DatasetFile id={self.id} filename={self.filename}>"
 
 
+class BulkUploadError(Exception):
+    """Raised by DatasetVersion.add_files() when some of the files could not be added.
+
+    Attributes
+    ----------
+    files : list[DatasetFile | None]
+        The added files, in the order of the sources (None for the files that could not be added).
+    errors : dict[int, Exception]
+        The error of each file that could not be added, by index of its source.
+    """
+
+    def __init__(self, files: list["DatasetFile | None"], errors: dict[int, Exception]):
+        self.files = files
+        self.errors = errors
+        details = "\n".join(f"  - #{index}: {error}" for index, error in sorted(errors.items()))
+        super().__init__(f"{len(errors)} of {len(files)} file(s) could not be added:\n{details}")
+
+
 class VersionsIterator(Iterator):
-    """Custom iterator class to iterate versions using our GraphQL API."""
+    """Custom iterator class to iterate versions using our GraphQL API.
+
+    The pages following the first one are fetched concurrently (see Iterator).
+    """
 
-    def __init__(self, dataset: any, per_page: int = 10):
-        super().__init__(per_page=per_page)
+    def __init__(self, dataset: any, per_page: int = 10, max_concurrency: int = 4):
+        super().__init__(per_page=per_page, max_concurrency=max_concurrency)
 
         self.item_to_value = lambda x: DatasetVersion(
             dataset=dataset, id=x["id"], name=x["name"], created_at=x["createdAt"]
         )
         self.dataset = dataset
-        self.has_next_page = True
-
-    def _next_page(self):
-        if not self.has_next_page:
-            return None
-
-        res = graphql(
-            """
-            query getDatasetVersions($datasetId: ID!, $page: Int!, $perPage: Int) {
-                dataset (id: $datasetId) {
-                    versions (page: $page, perPage: $perPage) {
-                        items {
-                            id
-                            name
-                            createdAt
-                        }
-                        totalPages
-                    }
-                }
-            }
-            """,
-            {
-                "datasetId": self.dataset.id,
-                "page": self.page_number + 1,
-                "perPage": self.per_page,
-            },
-        )
+
+    def _fetch_page(self, page_number: int) -> tuple[Page, int]:
+        return self._to_page(graphql(GET_VERSIONS, self._page_variables(page_number)))
+
+    async def _fetch_page_async(self, page_number: int) -> tuple[Page, int]:
+        return self._to_page(await graphql_async(GET_VERSIONS, self._page_variables(page_number)))
+
+    def _page_variables(self, page_number: int) -> dict:
+        return {
+            "datasetId": self.dataset.id,
+            "page": page_number,
+            "perPage": self.per_page,
+        }
+
+    def _to_page(self, res: dict) -> tuple[Page, int]:
         if res["dataset"] is None:
             raise ValueError(f"Dataset {self.dataset.id} does not exist")
 
-        if res["dataset"]["versions"]["totalPages"] == self.page_number + 1:
-            self.has_next_page = False
-
-        return Page(
+        page = Page(
             parent=self,
             items=res["dataset"]["versions"]["items"],
             item_to_value=self.item_to_value,
         )
+        return page, res["dataset"]["versions"]["totalPages"]
 
 
 class VersionFilesIterator(Iterator):
-    """Custom iterator class to iterate version files using our GraphQL API."""
+    """Custom iterator class to iterate version files using our GraphQL API.
+
+    The pages following the first one are fetched concurrently (see Iterator).
+    """
 
-    def __init__(self, version: any, per_page: int = 20):
-        super().__init__(per_page=per_page)
+    def __init__(self, version: any, per_page: int = 20, max_concurrency: int = 4):
+        super().__init__(per_page=per_page, max_concurrency=max_concurrency)
         self.item_to_value = lambda x: DatasetFile(
             version=version,
             id=x["id"],
@@ -133,46 +486,33 @@ class VersionFilesIterator(Iterator):
         )
 
         self.version = version
-        self.has_next_page = True
-
-    def _next_page(self):
-        if not self.has_next_page:
-            return None
-
-        res = graphql(
-            """
-            query getDatasetFiles($versionId: ID!, $page: Int!, $perPage: Int) {
-                datasetVersion (id: $versionId) {
-                    files (page: $page, perPage: $perPage) {
-                        items {
-                            id
-                            uri
-                            filename
-                            contentType
-                            createdAt
-                        }
-                        totalPages
-                    }
-                }
-            }
-            """,
-            {
-                "versionId": self.version.id,
-                "page": self.page_number + 1,
-                "perPage": self.per_page,
-            },
-        )
+
+    def _fetch_page(self, page_number: int) -> tuple[Page, int]:
+        return self._to_page(graphql(GET_FILES, self._page_variables(page_number)))
+
+    async def _fetch_page_async(self, page_number: int) -> tuple[Page, int]:
+        return self._to_page(await graphql_async(GET_FILES, self._page_variables(page_number)))
+
+    def _page_variables(self, page_number: int) -> dict:
+        return {
+            "versionId": self.version.id,
+            "page": page_number,
+            "perPage": self.per_page,
+        }
+
+    def _to_page(self, res: dict) -> tuple[Page, int]:
         if res["datasetVersion"] is None:
             raise ValueError(f"Dataset version {self.version.id} does not exist")
 
-        if res["datasetVersion"]["files"]["totalPages"] == self.page_number + 1:
-            self.has_next_page = False
+        items = res["datasetVersion"]["files"]["items"]
+        file_ids = tuple(item["id"] for item in items)
 
-        return Page(
-            parent=self,
-            items=res["datasetVersion"]["files"]["items"],
-            item_to_value=self.item_to_value,
-        )
+        def item_to_value(item):
+            file = self.item_to_value(item)
+            file._prepare_with = file_ids
+            return file
+
+        return Page(parent=self, items=items, item_to_value=item_to_value), res["datasetVersion"]["files"]["totalPages"]
 
 
 class DatasetVersion:
@@ -189,33 +529,40 @@ class DatasetVersion:
     @property
     def files(self):
         """Build and return an iterator of files for this version."""
+        return self.list_files()
+
+    def list_files(self, per_page: int = 50, max_concurrency: int = 4) -> VersionFilesIterator:
+        """Build and return an iterator of files for this version.
+
+        Parameters
+        ----------
+        per_page : int
+            The number of files fetched by request.
+        max_concurrency : int
+            The maximum number of pages fetched at the same time, ahead of the page being iterated over.
+        """
         if self.id is None:
             raise ValueError("This dataset version does not have an id.")
-        return VersionFilesIterator(version=self, per_page=50)
+        return VersionFilesIterator(version=self, per_page=per_page, max_concurrency=max_concurrency)
 
     def get_file(self, filename: str) -> DatasetFile:
         """Get a file by name."""
-        data = graphql(
-            """
-            query getDatasetFile($versionId: ID!, $filename: String!) {
-                datasetVersion(id: $versionId) {
-                    fileByName(name: $filename) {
-                        id
-                        uri
-                        filename
-                        contentType
-                        createdAt
-                    }
-                }
-            }
-            """,
-            {"versionId": self.id, "filename": filename},
-        )
+        data = graphql(GET_FILE_BY_NAME, {"versionId": self.id, "filename": filename})
+        return self._get_file_from_response(data, filename)
+
+    async def get_file_async(self, filename: str) -> DatasetFile:
+        """Get a file by name, without blocking the event loop."""
+        data = await graphql_async(GET_FILE_BY_NAME, {"versionId": self.id, "filename": filename})
+        return self._get_file_from_response(data, filename)
 
+    def _get_file_from_response(self, data: dict, filename: str) -> DatasetFile:
         file = data["datasetVersion"]["fileByName"]
         if file is None:
             raise FileExistsError(f"The file {filename} does not exist for version {self}")
 
+        return self._build_file(file)
+
+    def _build_file(self, file: dict) -> DatasetFile:
         return DatasetFile(
             version=self,
             id=file["id"],
@@ -229,8 +576,191 @@ class DatasetVersion:
         self,
         source: str | PathLike[str] | typing.IO | bytes,
         filename: str | None = None,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: ProgressCallback | None = None,
+        checksum: str | None = None,
+        retries: int = 3,
+    ) -> DatasetFile:
+        """Create a new dataset file and add it to the dataset version.
+
+        The file is streamed to the storage by chunks, in a single PUT request sent again on transient failures. Large
+        files only use a resumable upload session if the upload URL is signed for it (see
+        openhexa.sdk.datasets.upload).
+
+        Parameters
+        ----------
+        source : str | PathLike[str] | typing.IO | bytes
+            The path of the file, a binary file object or bytes.
+        filename : str, optional
+            The name of the file in the dataset (required for file objects and bytes).
+        chunk_size : int
+            The size of the chunks read from the file and sent to the storage.
+        progress : ProgressCallback, optional
+            Called with the number of bytes sent so far and the size of the file (None if unknown) after each chunk.
+        checksum : str, optional
+            The checksum ("md5" or "crc32c") to compute while uploading and to verify against the storage response.
+        retries : int
+            The maximum number of consecutive retries on transient upload failures.
+        """
+        filename, mime_type = self._get_file_metadata(source, filename)
+
+        upload_url_result = graphql(GENERATE_UPLOAD_URL, self._file_input(filename, mime_type))
+        upload_url = self._get_upload_url(upload_url_result)
+        _upload(
+            upload_url,
+            source,
+            filename,
+            mime_type,
+            chunk_size=chunk_size,
+            progress=progress,
+            checksum=checksum,
+            retries=retries,
+        )
+
+        data = graphql(CREATE_VERSION_FILE, self._file_input(filename, mime_type))
+        return self._get_created_file(data)
+
+    def add_files(
+        self,
+        sources: typing.Iterable[str | PathLike[str] | tuple[str | PathLike[str] | typing.IO | bytes, str]],
+        max_concurrency: int = 16,
+    ) -> list[DatasetFile]:
+        """Add several files to the dataset version, uploading them in parallel.
+
+        Upload URLs are generated and files are registered in batches, using a single GraphQL request per batch of
+        files. Upload URLs are generated as uploads progress, about 2 × max_concurrency files ahead, so that they do not
+        expire before being used. Files are registered as soon as a batch of ADD_FILES_BATCH_SIZE of them is uploaded.
+
+        Parameters
+        ----------
+        sources : iterable
+            The files to add: paths, or (source, filename) tuples where source is a path, a file object or bytes.
+        max_concurrency : int
+            The maximum number of files uploaded at the same time.
+
+        Returns
+        -------
+        list[DatasetFile]
+            The added files, in the order of the sources.
+
+        Raises
+        ------
+        BulkUploadError
+            If some of the files could not be added (once all the other files have been added).
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        pending = []
+        for source in sources:
+            source, filename = source if isinstance(source, tuple) else (source, None)
+            pending.append((source, *self._get_file_metadata(source, filename)))
+
+        files = [None] * len(pending)
+        errors = {}
+        uploaded = []
+        total_size = 0
+        start = time.monotonic()
+
+        # Upload URLs are generated shortly before they are used (they expire): at most max_concurrency uploads are
+        # queued behind the running ones
+        url_batch_size = min(ADD_FILES_BATCH_SIZE, max_concurrency)
+        next_index = 0
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="dataset-upload") as executor:
+            uploads = {}
+            while uploads or next_index < len(pending):
+                while next_index < len(pending) and len(uploads) + url_batch_size <= 2 * max_concurrency:
+                    indexes = range(next_index, min(next_index + url_batch_size, len(pending)))
+                    next_index = indexes.stop
+                    results = _run_batch_mutation(
+                        "generateDatasetUploadUrl",
+                        "GenerateDatasetUploadUrlInput",
+                        "uploadUrl success errors",
+                        [self._file_input(*pending[i][1:])["input"] for i in indexes],
+                    )
+                    for index, result in zip(indexes, results):
+                        try:
+                            if isinstance(result, Exception):
+                                raise result
+                            upload_url = self._get_upload_url({"generateDatasetUploadUrl": result})
+                        except Exception as e:
+                            errors[index] = e
+                            continue
+                        uploads[executor.submit(_upload, upload_url, *pending[index])] = index
+                if uploads:
+                    done, _ = wait(uploads, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index = uploads.pop(future)
+                        try:
+                            total_size += future.result()
+                            uploaded.append(index)
+                        except Exception as e:
+                            errors[index] = e
+                # Also reached when the last batch of upload URLs failed, after the other files were uploaded
+                finished = not uploads and next_index >= len(pending)
+                while len(uploaded) >= ADD_FILES_BATCH_SIZE or (uploaded and finished):
+                    self._register_files(uploaded[:ADD_FILES_BATCH_SIZE], pending, files, errors)
+                    uploaded = uploaded[ADD_FILES_BATCH_SIZE:]
+
+        elapsed = time.monotonic() - start
+        print(
+            f"{get_timestamp()} Added {len(pending) - len(errors)} file(s) to dataset version {self.name} "
+            f"({total_size / 1024**2:.1f} MB in {elapsed:.1f}s, {total_size / 1024**2 / max(elapsed, 1e-6):.1f} MB/s)"
+            + (f", {len(errors)} failed" if errors else "")
+        )
+        if errors:
+            raise BulkUploadError(files, errors)
+
+        return files
+
+    def _register_files(self, indexes: list[int], pending: list[tuple], files: list, errors: dict[int, Exception]):
+        results = _run_batch_mutation(
+            "createDatasetVersionFile",
+            "CreateDatasetVersionFileInput",
+            f"file {{ {FILE_FIELDS} }} success errors",
+            [self._file_input(*pending[i][1:])["input"] for i in indexes],
+        )
+        for index, result in zip(indexes, results):
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                files[index] = self._get_created_file({"createDatasetVersionFile": result})
+            except Exception as e:
+                errors[index] = e
+
+    async def add_file_async(
+        self,
+        source: str | PathLike[str] | typing.IO | bytes,
+        filename: str | None = None,
     ) -> DatasetFile:
-        """Create a new dataset file and add it to the dataset version."""
+        """Create a new dataset file and add it to the dataset version, without blocking the event loop.
+
+        Files are uploaded by chunks of UPLOAD_CHUNK_SIZE bytes, read from disk in a worker thread, so that large files
+        are never loaded in memory at once.
+        """
+        filename, mime_type = self._get_file_metadata(source, filename)
+
+        upload_url_result = await graphql_async(GENERATE_UPLOAD_URL, self._file_input(filename, mime_type))
+        upload_url = self._get_upload_url(upload_url_result)
+        with read_content(source) as content:
+            headers = {"Content-Type": mime_type}
+            if isinstance(content, bytes):
+                body = content
+            elif not content.seekable():
+                body = await asyncio.to_thread(content.read)
+            else:
+                headers["Content-Length"] = str(await asyncio.to_thread(_remaining_size, content))
+                body = _iter_chunks_async(content)
+            async with _async_http_client() as client:
+                response = await client.put(upload_url, content=body, headers=headers)
+        response.raise_for_status()
+
+        data = await graphql_async(CREATE_VERSION_FILE, self._file_input(filename, mime_type))
+        return self._get_created_file(data)
+
+    @staticmethod
+    def _get_file_metadata(source: str | PathLike[str] | typing.IO | bytes, filename: str | None) -> tuple[str, str]:
         mime_type = None
         if isinstance(source, (str | PathLike)):
             path = Path(source)
@@ -243,67 +773,24 @@ class DatasetVersion:
         if mime_type is None:
             mime_type = "application/octet-stream"
 
-        upload_url_result = graphql(
-            """
-            mutation generateDatasetUploadUrl ($input: GenerateDatasetUploadUrlInput!) {
-                generateDatasetUploadUrl(input: $input) {
-                    uploadUrl
-                    success
-                    errors
-                }
-            }
-            """,
-            {"input": {"versionId": self.id, "contentType": mime_type, "uri": filename}},
-        )
+        return filename, mime_type
+
+    def _file_input(self, filename: str, mime_type: str) -> dict:
+        return {"input": {"versionId": self.id, "contentType": mime_type, "uri": filename}}
+
+    def _get_upload_url(self, upload_url_result: dict) -> str:
         if upload_url_result["generateDatasetUploadUrl"]["success"] is False:
             errors = upload_url_result["generateDatasetUploadUrl"]["errors"]
             self.raise_upload_exception(errors)
 
-        upload_url = upload_url_result["generateDatasetUploadUrl"]["uploadUrl"]
-        with read_content(source) as content:
-            response = requests.put(
-                upload_url, data=content, headers={"Content-Type": mime_type}, verify=Settings.verify_ssl()
-            )
-        response.raise_for_status()
-
-        data = graphql(
-            """
-                mutation CreateDatasetVersionFile ($input: CreateDatasetVersionFileInput!) {
-                    createDatasetVersionFile(input: $input) {
-                        file {
-                            id
-                            filename
-                            uri
-                            contentType
-                            createdAt
-                        }
-                        success
-                        errors
-                    }
-                }
-        """,
-            {
-                "input": {
-                    "versionId": self.id,
-                    "contentType": mime_type,
-                    "uri": filename,
-                }
-            },
-        )
+        return upload_url_result["generateDatasetUploadUrl"]["uploadUrl"]
 
+    def _get_created_file(self, data: dict) -> DatasetFile:
         if data["createDatasetVersionFile"]["success"] is False:
             errors = data["createDatasetVersionFile"]["errors"]
             self.raise_dataset_file_creation_exception(errors)
-        result = data["createDatasetVersionFile"]
 
-        return DatasetFile(
-            version=self,
-            id=result["file"]["id"],
-            filename=result["file"]["filename"],
-            content_type=result["file"]["contentType"],
-            uri=result["file"]["uri"],
-            created_at=result["file"]["createdAt"],
-        )
+        return self._build_file(data["createDatasetVersionFile"]["file"])
 
     def exists(self, objectKey: str):
         """
@@ -318,22 +805,13 @@ class DatasetVersion:
         -------
             bool: True if the object exists, False otherwise.
         """
-        data = graphql(
-            """
-            query getDatasetFile($versionId: ID!, $filename: String!) {
-                datasetVersion(id: $versionId) {
-                    fileByName(name: $filename) {
-                        id
-                        uri
-                        filename
-                        contentType
-                        createdAt
-                    }
-                }
-            }
-            """,
-            {"versionId": self.id, "filename": objectKey},
-        )
+        data = graphql(GET_FILE_BY_NAME, {"versionId": self.id, "filename": objectKey})
+
+        return data["datasetVersion"]["fileByName"] is not None
+
+    async def exists_async(self, objectKey: str) -> bool:
+        """Check if an object with the specified key exists, without blocking the event loop (see exists())."""
+        data = await graphql_async(GET_FILE_BY_NAME, {"versionId": self.id, "filename": objectKey})
 
         return data["datasetVersion"]["fileByName"] is not None
 
@@ -382,28 +860,15 @@ class Dataset:
 
     def create_version(self, name: typing.Any) -> DatasetVersion:
         """Build a dataset version, save it and return it."""
-        response = graphql(
-            """
-            mutation createDatasetVersion($input: CreateDatasetVersionInput!) {
-                createDatasetVersion(input: $input) {
-                    version {
-                        id
-                        name
-                        description
-                        createdAt
-                    }
-                    errors
-                    success
-                }
-            }
-        """,
-            {
-                "input": {
-                    "datasetId": self.id,
-                    "name": str(name),
-                }
-            },
-        )
+        response = graphql(CREATE_VERSION, {"input": {"datasetId": self.id, "name": str(name)}})
+        return self._set_created_version(response)
+
+    async def create_version_async(self, name: typing.Any) -> DatasetVersion:
+        """Build a dataset version, save it and return it, without blocking the event loop."""
+        response = await graphql_async(CREATE_VERSION, {"input": {"datasetId": self.id, "name": str(name)}})
+        return self._set_created_version(response)
+
+    def _set_created_version(self, response: dict) -> DatasetVersion:
         data = response["createDatasetVersion"]
         if data["success"] is False:
             if "DUPLICATE_NAME" in data["errors"]:
@@ -427,42 +892,74 @@ class Dataset:
         This property method will query the backend to try to fetch the latest version.
         """
         if self._latest_version is None:
-            data = graphql(
-                """
-                query getLatestVersion($datasetId: ID!) { 
-                    dataset(id: $datasetId) {
-                        latestVersion {
-                            id
-                            name
-                            createdAt
-                        }
-                    }
-                }
-            """,
-                {"datasetId": self.id},
-            )
+            self._set_latest_version(graphql(GET_LATEST_VERSION, {"datasetId": self.id}))
 
-            if data["dataset"]["latestVersion"] is None:
-                self._latest_version = None
-            else:
-                self._latest_version = DatasetVersion(
-                    dataset=self,
-                    id=data["dataset"]["latestVersion"]["id"],
-                    name=data["dataset"]["latestVersion"]["name"],
-                    created_at=data["dataset"]["latestVersion"]["createdAt"],
-                )
+        return self._latest_version
+
+    async def get_latest_version_async(self) -> DatasetVersion | None:
+        """Return the latest version, if any, without blocking the event loop (see latest_version)."""
+        if self._latest_version is None:
+            self._set_latest_version(await graphql_async(GET_LATEST_VERSION, {"datasetId": self.id}))
 
         return self._latest_version
 
+    def _set_latest_version(self, data: dict):
+        if data["dataset"]["latestVersion"] is None:
+            self._latest_version = None
+        else:
+            self._latest_version = DatasetVersion(
+                dataset=self,
+                id=data["dataset"]["latestVersion"]["id"],
+                name=data["dataset"]["latestVersion"]["name"],
+                created_at=data["dataset"]["latestVersion"]["createdAt"],
+            )
+
     @property
     def versions(self) -> VersionsIterator:
         """Build and return an iterator for versions."""
-        return VersionsIterator(dataset=self, per_page=10)
+        return self.list_versions()
+
+    def list_versions(self, per_page: int = 10, max_concurrency: int = 4) -> VersionsIterator:
+        """Build and return an iterator for versions.
+
+        Parameters
+        ----------
+        per_page : int
+            The number of versions fetched by request.
+        max_concurrency : int
+            The maximum number of pages fetched at the same time, ahead of the page being iterated over.
+        """
+        return VersionsIterator(dataset=self, per_page=per_page, max_concurrency=max_concurrency)
 
     def __repr__(self) -> str:
         """Safe representation of the dataset."""
         return f"<Dataset slug={self.slug} id={self.id} source_workspace_slug={self.source_workspace_slug}>"
 
 
+def _upload(
+    upload_url: str, source: str | PathLike[str] | typing.IO | bytes, filename: str, mime_type: str, **options
+) -> int:
+    """Stream a file to its upload URL (using the pooled connections of the process), and return its size."""
+    with read_content(source) as content:
+        return upload(
+            upload_url,
+            io.BytesIO(content) if isinstance(content, bytes) else content,
+            mime_type,
+            verify=Settings.verify_ssl(),
+            **options,
+        )
+
+
+def _iter_file_chunks(path: Path, chunk_size: int) -> typing.Iterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+async def _iter_chunks_async(content: typing.IO) -> typing.AsyncIterator[bytes]:
+    while chunk := await asyncio.to_thread(content.read, UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
 class FileNotFound(Exception):
     """Raised whenever an attempt is made to get a file that does not exist."""
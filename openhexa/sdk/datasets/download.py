@@ -0,0 +1,306 @@
+"""Streaming and ranged downloads of dataset files from their pre-signed download URL.
+
+Files are never loaded in memory as a whole: they are iterated over by chunks, written to disk as they are received,
+or read on demand through HTTP range requests. Downloads to disk are written to a temporary ".part" file, renamed
+once complete, so that an interrupted download never leaves a truncated file behind and can be resumed where it
+stopped (the identity of the file, its id and ETag, is stored next to the partial file, which is only resumed if it
+still matches). Large files are downloaded by several ranged requests in parallel.
+"""
+
+import io
+import json
+import os
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from openhexa.utils import get_shared_requests_session
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Files larger than this are downloaded by several ranged requests in parallel, of PART_SIZE bytes each
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+PART_SIZE = 16 * 1024 * 1024
+# Delay before the first retry of an interrupted download, in seconds (doubled on each retry)
+RETRY_BACKOFF = 1.0
+
+_TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+def iter_chunks(url: str, chunk_size: int = DEFAULT_CHUNK_SIZE, verify: bool = True) -> typing.Iterator[bytes]:
+    """Iterate over the content of a file by chunks of (at most) chunk_size bytes, as they are received.
+
+    The request is sent right away, so that HTTP errors are raised by this function rather than during iteration.
+    """
+    response = get_shared_requests_session(verify).get(url, stream=True)
+    try:
+        response.raise_for_status()
+    except requests.HTTPError:
+        response.close()
+        raise
+
+    return _iter_response(response, chunk_size)
+
+
+def _iter_response(response: requests.Response, chunk_size: int) -> typing.Iterator[bytes]:
+    with response:
+        yield from response.iter_content(chunk_size)
+
+
+def download(
+    url: str,
+    path: str | os.PathLike[str],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_concurrency: int = 8,
+    retries: int = 3,
+    verify: bool = True,
+    file_id: str | None = None,
+):
+    """Download a file to the provided path, resuming a previously interrupted download of the same file if any.
+
+    Parameters
+    ----------
+    url : str
+        The pre-signed download URL.
+    path : str | os.PathLike[str]
+        The path of the downloaded file.
+    chunk_size : int
+        The size of the chunks written to disk.
+    max_concurrency : int
+        The maximum number of ranged requests sent at the same time for files larger than PARALLEL_THRESHOLD.
+    retries : int
+        The maximum number of consecutive retries of an interrupted request.
+    verify : bool
+        Whether to verify SSL certificates.
+    file_id : str, optional
+        The id of the file, stored with its ETag next to partial files to check that they belong to the same file.
+    """
+    path = Path(path)
+    part_path = path.with_name(f"{path.name}.part")
+    identity_path = path.with_name(f"{path.name}.part.json")
+    session = get_shared_requests_session(verify)
+    size, etag = _get_size_and_etag(session, url)
+
+    identity = {"file_id": file_id, "etag": etag}
+    if part_path.exists() and (etag is None or _read_identity(identity_path) != identity):
+        # Leftover of the download of another file, or of another version of the file
+        part_path.unlink()
+    identity_path.write_text(json.dumps(identity))
+
+    if size is not None and size >= PARALLEL_THRESHOLD and max_concurrency > 1 and not part_path.exists():
+        _download_parallel(session, url, part_path, size, chunk_size, max_concurrency, retries)
+    else:
+        _download_sequential(session, url, part_path, size, etag, chunk_size, retries)
+
+    os.replace(part_path, path)
+    identity_path.unlink(missing_ok=True)
+
+
+def open_url(
+    url: str,
+    buffer_size: int = DEFAULT_CHUNK_SIZE,
+    verify: bool = True,
+    refresh_url: typing.Callable[[], str] | None = None,
+) -> io.BufferedReader:
+    """Open a file as a seekable binary file object, reading its content on demand through HTTP range requests.
+
+    The refresh_url function, if provided, is called to get a new URL when the storage rejects the current one
+    (pre-signed URLs expire, while files can be kept open for a long time).
+    """
+    session = get_shared_requests_session(verify)
+    size, _ = _get_size_and_etag(session, url)
+    if size is None:
+        raise OSError("The storage does not support range requests")
+
+    return io.BufferedReader(RangeFile(session, url, size, refresh_url=refresh_url), buffer_size=buffer_size)
+
+
+class RangeFile(io.RawIOBase):
+    """Read-only, seekable binary file object backed by HTTP range requests (one request per read).
+
+    Parameters
+    ----------
+    session : requests.Session
+        The session used to send the requests.
+    url : str
+        The URL of the file.
+    size : int
+        The size of the file.
+    refresh_url : typing.Callable, optional
+        Called to get a new URL when the storage rejects the current one (with a 403 response).
+    """
+
+    def __init__(
+        self, session: requests.Session, url: str, size: int, refresh_url: typing.Callable[[], str] | None = None
+    ):
+        super().__init__()
+        self.session = session
+        self.url = url
+        self.size = size
+        self.refresh_url = refresh_url
+        self._position = 0
+
+    def readable(self) -> bool:
+        """Return True: range files are readable."""
+        return True
+
+    def seekable(self) -> bool:
+        """Return True: range files are seekable."""
+        return True
+
+    def tell(self) -> int:
+        """Return the current position in the file."""
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Move to a new position in the file, and return it."""
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+
+        return position
+
+    def readinto(self, buffer) -> int:
+        """Read bytes into a pre-allocated buffer, and return the number of bytes read (0 at the end of the file)."""
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        end = min(self._position + len(buffer), self.size)
+        if end <= self._position:
+            return 0
+
+        headers = {"Range": f"bytes={self._position}-{end - 1}"}
+        response = self.session.get(self.url, headers=headers)
+        if response.status_code == 403 and self.refresh_url is not None:
+            self.url = self.refresh_url()
+            response = self.session.get(self.url, headers=headers)
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise OSError("The storage does not support range requests")
+        data = response.content
+        buffer[: len(data)] = data
+        self._position += len(data)
+
+        return len(data)
+
+
+def _get_size_and_etag(session: requests.Session, url: str) -> tuple[int | None, str | None]:
+    """Return the size of a file, or None if the storage does not support range requests, and its ETag if any."""
+    with session.get(url, headers={"Range": "bytes=0-0"}, stream=True) as response:
+        etag = response.headers.get("ETag")
+        # Range requests on empty files are not satisfiable ("Content-Range: bytes */0")
+        if response.status_code not in (206, 416):
+            response.raise_for_status()
+            return None, etag
+
+        return int(response.headers["Content-Range"].rpartition("/")[2]), etag
+
+
+def _read_identity(identity_path: Path) -> dict | None:
+    """Return the identity of the file a partial file belongs to, or None if it is unknown."""
+    try:
+        return json.loads(identity_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _download_sequential(
+    session: requests.Session,
+    url: str,
+    part_path: Path,
+    size: int | None,
+    etag: str | None,
+    chunk_size: int,
+    retries: int,
+):
+    failures = 0
+    while True:
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        if size is not None and offset > size:
+            # Leftover of the download of another file
+            part_path.unlink()
+            offset = 0
+        if part_path.exists() and offset == size:
+            return
+
+        try:
+            headers = {"Range": f"bytes={offset}-"} if offset > 0 and size is not None else {}
+            if headers and etag is not None:
+                # The storage sends the whole file instead of the range if the file changed in the meantime
+                headers["If-Range"] = etag
+            with session.get(url, headers=headers, stream=True) as response:
+                response.raise_for_status()
+                # Append to the partial file only if the storage honoured the range
+                with open(part_path, "ab" if response.status_code == 206 else "wb") as f:
+                    for chunk in response.iter_content(chunk_size):
+                        f.write(chunk)
+            if size is None or part_path.stat().st_size == size:
+                return
+            raise requests.exceptions.ChunkedEncodingError("The download ended before the end of the file")
+        except _TRANSIENT_ERRORS:
+            if part_path.exists() and part_path.stat().st_size > offset:
+                failures = 0
+            failures += 1
+            if failures > retries:
+                raise
+            time.sleep(RETRY_BACKOFF * 2 ** (failures - 1))
+
+
+def _download_parallel(
+    session: requests.Session,
+    url: str,
+    part_path: Path,
+    size: int,
+    chunk_size: int,
+    max_concurrency: int,
+    retries: int,
+):
+    with open(part_path, "wb") as f:
+        f.truncate(size)
+
+    ranges = [(start, min(start + PART_SIZE, size)) for start in range(0, size, PART_SIZE)]
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="dataset-download") as executor:
+            for _ in executor.map(
+                lambda part: _download_part(session, url, part_path, *part, chunk_size, retries), ranges
+            ):
+                pass
+    except BaseException:
+        # The partial file has holes, it cannot be resumed sequentially
+        part_path.unlink(missing_ok=True)
+        raise
+
+
+def _download_part(
+    session: requests.Session, url: str, part_path: Path, start: int, end: int, chunk_size: int, retries: int
+):
+    failures = 0
+    with open(part_path, "r+b") as f:
+        while start < end:
+            f.seek(start)
+            try:
+                with session.get(url, headers={"Range": f"bytes={start}-{end - 1}"}, stream=True) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise OSError("The storage does not support range requests")
+                    for chunk in response.iter_content(chunk_size):
+                        f.write(chunk[: end - start])
+                        start += len(chunk)
+                        failures = 0
+                if start < end:
+                    raise requests.exceptions.ChunkedEncodingError("The download ended before the end of the range")
+            except _TRANSIENT_ERRORS:
+                failures += 1
+                if failures > retries:
+                    raise
+                time.sleep(RETRY_BACKOFF * 2 ** (failures - 1))
@@ -0,0 +1,299 @@
+"""Streaming, chunked and resumable uploads of dataset files to their pre-signed upload URL.
+
+Files are never loaded in memory as a whole: they are read and sent by chunks. Files are sent by a single streamed PUT
+request, sent again from the start of the file on transient failures (when the file can be read again). This includes
+large files: the upload URLs generated by OpenHEXA are signed for PUT requests, and the signature of pre-signed URLs
+covers the HTTP method, so they cannot start a resumable upload session (a POST request).
+
+Only upload URLs signed for starting a Google Cloud Storage resumable session (V4 signatures with x-goog-resumable in
+their signed headers) are used to upload files larger than a chunk by a resumable session, so that a transient failure
+only requires sending again the data that was not persisted yet.
+"""
+
+import base64
+import hashlib
+import os
+import time
+import typing
+import warnings
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from openhexa.utils import get_shared_requests_session
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+# The chunks of resumable uploads (except the last one) must be a multiple of this size
+RESUMABLE_CHUNK_ALIGNMENT = 256 * 1024
+TRANSIENT_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+# Delay before the first retry of a failed request, in seconds (doubled on each retry)
+RETRY_BACKOFF = 1.0
+
+ProgressCallback = typing.Callable[[int, int | None], None]
+
+
+class UploadError(Exception):
+    """Raised when a file could not be uploaded."""
+
+
+class ChecksumMismatchError(UploadError):
+    """Raised when the checksum computed while uploading a file does not match the one of the stored object."""
+
+
+class _Checksum:
+    """Checksum of the uploaded data, computed on the fly and verified against the storage response."""
+
+    def __init__(self, algorithm: str):
+        if algorithm == "md5":
+            self._hash = hashlib.md5()
+        elif algorithm == "crc32c":
+            try:
+                import google_crc32c
+            except ImportError:
+                raise ImportError("CRC32C checksums require the google-crc32c package: pip install google-crc32c")
+            self._hash = google_crc32c.Checksum()
+        else:
+            raise ValueError(f'Unsupported checksum algorithm "{algorithm}" (supported algorithms: md5, crc32c)')
+        self.algorithm = algorithm
+
+    def update(self, data: bytes):
+        self._hash.update(data)
+
+    def verify(self, response: requests.Response):
+        """Compare the checksum to the one returned by the storage, if any."""
+        digest = self._hash.digest()
+        # Google Cloud Storage returns the checksums of the object as "x-goog-hash: crc32c=<base64>,md5=<base64>"
+        for value in response.headers.get("x-goog-hash", "").split(","):
+            name, _, expected = value.strip().partition("=")
+            if name == self.algorithm:
+                if base64.b64decode(expected) != digest:
+                    raise ChecksumMismatchError(f"The {self.algorithm} checksum of the uploaded file does not match")
+                return
+
+        # S3 (and compatible storages) return the MD5 digest of objects uploaded in a single part as their ETag
+        etag = response.headers.get("ETag", "").strip('"')
+        if self.algorithm == "md5" and len(etag) == 32:
+            if etag != digest.hex():
+                raise ChecksumMismatchError("The md5 checksum of the uploaded file does not match")
+            return
+
+        warnings.warn(f"The storage did not return the {self.algorithm} checksum of the file, it could not be verified")
+
+
+class _UploadBody:
+    """Request body reading the file by chunks, reporting progress and updating the checksum as chunks are sent."""
+
+    def __init__(
+        self,
+        source: typing.IO,
+        size: int | None,
+        chunk_size: int,
+        checksum: _Checksum | None,
+        progress: ProgressCallback | None,
+    ):
+        self.source = source
+        self.size = size
+        self.chunk_size = chunk_size
+        self.checksum = checksum
+        self.progress = progress
+        self.sent = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        while chunk := self.source.read(self.chunk_size):
+            if self.checksum is not None:
+                self.checksum.update(chunk)
+            yield chunk
+            self.sent += len(chunk)
+            if self.progress is not None:
+                self.progress(self.sent, self.size)
+
+
+def upload(
+    url: str,
+    source: typing.IO,
+    content_type: str,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: ProgressCallback | None = None,
+    checksum: str | None = None,
+    retries: int = 3,
+    verify: bool = True,
+) -> int:
+    """Upload the content of a binary file object to a pre-signed URL, from its current position.
+
+    Parameters
+    ----------
+    url : str
+        The pre-signed upload URL.
+    source : typing.IO
+        The binary file object to upload.
+    content_type : str
+        The MIME type of the file.
+    chunk_size : int
+        The size of the chunks read from the file (rounded down to a multiple of 256 KiB for resumable uploads).
+    progress : ProgressCallback, optional
+        Called with the number of bytes sent so far and the size of the file (None if it is unknown) after each chunk.
+    checksum : str, optional
+        The checksum to compute while uploading and to verify against the storage response ("md5" or "crc32c").
+    retries : int
+        The maximum number of consecutive retries on transient failures.
+    verify : bool
+        Whether to verify SSL certificates.
+
+    Returns
+    -------
+    int
+        The number of bytes uploaded.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    hasher = _Checksum(checksum) if checksum is not None else None
+    session = get_shared_requests_session(verify, retries=0)
+    size = _remaining_size(source) if source.seekable() else None
+
+    if size is not None and size > chunk_size and _is_signed_for_resumable_session(url):
+        session_url = _start_resumable_session(session, url, content_type)
+        if session_url is not None:
+            chunk_size = max(RESUMABLE_CHUNK_ALIGNMENT, chunk_size - chunk_size % RESUMABLE_CHUNK_ALIGNMENT)
+            return _upload_resumable(session, session_url, source, size, chunk_size, hasher, progress, retries)
+
+    return _upload_single(session, url, source, size, content_type, chunk_size, hasher, progress, retries)
+
+
+def _upload_single(
+    session: requests.Session,
+    url: str,
+    source: typing.IO,
+    size: int | None,
+    content_type: str,
+    chunk_size: int,
+    hasher: _Checksum | None,
+    progress: ProgressCallback | None,
+    retries: int,
+) -> int:
+    start = source.tell() if size is not None else None
+    attempt = 0
+    while True:
+        if hasher is not None:
+            hasher = _Checksum(hasher.algorithm)
+        body = _UploadBody(source, size, chunk_size, hasher, progress)
+        # Bodies of unknown size are sent using chunked transfer encoding
+        data = b"" if size == 0 else body if size is not None else iter(body)
+        try:
+            response = session.put(url, data=data, headers={"Content-Type": content_type})
+            error = _get_transient_error(response)
+            if error is None:
+                response.raise_for_status()
+                if hasher is not None:
+                    hasher.verify(response)
+                return body.sent
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+
+        # The file is sent again from the start, if it can be read again
+        attempt += 1
+        if start is None or attempt > retries:
+            raise error
+        time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+        source.seek(start)
+
+
+def _upload_resumable(
+    session: requests.Session,
+    session_url: str,
+    source: typing.IO,
+    size: int,
+    chunk_size: int,
+    hasher: _Checksum | None,
+    progress: ProgressCallback | None,
+    retries: int,
+) -> int:
+    start = source.tell()
+    offset = 0
+    failures = 0
+    while True:
+        source.seek(start + offset)
+        chunk = source.read(chunk_size)
+        try:
+            response = session.put(
+                session_url, data=chunk, headers={"Content-Range": f"bytes {offset}-{offset + len(chunk) - 1}/{size}"}
+            )
+            error = _get_transient_error(response)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            response, error = None, e
+
+        # On transient failures, ask the storage how much of the file it persisted, and resume from there
+        while error is not None:
+            failures += 1
+            if failures > retries:
+                raise error
+            time.sleep(RETRY_BACKOFF * 2 ** (failures - 1))
+            try:
+                response = session.put(session_url, headers={"Content-Range": f"bytes */{size}"})
+                error = _get_transient_error(response)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+        if response.status_code in (200, 201):
+            if hasher is not None:
+                hasher.update(chunk)
+                hasher.verify(response)
+            if progress is not None:
+                progress(size, size)
+            return size
+        if response.status_code != 308:
+            response.raise_for_status()
+            raise UploadError(f"Unexpected response from the storage ({response.status_code})")
+
+        persisted = _get_persisted_size(response)
+        if persisted < offset:
+            raise UploadError("The storage lost data of the resumable upload session")
+        if persisted > offset:
+            failures = 0
+            if hasher is not None:
+                hasher.update(chunk[: persisted - offset])
+            offset = persisted
+            if progress is not None:
+                progress(offset, size)
+
+
+def _get_transient_error(response: requests.Response) -> requests.HTTPError | None:
+    if response.status_code in TRANSIENT_STATUS_CODES:
+        return requests.HTTPError(f"{response.status_code} Server Error for url: {response.url}", response=response)
+    return None
+
+
+def _get_persisted_size(response: requests.Response) -> int:
+    # The "Range" header of 308 responses is "bytes=0-<last persisted byte>", and is absent if nothing was persisted
+    persisted_range = response.headers.get("Range")
+    if persisted_range is None:
+        return 0
+    return int(persisted_range.rpartition("-")[2]) + 1
+
+
+def _is_signed_for_resumable_session(url: str) -> bool:
+    """Return True if the URL is signed for starting a GCS resumable session, rather than for a PUT request."""
+    signed_headers = parse_qs(urlparse(url).query).get("X-Goog-SignedHeaders", [""])[0]
+    return "x-goog-resumable" in signed_headers.lower().split(";")
+
+
+def _start_resumable_session(session: requests.Session, url: str, content_type: str) -> str | None:
+    """Start a resumable upload session, and return its URL (None if the upload URL does not allow it)."""
+    try:
+        response = session.post(url, headers={"x-goog-resumable": "start", "Content-Type": content_type})
+    except (requests.ConnectionError, requests.Timeout):
+        return None
+    if response.status_code != 201:
+        return None
+    return response.headers.get("Location")
+
+
+def _remaining_size(source: typing.IO) -> int:
+    position = source.tell()
+    size = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return size - position
@@ -0,0 +1,81 @@
+"""Process-wide cache of the pre-signed download URLs of dataset files.
+
+Pre-signed URLs are valid for a limited time, stated in their query string. URLs are cached until shortly before they
+expire, so that all the DatasetFile instances of a file share the same URL, and a URL is never used after its expiry.
+"""
+
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlparse
+
+# URLs are refreshed this many seconds before they expire
+EXPIRY_MARGIN = 60
+# Validity assumed for URLs that do not state their expiry, in seconds
+DEFAULT_TTL = 300
+MAX_ENTRIES = 10_000
+
+
+def get_url_expiry(url: str) -> float | None:
+    """Return the expiry timestamp of a pre-signed URL, or None if it cannot be determined.
+
+    Supports the V4 signatures of Google Cloud Storage (X-Goog-Date and X-Goog-Expires) and S3 (X-Amz-Date and
+    X-Amz-Expires), and the V2 signatures of both ("Expires" timestamp).
+    """
+    params = {key.lower(): values[0] for key, values in parse_qs(urlparse(url).query).items()}
+    for prefix in ("x-goog-", "x-amz-"):
+        if f"{prefix}date" in params and f"{prefix}expires" in params:
+            try:
+                signed_at = datetime.datetime.strptime(params[f"{prefix}date"], "%Y%m%dT%H%M%SZ")
+                return signed_at.replace(tzinfo=datetime.UTC).timestamp() + int(params[f"{prefix}expires"])
+            except ValueError:
+                return None
+    if "expires" in params and params["expires"].isdigit():
+        return float(params["expires"])
+
+    return None
+
+
+class DownloadUrlCache:
+    """Thread-safe cache of download URLs by file id, evicting the oldest entries beyond max_entries."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_id: str) -> str | None:
+        """Return the URL of a file, if it is cached and does not expire within EXPIRY_MARGIN seconds."""
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if entry is None:
+                return None
+            url, expires_at = entry
+            if expires_at - EXPIRY_MARGIN <= time.time():
+                del self._entries[file_id]
+                return None
+
+            return url
+
+    def set(self, file_id: str, url: str):
+        """Cache the URL of a file."""
+        expires_at = get_url_expiry(url) or time.time() + DEFAULT_TTL
+        with self._lock:
+            self._entries[file_id] = (url, expires_at)
+            self._entries.move_to_end(file_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, file_id: str):
+        """Forget the URL of a file (when it was rejected by the storage for instance)."""
+        with self._lock:
+            self._entries.pop(file_id, None)
+
+    def clear(self):
+        """Forget all the URLs."""
+        with self._lock:
+            self._entries.clear()
+
+
+download_urls = DownloadUrlCache()
@@ -0,0 +1,177 @@
+"""Task result cache, allowing tasks to be skipped across pipeline runs when their code and inputs are unchanged."""
+
+import datetime
+import hashlib
+import inspect
+import os
+import pickle
+import time
+import typing
+
+from openhexa.sdk.utils import Settings
+from openhexa.utils import DiskCache
+
+from .stream import TaskStream
+from .transport import SpilledResult
+
+
+class TaskCache:
+    """Content-addressed cache of task results.
+
+    Entries are keyed on a hash of the task function source code and of its inputs. They are stored as pickle files
+    in a size-bounded cache directory, the least recently used entries being evicted first.
+
+    Parameters
+    ----------
+    directory : str
+        The cache directory.
+    max_size : int
+        The maximum total size of the cache, in bytes.
+    """
+
+    def __init__(self, directory: str, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+
+    @classmethod
+    def from_settings(cls) -> "TaskCache":
+        """Build a task cache using the location and size from the settings.
+
+        The cache lives in the workspace files directory by default, so that it persists across runs.
+        """
+        from openhexa.sdk.workspaces import workspace
+
+        directory = Settings.task_cache_path() or os.path.join(workspace.files_path, ".cache", "openhexa", "tasks")
+
+        return cls(directory, max_size=Settings.task_cache_max_size())
+
+    def get(self, key: str, ttl: int | None = None) -> tuple[bool, typing.Any]:
+        """Look up the result stored for the provided key.
+
+        Parameters
+        ----------
+        key : str
+            The cache key, as returned by get_task_cache_key().
+        ttl : int, optional
+            The maximum age of the entry, in seconds.
+
+        Returns
+        -------
+        tuple[bool, typing.Any]
+            A (hit, result) tuple.
+        """
+        disk_cache = DiskCache(self.directory, self.max_size)
+        path = disk_cache.get(key)
+        if path is None:
+            return False, None
+
+        try:
+            with open(path, "rb") as f:
+                created_at = pickle.load(f)
+                if ttl is not None and time.time() - created_at > ttl:
+                    return False, None
+                return True, pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):  # Evicted or partially written by another process
+            return False, None
+
+    def put(self, key: str, result: typing.Any):
+        """Store the result for the provided key (results that cannot be pickled are not cached)."""
+
+        def write(f):
+            pickle.dump(time.time(), f)
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        try:
+            DiskCache(self.directory, self.max_size).put(key, write)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            print(f"Result could not be cached: {e}")
+
+
+def get_task_cache_key(
+    function: typing.Callable,
+    args: typing.Sequence[typing.Any],
+    kwargs: dict[str, typing.Any],
+    variant: str = "",
+) -> str | None:
+    """Build a stable cache key for a task from its function source code and its resolved inputs.
+
+    Spilled results are hashed using the content of their spill file rather than their (random) location, and sets
+    are hashed independently of the order of their elements (which depends on PYTHONHASHSEED).
+
+    Parameters
+    ----------
+    function : typing.Callable
+        The task function.
+    args : typing.Sequence[typing.Any]
+        The resolved positional arguments.
+    kwargs : dict[str, typing.Any]
+        The resolved keyword arguments.
+    variant : str
+        Distinguishes work items that call the same function with the same inputs but return different results (e.g.
+        a map task chunk and a plain task, see TaskWorkItem.get_key()).
+
+    Returns
+    -------
+    str | None
+        The hexadecimal key, or None if the inputs cannot be hashed (for instance if they cannot be pickled).
+    """
+    h = hashlib.sha256()
+    h.update(f"{variant}\0{function.__module__}.{function.__qualname__}".encode())
+    try:
+        h.update(inspect.getsource(function).encode())
+    except (OSError, TypeError):
+        h.update(function.__code__.co_code)
+
+    try:
+        for value in args:
+            _hash_value(h, value)
+        for name, value in sorted(kwargs.items()):
+            h.update(f"\0{name}=".encode())
+            _hash_value(h, value)
+    except Exception:  # NOQA
+        return None
+
+    return h.hexdigest()
+
+
+def _hash_value(h: "hashlib._Hash", value: typing.Any):
+    if isinstance(value, TaskStream):
+        raise TypeError("Task streams cannot be hashed")
+    elif isinstance(value, SpilledResult):
+        h.update(value.kind.encode())
+        with open(value.path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+    else:
+        h.update(pickle.dumps(_normalize(value), protocol=4))
+
+
+class _SortedSet(tuple):
+    """Elements of a set or frozenset, in a deterministic order."""
+
+
+def _normalize(value: typing.Any) -> typing.Any:
+    """Replace sets (possibly nested in lists, tuples and dicts) by their sorted elements.
+
+    The pickle of a set depends on the iteration order of its elements, which varies across interpreters with
+    PYTHONHASHSEED.
+    """
+    if isinstance(value, (set, frozenset)):
+        elements = [_normalize(element) for element in value]
+        return _SortedSet([type(value).__name__, *sorted(elements, key=lambda e: pickle.dumps(e, protocol=4))])
+    elif type(value) in (list, tuple):
+        return type(value)(_normalize(element) for element in value)
+    elif type(value) is dict:
+        return {key: _normalize(element) for key, element in value.items()}
+
+    return value
+
+
+def validate_cache_ttl(cache_ttl: int | datetime.timedelta | None) -> int | None:
+    """Validate the cache TTL and return it as a number of seconds."""
+    if isinstance(cache_ttl, datetime.timedelta):
+        cache_ttl = int(cache_ttl.total_seconds())
+    if cache_ttl is not None and (not isinstance(cache_ttl, int) or cache_ttl <= 0):
+        raise ValueError(f"Invalid cache_ttl {cache_ttl!r}, expected a positive number of seconds or a timedelta")
+
+    return cache_ttl
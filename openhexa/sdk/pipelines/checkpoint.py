@@ -0,0 +1,97 @@
+"""Per-task checkpoints, allowing a failed pipeline run to be resumed without re-executing completed tasks."""
+
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+
+from openhexa.sdk.utils import Settings
+
+from .task import TaskCom, TaskWorkItem
+from .transport import SpilledResult
+
+
+class RunCheckpoints:
+    """Store the results of finished tasks for the current run, and restore them from a previous run.
+
+    Checkpoints are keyed on the task function source code and on its inputs (see get_task_cache_key()), so that
+    only tasks whose code and inputs are unchanged are restored when resuming.
+
+    Parameters
+    ----------
+    directory : str
+        The base checkpoint directory (each run has its own sub-directory).
+    run_id : str
+        The identifier of the current run.
+    resume_from : str, optional
+        The identifier of the run to resume from.
+    """
+
+    def __init__(self, directory: str, run_id: str, resume_from: str | None = None):
+        self.directory = directory
+        self.run_id = run_id
+        self.resume_from = resume_from
+
+    @classmethod
+    def from_settings(cls, run_id: str, resume_from: str | None = None) -> "RunCheckpoints":
+        """Build run checkpoints stored in the workspace files directory (or in HEXA_CHECKPOINT_PATH)."""
+        from openhexa.sdk.workspaces import workspace
+
+        directory = Settings.checkpoint_path() or os.path.join(
+            workspace.files_path, ".cache", "openhexa", "checkpoints"
+        )
+
+        return cls(directory, run_id, resume_from)
+
+    @property
+    def run_path(self) -> Path:
+        """The checkpoint directory of the current run."""
+        return Path(self.directory) / self.run_id
+
+    def restore(self, key: str) -> TaskCom | None:
+        """Return the checkpointed task outcome for the provided key in the run to resume from, if any.
+
+        Restored checkpoints are also recorded for the current run, so that it can in turn be resumed.
+        """
+        if self.resume_from is None:
+            return None
+
+        path = Path(self.directory) / self.resume_from / f"{key}.pkl"
+        try:
+            with open(path, "rb") as f:
+                task_com = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        if self.resume_from != self.run_id:
+            self.save(key, task_com)
+
+        return task_com
+
+    def save(self, key: str, task_com: TaskCom):
+        """Record the outcome of a finished task.
+
+        Spilled results are copied next to the checkpoint, and restored as spilled results pointing to the copy.
+        """
+        self.run_path.mkdir(parents=True, exist_ok=True)
+        checkpoint = TaskCom(task_com)
+        if isinstance(task_com.result, SpilledResult):
+            spill_path = self.run_path / f"{key}{Path(task_com.result.path).suffix}"
+            if Path(task_com.result.path) != spill_path:
+                shutil.copyfile(task_com.result.path, spill_path)
+            checkpoint.result = SpilledResult(str(spill_path), task_com.result.kind, task_com.result.size)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.run_path, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.run_path / f"{key}.pkl")
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            Path(tmp_path).unlink(missing_ok=True)
+            print(f"Task result could not be checkpointed: {e}")
+
+
+def get_checkpoint_key(work_item: TaskWorkItem) -> str | None:
+    """Return the checkpoint key of a work item (None if its inputs cannot be hashed)."""
+    return work_item.get_key()
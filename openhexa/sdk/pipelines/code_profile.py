@@ -0,0 +1,167 @@
+"""Opt-in profiling of the code of pipeline runs.
+
+When HEXA_PROFILE is set to "cpu" or "memory", the pipeline function and each task are profiled, without any change
+to the pipeline code:
+
+- "cpu": the code is run under cProfile, and the statistics are written as a .pstats file (to be loaded with the
+  pstats module, or visualized with snakeviz for instance).
+- "memory": allocations are traced with tracemalloc, and the memory allocated by the code and still in use when it
+  finishes is written by allocation stack, as a .collapsed file (the "collapsed stacks" format of flamegraph.pl and
+  speedscope).
+
+Files are written to the directory of the run profile (see get_profile_path()), one per task execution, and
+summarize() returns the top functions (or allocation sites) of all the files of a directory.
+"""
+
+import contextlib
+import cProfile
+import pstats
+import re
+import threading
+import tracemalloc
+import typing
+import uuid
+from collections import Counter
+from pathlib import Path
+
+CPU = "cpu"
+MEMORY = "memory"
+MODES = (CPU, MEMORY)
+
+# Number of frames stored by tracemalloc for each allocation
+TRACEMALLOC_FRAMES = 32
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_started = False
+
+
+def validate_mode(mode: str | None) -> str | None:
+    """Validate the profiling mode."""
+    if mode is not None and mode not in MODES:
+        raise ValueError(f"Invalid profiling mode: {mode} (valid modes: {', '.join(MODES)})")
+
+    return mode
+
+
+class CodeProfiler:
+    """Picklable profiler, sent to worker processes along with work items.
+
+    Parameters
+    ----------
+    mode : str
+        The profiling mode ("cpu" or "memory").
+    directory : str
+        The directory where the profiles are written.
+    """
+
+    def __init__(self, mode: str, directory: str):
+        self.mode = validate_mode(mode)
+        self.directory = directory
+
+    def profile(self, name: str) -> typing.ContextManager:
+        """Profile the code run in the context, and write its profile to a file named after the provided name.
+
+        In "cpu" mode, only the current thread is profiled. As Python 3.12+ only allows one active profiler at a
+        time, code run while another task is profiled (by the thread executor for instance) is not profiled.
+        In "memory" mode, allocations are traced for the whole process: the profiles of tasks running at the same
+        time in the same process include each other's allocations.
+        """
+        path = Path(self.directory) / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}-{uuid.uuid4().hex[:8]}"
+        if self.mode == CPU:
+            return _profile_cpu(path.with_name(f"{path.name}.pstats"))
+
+        return _profile_memory(path.with_name(f"{path.name}.collapsed"))
+
+
+@contextlib.contextmanager
+def _profile_cpu(path: Path):
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # Another profiler is active
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(path)
+
+
+@contextlib.contextmanager
+def _profile_memory(path: Path):
+    global _tracemalloc_users, _tracemalloc_started
+
+    with _tracemalloc_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            _tracemalloc_started = True
+        _tracemalloc_users += 1
+    start = _take_snapshot()
+
+    try:
+        yield
+    finally:
+        end = _take_snapshot()
+        with _tracemalloc_lock:
+            _tracemalloc_users -= 1
+            # Only stop tracing if it was not started by the pipeline code itself
+            if _tracemalloc_users == 0 and _tracemalloc_started:
+                tracemalloc.stop()
+                _tracemalloc_started = False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            for stat in end.compare_to(start, "traceback"):
+                if stat.size_diff > 0:
+                    stack = ";".join(f"{frame.filename}:{frame.lineno}" for frame in stat.traceback)
+                    f.write(f"{stack} {stat.size_diff}\n")
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def summarize(directory: str | Path, top: int = 20) -> str:
+    """Return a summary of the profiles written to the directory (and its sub-directories).
+
+    The summary lists the top functions by own time for CPU profiles, and the top allocation sites by allocated
+    size for memory profiles. An empty string is returned if there is no profile in the directory.
+    """
+    lines = []
+    stats_paths = sorted(Path(directory).rglob("*.pstats"))
+    if stats_paths:
+        stats = pstats.Stats(*(str(path) for path in stats_paths))
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+        lines.append(f"Top {len(rows)} functions by own time ({len(stats_paths)} profiles)")
+        lines.append(f"{'own time':>10} {'cumulative':>10} {'calls':>9}  function")
+        for (filename, lineno, function), (_, calls, own_time, cumulative_time, _) in rows:
+            lines.append(f"{own_time:9.3f}s {cumulative_time:9.3f}s {calls:>9}  {function} ({filename}:{lineno})")
+
+    collapsed_paths = sorted(Path(directory).rglob("*.collapsed"))
+    if collapsed_paths:
+        sizes = Counter()
+        for path in collapsed_paths:
+            with open(path) as f:
+                for line in f:
+                    stack, _, size = line.rstrip("\n").rpartition(" ")
+                    sizes[stack.rpartition(";")[2]] += int(size)
+        if lines:
+            lines.append("")
+        lines.append(f"Top {min(top, len(sizes))} allocation sites by allocated size ({len(collapsed_paths)} profiles)")
+        for site, size in sizes.most_common(top):
+            lines.append(f"{_format_size(size):>10}  {site}")
+
+    return "\n".join(lines)
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+    return f"{size:.1f} GiB"
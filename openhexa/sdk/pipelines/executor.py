@@ -0,0 +1,198 @@
+"""Executor backends used to run pipeline tasks.
+
+All backends expose the subset of the ``multiprocess.Pool`` interface used by the pipeline scheduler
+(``apply_async()`` with ``callback`` / ``error_callback``, and the context manager protocol).
+"""
+
+import importlib
+import os
+import queue
+import typing
+
+from multiprocess import get_all_start_methods, get_context  # NOQA
+from multiprocess.pool import ThreadPool  # NOQA
+
+PROCESS = "process"
+THREAD = "thread"
+INLINE = "inline"
+
+EXECUTORS = (PROCESS, THREAD, INLINE)
+
+# Modules imported by every worker process, in addition to the modules preloaded by the pipeline
+DEFAULT_PRELOAD = ["openhexa.sdk"]
+
+
+class InlinePool:
+    """Pool-like executor running tasks synchronously in the calling thread.
+
+    No worker is started, which makes this executor well suited for tests and tiny pipelines.
+    """
+
+    def apply_async(
+        self,
+        func: typing.Callable,
+        args: typing.Sequence = (),
+        kwds: dict[str, typing.Any] | None = None,
+        callback: typing.Callable | None = None,
+        error_callback: typing.Callable | None = None,
+    ):
+        """Run the provided function immediately and call the relevant callback with its outcome."""
+        try:
+            result = func(*args, **(kwds or {}))
+        except Exception as e:
+            if error_callback is not None:
+                error_callback(e)
+        else:
+            if callback is not None:
+                callback(result)
+
+    def terminate(self):
+        """Do nothing, as there is no worker to stop."""
+        pass
+
+    def __enter__(self):
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *args):
+        """Exit the context manager."""
+        self.terminate()
+
+
+def validate_executor(executor: str) -> str:
+    """Make sure that the provided executor name is supported and return it.
+
+    Raises
+    ------
+    ValueError
+        If the executor is not one of "process", "thread" or "inline".
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Invalid executor {executor!r}, expected one of: {', '.join(EXECUTORS)}")
+
+    return executor
+
+
+def validate_max_workers(max_workers: int | None) -> int | None:
+    """Make sure that the provided maximum number of workers is either None or a positive integer and return it."""
+    if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+        raise ValueError(f"Invalid max_workers {max_workers!r}, expected a positive integer")
+
+    return max_workers
+
+
+def default_max_workers(width: int) -> int:
+    """Return the default pool size for a task graph of the given width: min(number of CPUs, width)."""
+    return max(1, min(os.cpu_count() or 1, width))
+
+
+def validate_preload(preload: typing.Sequence[str] | None) -> list[str]:
+    """Make sure that the provided preload option is a list of module names and return it."""
+    if preload is None:
+        return []
+    if isinstance(preload, str) or not all(isinstance(module, str) and module for module in preload):
+        raise ValueError(f"Invalid preload {preload!r}, expected a list of module names")
+
+    return list(preload)
+
+
+def preload_modules(modules: typing.Sequence[str]):
+    """Import the provided modules, warning about the ones that cannot be imported (used as pool initializer).
+
+    With the forkserver start method, the modules have already been imported by the server process and this is a
+    no-op. Otherwise, this makes sure that the modules are imported before the first task, rather than during it.
+    """
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            print(f"Module {module} could not be preloaded: {e}")
+
+
+def create_pool(executor: str, max_workers: int, preload: typing.Sequence[str] = ()):
+    """Create the pool-like object corresponding to the provided executor name.
+
+    Worker processes are forked from a forkserver process when the platform supports it. The server imports the
+    SDK and the preloaded modules once, so that workers start warm instead of importing them again. The spawn start
+    method is used as a fallback.
+
+    Parameters
+    ----------
+    executor : str
+        "process" (worker processes), "thread" (worker threads, for I/O-bound tasks) or "inline" (no pool).
+    max_workers : int
+        The maximum number of workers in the pool (ignored by the inline executor).
+    preload : typing.Sequence[str], optional
+        The modules to import in worker processes before they run any task.
+    """
+    validate_executor(executor)
+    if executor == PROCESS:
+        modules = list(dict.fromkeys([*DEFAULT_PRELOAD, *preload]))
+        if "forkserver" in get_all_start_methods():
+            context = get_context("forkserver")
+            context.set_forkserver_preload(modules)
+        else:
+            context = get_context("spawn")
+        return context.Pool(processes=max_workers, initializer=preload_modules, initargs=(modules,))
+    elif executor == THREAD:
+        return ThreadPool(processes=max_workers)
+
+    return InlinePool()
+
+
+class PoolGroup:
+    """Set of pools, one per executor backend, created lazily the first time a task needs them.
+
+    Parameters
+    ----------
+    default_executor : str
+        The executor used for tasks that do not specify one.
+    max_workers : int
+        The maximum number of workers of each pool.
+    preload : typing.Sequence[str], optional
+        The modules to import in worker processes before they run any task.
+    """
+
+    def __init__(self, default_executor: str, max_workers: int, preload: typing.Sequence[str] = ()):
+        self.default_executor = validate_executor(default_executor)
+        self.max_workers = max_workers
+        self.preload = list(preload)
+        self._pools = {}
+        self._manager = None
+
+    def get(self, executor: str | None = None):
+        """Return the pool for the provided executor (or the default executor), creating it if needed."""
+        executor = executor or self.default_executor
+        if executor not in self._pools:
+            self._pools[executor] = create_pool(executor, self.max_workers, preload=self.preload)
+
+        return self._pools[executor]
+
+    def create_queue(self, executor: str | None = None, maxsize: int = 0) -> queue.Queue:
+        """Create a queue that can be shared with the tasks run by the provided executor.
+
+        Tasks running in worker processes need a queue served by a multiprocess manager (started on first use).
+        """
+        if (executor or self.default_executor) == PROCESS:
+            if self._manager is None:
+                self._manager = get_context("spawn").Manager()
+            return self._manager.Queue(maxsize)
+
+        return queue.Queue(maxsize)
+
+    def terminate(self):
+        """Stop the workers of all the pools that have been created."""
+        for pool in self._pools.values():
+            pool.terminate()
+        self._pools = {}
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def __enter__(self):
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *args):
+        """Exit the context manager, stopping all workers."""
+        self.terminate()
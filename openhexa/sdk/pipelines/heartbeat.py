@@ -31,9 +31,12 @@ class HeartbeatThread(threading.Thread):
 
     def run(self):
         """Send heartbeats periodically until stopped."""
+        client = None
         while not self.stop_event.is_set():
             try:
-                result = OpenHexaClient().update_pipeline_heartbeat()
+                # The client (and its pooled connection) is reused for all the heartbeats
+                client = client or OpenHexaClient()
+                result = client.update_pipeline_heartbeat()
                 if result.success:
                     print(f"{get_timestamp()} Heartbeat sent successfully")
                 else:
@@ -5,22 +5,39 @@ https://github.com/BLSQ/openhexa/wiki/Writing-OpenHEXA-pipelines for more inform
 """
 
 import argparse
+import contextlib
+import datetime
 import json
 import os
+import shutil
 import sys
-import time
 import typing
+import uuid
 from logging import getLogger
 from pathlib import Path
 
-import requests
-from multiprocess import get_context  # NOQA
-
 from openhexa.sdk.utils import Environment, Settings, get_environment, get_timestamp
-
+from openhexa.sdk.workspaces import workspace
+from openhexa.utils import get_shared_requests_session
+
+from .checkpoint import RunCheckpoints
+from .code_profile import MODES as PROFILE_MODES
+from .code_profile import CodeProfiler
+from .executor import (
+    PROCESS,
+    PoolGroup,
+    default_max_workers,
+    validate_executor,
+    validate_max_workers,
+    validate_preload,
+)
 from .heartbeat import heartbeat_manager
 from .parameter import FunctionWithParameter, Parameter, ParameterValueError
-from .task import PipelineWithTask, Task
+from .profile import RunProfile, get_profile_path
+from .scheduler import TaskFailedError, TaskScheduler, get_graph_width
+from .task import PipelineWithTask
+from .telemetry import telemetry, telemetry_manager
+from .transport import ResultTransport, load_result
 from .utils import get_local_workspace_config
 
 logger = getLogger(__name__)
@@ -43,6 +60,18 @@ class Pipeline:
         The timeout in seconds after which the pipeline will be killed.
     functional_type : str
         The functional type of the pipeline (extraction, transformation, loading, computation).
+    max_workers : int
+        The maximum number of workers used to run tasks (defaults to min(number of CPUs, width of the task graph)).
+    executor : str
+        The executor backend used to run tasks: "process" (default), "thread" or "inline".
+    checkpoint : bool
+        Whether to checkpoint the result of each finished task, so that failed runs can be resumed.
+    preload : typing.Sequence[str]
+        The modules to import once in worker processes, before they run any task.
+    profile : bool
+        Whether to write the performance profile of the runs (see Pipeline.run()).
+    profile_output : bool
+        Whether to add the performance profile of the runs as run outputs.
     """
 
     def __init__(
@@ -52,17 +81,80 @@ class Pipeline:
         parameters: typing.Sequence[Parameter],
         timeout: int = None,
         functional_type: str = None,
+        max_workers: int = None,
+        executor: str = PROCESS,
+        checkpoint: bool = False,
+        preload: typing.Sequence[str] = None,
+        profile: bool = False,
+        profile_output: bool = False,
     ):
         self.name = name
         self.function = function
         self.parameters = parameters
         self.timeout = timeout
         self.functional_type = functional_type
+        self.max_workers = validate_max_workers(max_workers)
+        self.executor = validate_executor(executor)
+        self.checkpoint = checkpoint
+        self.preload = validate_preload(preload)
+        self.profile = profile
+        self.profile_output = profile_output
         self.tasks = []
 
-    def task(self, function) -> PipelineWithTask:
+    def task(
+        self,
+        function: typing.Callable = None,
+        *,
+        executor: str = None,
+        cpus: int = 1,
+        cache: bool = False,
+        cache_ttl: int | datetime.timedelta = None,
+        retries: int = 0,
+        retry_backoff: float = 1,
+        timeout: float = None,
+        buffer_size: int = 8,
+    ) -> PipelineWithTask | typing.Callable[[typing.Callable], PipelineWithTask]:
         """Task decorator.
 
+        The decorator can be used as is, or called with scheduling, caching and retry options.
+
+        If the decorated function is a generator function, the chunks it yields are streamed to its downstream task
+        (which receives an iterable instead of a list of chunks), so that the downstream task starts as soon as the
+        generator is started. Generator tasks run on a dedicated thread, can only have one downstream task, and
+        cannot be cached, retried or timed out.
+
+        Parameters
+        ----------
+        function : typing.Callable
+            The task function (provided implicitly when using the decorator without arguments).
+        executor : str, optional
+            The executor backend used for this task ("process", "thread" or "inline"). Defaults to the pipeline
+            executor. I/O-bound tasks (API calls, downloads) typically benefit from the "thread" executor, as they avoid
+            process startup and pickling costs.
+        cpus : int, optional
+            The number of CPUs reserved for the task when it runs in a worker process (default: 1). The scheduler
+            will not start more process tasks than there are workers in the pool, counting each task as many times as
+            its number of CPUs.
+        cache : bool, optional
+            Whether to cache the task results across runs (default: False). Results are keyed on the source code of
+            the task function and on its inputs: when both are unchanged, the cached result is used instead of
+            executing the task. The cache is stored in the workspace files directory (or in HEXA_TASK_CACHE_PATH)
+            and its size is bounded by HEXA_TASK_CACHE_MAX_SIZE (5 GiB by default).
+        cache_ttl : int | datetime.timedelta, optional
+            The maximum age of cached results, in seconds (cached results never expire by default).
+        retries : int, optional
+            The number of times the task is retried when it fails or times out (default: 0). Once all retries are
+            exhausted, the pipeline run fails: tasks that have not started are skipped and running tasks are cancelled.
+        retry_backoff : float, optional
+            The delay before the first retry, in seconds (default: 1). The delay doubles after each retry.
+        timeout : float, optional
+            The maximum duration of each attempt, in seconds (not enforced for tasks run by the "inline" executor).
+            The outcome of an attempt that timed out is ignored, but the attempt itself cannot be interrupted: when
+            retried, it keeps running in the background until it ends or until the run ends.
+        buffer_size : int, optional
+            For generator tasks, the maximum number of chunks waiting to be consumed by the downstream task (default:
+            8). The generator is paused when the buffer is full.
+
         Examples
         --------
         >>> @pipeline("my-pipeline")
@@ -70,41 +162,134 @@ class Pipeline:
         ...     result_1 = task1()
         ...     task2(result_1)
         ...
-        ... @my_pipeline.task
+        ... @my_pipeline.task(executor="thread", cache=True, cache_ttl=datetime.timedelta(days=7))
         ... def task_1() -> int:
         ...     return 42
         ...
-        ... @my_pipeline.task
+        ... @my_pipeline.task(executor="process", cpus=2, retries=3, timeout=3600)
         ... def task_2(foo: int):
         ...     pass
         """
-        return PipelineWithTask(function, self)
+        options = {
+            "executor": executor,
+            "cpus": cpus,
+            "cache": cache,
+            "cache_ttl": cache_ttl,
+            "retries": retries,
+            "retry_backoff": retry_backoff,
+            "timeout": timeout,
+            "buffer_size": buffer_size,
+        }
+        if function is None:
+            return lambda f: PipelineWithTask(f, self, **options)
 
-    def run(self, config: dict[str, typing.Any]):
+        return PipelineWithTask(function, self, **options)
+
+    def run(
+        self,
+        config: dict[str, typing.Any],
+        max_workers: int = None,
+        executor: str = None,
+        checkpoint: bool = None,
+        resume_from: str = None,
+        profile: bool = None,
+        profile_output: bool = None,
+    ):
         """Run the pipeline using the provided config.
 
         Parameters
         ----------
         config : typing.Dict[str, typing.Any]
             The parameter values to use for this pipeline run.
+        max_workers : int, optional
+            Overrides the maximum number of workers defined on the pipeline.
+        executor : str, optional
+            Overrides the executor backend defined on the pipeline ("process", "thread" or "inline").
+        checkpoint : bool, optional
+            Overrides the checkpoint option defined on the pipeline.
+        resume_from : str, optional
+            The identifier of a previous (checkpointed) run to resume from: tasks whose code and inputs are unchanged
+            since that run are not executed again, their checkpointed results are used instead. Implies checkpoint.
+        profile : bool, optional
+            Overrides the profile option defined on the pipeline. Profiled runs record the queue wait, wall time, CPU
+            time, memory, pickled input and output sizes and retries of each task, and write them to
+            profiles/<run id>/ in the workspace tmp directory, as JSON (profile.json) and as a Chrome trace
+            (trace.json, to be opened in https://ui.perfetto.dev for instance).
+        profile_output : bool, optional
+            Overrides the profile_output option defined on the pipeline. If enabled, the profile files are copied to
+            the workspace files directory and added as run outputs. Implies profile.
+
+        When the HEXA_PROFILE environment variable is set to "cpu" or "memory", the code of the pipeline function
+        and of each task is also profiled, with cProfile or tracemalloc, and the profiles are written to the same
+        directory (see openhexa.sdk.pipelines.code_profile). Other values are ignored, with a warning.
         """
         from .run import current_run
 
+        max_workers = validate_max_workers(max_workers) or self.max_workers
+        executor = validate_executor(executor or self.executor)
+        run_id = os.environ.get("HEXA_RUN_ID", uuid.uuid4().hex)
+        profile_output = profile_output if profile_output is not None else self.profile_output
+        run_profile = None
+        if profile_output or (profile if profile is not None else self.profile):
+            run_profile = RunProfile(self.name, run_id)
+        profiler = None
+        profile_mode = Settings.profile_mode()
+        if profile_mode is not None and profile_mode not in PROFILE_MODES:
+            # Profiling is a diagnostics option: an invalid value must not fail the run
+            logger.warning(
+                "Invalid HEXA_PROFILE value %r (valid values: %s), code profiling is disabled",
+                profile_mode,
+                ", ".join(PROFILE_MODES),
+            )
+            profile_mode = None
+        if profile_mode is not None:
+            profiler = CodeProfiler(profile_mode, str(get_profile_path(run_id)))
+        checkpoints = None
+        if resume_from is not None or (checkpoint if checkpoint is not None else self.checkpoint):
+            checkpoints = RunCheckpoints.from_settings(run_id, resume_from=resume_from)
+
         print(f'{get_timestamp()} Starting pipeline "{self.name}"')
 
         # Validate / default parameters
         validated_config = self._validate_config(config)
 
-        with heartbeat_manager(current_run, interval=30):
+        with heartbeat_manager(current_run, interval=30), telemetry_manager(current_run):
             # Execute pipeline function
-            self.function(**validated_config)
-            # Execute tasks using Pool's built-in context manager
-            context = get_context("spawn")
-            with context.Pool() as pool:  # FIXME: set max size of pool
-                self._execute_tasks(pool)
-
+            with profiler.profile(self.function.__name__) if profiler else contextlib.nullcontext():
+                self.function(**validated_config)
+            # Execute tasks using the pool's built-in context manager
+            if len(self.tasks) > 0:
+                if max_workers is None:
+                    max_workers = default_max_workers(self._get_graph_width())
+                transport = ResultTransport(
+                    os.path.join(workspace.tmp_path, f"task-results-{uuid.uuid4().hex}"),
+                    threshold=Settings.task_result_spill_threshold(),
+                )
+                try:
+                    with PoolGroup(executor, max_workers, preload=self.preload) as pools:
+                        self._execute_tasks(pools, transport, checkpoints, run_profile, profiler)
+                except PipelineRunError:
+                    if checkpoints is not None:
+                        print(
+                            f"{get_timestamp()} Completed tasks have been checkpointed, use "
+                            f'resume_from="{checkpoints.run_id}" to resume this run'
+                        )
+                    raise
+                finally:
+                    self._load_spilled_results()
+                    transport.cleanup()
+                    if run_profile is not None:
+                        self._write_profile(run_profile, profile_output)
+
+        if profiler is not None:
+            print(f"{get_timestamp()} {profiler.mode.capitalize()} profiles written to {profiler.directory}")
         print(f'{get_timestamp()} Successfully completed pipeline "{self.name}"')
 
+    def _load_spilled_results(self):
+        """Load the spilled results of the tasks in memory, before their spill files are removed."""
+        for task in self.tasks:
+            task.result = load_result(task.result, mmap=False)
+
     def _validate_config(self, config: dict[str, typing.Any]) -> dict[str, typing.Any]:
         """Validate and default parameters.
 
@@ -157,66 +342,68 @@ class Pipeline:
                 disabled_codes.update(parameter.disables)
         return disabled_codes
 
-    def _execute_tasks(self, pool):
-        """Execute all tasks using the provided multiprocessing pool.
+    def _execute_tasks(
+        self,
+        pools: PoolGroup,
+        transport: ResultTransport = None,
+        checkpoints: RunCheckpoints = None,
+        run_profile: RunProfile = None,
+        profiler: CodeProfiler = None,
+    ):
+        """Execute all tasks using the provided pools (see TaskScheduler).
 
         Parameters
         ----------
-        pool : multiprocess.Pool
-            The multiprocessing pool to use for task execution.
+        pools : PoolGroup
+            The pools to use for task execution.
+        transport : ResultTransport, optional
+            The result transport used by tasks running in worker processes.
+        checkpoints : RunCheckpoints, optional
+            If provided, the outcome of each finished task is checkpointed, and tasks with a checkpoint in the run to
+            resume from are restored instead of being executed.
+        run_profile : RunProfile, optional
+            If provided, the metrics of the tasks are collected in the run profile.
+        profiler : CodeProfiler, optional
+            If provided, the code of the tasks is profiled.
 
         Raises
         ------
         PipelineRunError
             If any task fails during execution.
         """
-        result_list = []
-        total = len(self.tasks)
-        completed = 0
-
-        while True:
-            tasks = self._get_available_tasks()
-            # filter already pooled task, even if they are not finished
-            tasks = [t for t in tasks if not t.pooled]
-
-            if len(tasks) == 0 and len(result_list) == 0:
-                # nothing running, nothing to do
-                break
-
-            for task in tasks:
-                print(f'{get_timestamp()} Started task "{task.compute.__name__}"')
-                result = pool.apply_async(task.run)
-                result_list.append((result, task))
-                task.pooled = True
-
-            while True:
-                dag_step = False
-
-                for result, task in result_list:
-                    if not result.ready():
-                        continue
+        tasks = [task for task in self.tasks if task.active and task.end_time is None]
+        scheduler = TaskScheduler(
+            tasks,
+            pools,
+            on_progress=self._update_progress,
+            transport=transport,
+            checkpoints=checkpoints,
+            total=len(self.tasks),
+            profile=run_profile,
+            profiler=profiler,
+        )
+        try:
+            scheduler.run()
+        except TaskFailedError as e:
+            raise PipelineRunError(f"Pipeline {self.name} failed: {e}")
+
+    def _write_profile(self, run_profile: RunProfile, profile_output: bool):
+        """Write the run profile to the workspace tmp directory, and add it as run outputs if requested."""
+        from .run import current_run
 
-                    completed += 1
-                    progress = int(completed / total * 100)
-                    print(f'{get_timestamp()} Finished task "{task.compute.__name__}"')
-                    self._update_progress(progress)
+        paths = run_profile.write(get_profile_path(run_profile.run_id))
+        print(f"{get_timestamp()} Run profile written to {paths[0].parent}")
+        if profile_output:
+            # Run outputs must be stored in the workspace files
+            output_directory = Path(workspace.files_path) / "profiles" / run_profile.run_id
+            output_directory.mkdir(parents=True, exist_ok=True)
+            for path in paths:
+                shutil.copyfile(path, output_directory / path.name)
+                current_run.add_file_output(str(output_directory / path.name))
 
-                    try:
-                        task_com_result = result.get()
-                        task.result = task_com_result.result
-                        task.start_time = task_com_result.start_time
-                        task.end_time = task_com_result.end_time
-                        dag_step = True
-                    except Exception as e:  # NOQA
-                        raise PipelineRunError(f"Pipeline {self.name} failed: {e}")
-
-                if dag_step:
-                    # remove finished tasks
-                    result_list = [(r, t) for r, t in result_list if t.end_time is None]
-                    break
-                else:
-                    # busy loop
-                    time.sleep(0.3)
+    def _get_graph_width(self) -> int:
+        """Return the width of the task graph (see get_graph_width())."""
+        return get_graph_width([task for task in self.tasks if task.active and task.end_time is None])
 
     def to_dict(self):
         """Return a dictionary representation of the pipeline."""
@@ -229,25 +416,23 @@ class Pipeline:
             "tasks": [t.__dict__ for t in self.tasks],
         }
 
-    def _get_available_tasks(self) -> list[Task]:
-        return [task for task in self.tasks if task.is_ready()]
-
     def _update_progress(self, progress: int):
-        if self._connected:
+        if self._connected and telemetry.active:
+            telemetry.update_progress(progress)
+        elif self._connected:
             token = os.environ["HEXA_TOKEN"]
             headers = {"Authorization": "Bearer %s" % token}
             query = """
                             mutation updatePipelineProgress ($input: UpdatePipelineProgressInput!) {
                                 updatePipelineProgress(input: $input) { success errors }
                             }"""
-            r = requests.post(
+            r = get_shared_requests_session(verify=Settings.verify_ssl()).post(
                 f"{os.environ['HEXA_SERVER_URL']}/graphql/",
                 headers=headers,
                 json={
                     "query": query,
                     "variables": {"input": {"percent": progress}},
                 },
-                verify=Settings.verify_ssl(),
             )
             r.raise_for_status()
         else:
@@ -271,18 +456,22 @@ class Pipeline:
         if get_environment() == Environment.STANDALONE:
             os.environ.update(get_local_workspace_config(Path(sys.argv[0]).parent))
 
+        resume_from = None
         if config is None:  # Called without arguments, in the pipeline file itself
             parser = argparse.ArgumentParser(exit_on_error=False)
             parser.add_argument("-c", "--config")
             parser.add_argument("-f", "--config-file")
+            parser.add_argument("-r", "--resume-from")
             # We can't use parse_args, as it will call sys.exit() if there are unrecognized arguments
             args, argv = parser.parse_known_args()
             if argv or (args.config_file is not None and args.config is not None):
                 raise ValueError(
                     f"Unrecognized arguments: {' '.join(argv)}. Running a pipeline requires a single "
                     "argument: either an inline JSON config with the --config/-c argument, or a JSON "
-                    "config file with the --config-file/-f argument."
+                    "config file with the --config-file/-f argument (and optionally the identifier of the run to "
+                    "resume from with the --resume-from/-r argument)."
                 )
+            resume_from = args.resume_from
             if args.config_file is not None:
                 with open(args.config_file) as cf:
                     try:
@@ -298,11 +487,20 @@ class Pipeline:
             else:
                 config = {}
 
-        self.run(config)
+        self.run(config, resume_from=resume_from)
 
 
 def pipeline(
-    code: str = None, name: str = None, timeout: int = None, functional_type: str = None
+    code: str = None,
+    name: str = None,
+    timeout: int = None,
+    functional_type: str = None,
+    max_workers: int = None,
+    executor: str = PROCESS,
+    checkpoint: bool = False,
+    preload: typing.Sequence[str] = None,
+    profile: bool = False,
+    profile_output: bool = False,
 ) -> typing.Callable[[typing.Callable[..., typing.Any]], Pipeline]:
     """Decorate a Python function as an OpenHEXA pipeline.
 
@@ -317,6 +515,27 @@ def pipeline(
         timeout will be applied by the OpenHEXA backend)
     functional_type : str, optional
         The functional type of the pipeline. Valid values are "extraction", "transformation", "loading", "computation".
+    max_workers : int, optional
+        The maximum number of workers used to run tasks. Defaults to the smallest value between the number of CPUs and
+        the number of tasks that can run in parallel.
+    executor : str, optional
+        The executor backend used to run tasks: "process" (the default, tasks run in spawned processes), "thread"
+        (tasks run in threads, well suited for I/O-bound tasks) or "inline" (tasks run sequentially in the main
+        process, useful for tests and tiny pipelines).
+    checkpoint : bool, optional
+        Whether to checkpoint the result of each finished task (default: False). Checkpoints are stored in the
+        workspace files directory (or in HEXA_CHECKPOINT_PATH), and allow a failed run to be resumed with
+        Pipeline.run(..., resume_from=<run id>) or with the --resume-from command-line argument.
+    preload : typing.Sequence[str], optional
+        Modules to import once in worker processes, before they run any task (for example ["pandas", "geopandas"]).
+        Where the platform supports it, worker processes are forked from a server process that has already imported
+        the SDK and these modules, so that tasks do not pay for these imports.
+    profile : bool, optional
+        Whether to write the performance profile of each run (default: False): the queue wait, wall time, CPU time,
+        memory, pickled input and output sizes and retries of each task, as JSON and as a Chrome trace, in the
+        workspace tmp directory (see Pipeline.run() and openhexa.sdk.pipelines.profile).
+    profile_output : bool, optional
+        Whether to also add the performance profile of each run as run outputs (default: False). Implies profile.
 
     Returns
     -------
@@ -341,7 +560,19 @@ def pipeline(
         else:
             parameters = []
 
-        return Pipeline(name, fun, parameters, timeout, functional_type)
+        return Pipeline(
+            name,
+            fun,
+            parameters,
+            timeout,
+            functional_type,
+            max_workers,
+            executor,
+            checkpoint,
+            preload=preload,
+            profile=profile,
+            profile_output=profile_output,
+        )
 
     return decorator
 
@@ -0,0 +1,331 @@
+"""Performance profile of pipeline runs.
+
+When a pipeline runs with profiling enabled, each work item measures its execution (wall time, CPU time, memory and,
+for work items sent to worker processes, the size of their pickled inputs and outputs).
+The scheduler adds the time tasks spent waiting for their turn (queue wait) and their retries, and the run profile is
+written as JSON and in the Chrome trace event format (which can be opened in chrome://tracing or
+https://ui.perfetto.dev) to show the critical path of the run and its stragglers.
+
+Memory is measured through the peak resident set size of the process running the work item, which is a lifetime peak:
+pools reuse their workers, so worker_peak_rss includes the work items that ran before in the same process. The part
+of it attributable to a work item is peak_rss_increase, how much the work item raised that peak (0 if it stayed below
+the peak of a previous work item). With the thread executor, work items running at the same time share the process.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+import typing
+from pathlib import Path
+
+from multiprocess import parent_process  # NOQA
+
+from openhexa.sdk.utils import Settings
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+if typing.TYPE_CHECKING:
+    from .task import Task
+
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+CANCELLED = "cancelled"
+RESTORED = "restored"
+
+# Metrics of the work items shown in the trace events
+_TRACE_ARGS = ("cpu_time", "worker_peak_rss", "peak_rss_increase", "input_bytes", "output_bytes", "cached")
+
+
+class _ByteCounter(io.RawIOBase):
+    """Writable sink counting the bytes written to it, used to measure pickled sizes without storing them."""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def writable(self) -> bool:
+        """Return True: the counter is writable."""
+        return True
+
+    def write(self, data) -> int:
+        """Count the written bytes."""
+        size = memoryview(data).nbytes
+        self.count += size
+        return size
+
+
+def get_pickled_size(value: typing.Any) -> int | None:
+    """Return the size of the pickled value, or None if the value cannot be pickled."""
+    counter = _ByteCounter()
+    try:
+        pickle.Pickler(counter, protocol=pickle.HIGHEST_PROTOCOL).dump(value)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+
+    return counter.count
+
+
+def get_process_peak_rss() -> int | None:
+    """Return the peak resident set size of the current process since it started, in bytes (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in bytes on macOS, in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class WorkItemProbe:
+    """Measure the execution of a work item, from its creation to finish().
+
+    In worker processes, the CPU time of the whole process is measured (including the threads started by the task
+    function), while in the main process (thread and inline executors), only the CPU time of the current thread is.
+
+    Parameters
+    ----------
+    args : typing.Sequence[typing.Any]
+        The inputs of the work item, as sent to the worker.
+    kwargs : dict[str, typing.Any]
+        The keyword inputs of the work item, as sent to the worker.
+    pickled : bool
+        Whether the inputs and outputs of the work item are pickled (i.e. whether it runs in a worker process).
+    """
+
+    def __init__(self, args: typing.Sequence[typing.Any], kwargs: dict[str, typing.Any], pickled: bool):
+        self.pickled = pickled
+        self.input_bytes = get_pickled_size((args, kwargs)) if pickled else None
+        self._cpu_clock = time.process_time if parent_process() is not None else time.thread_time
+        self._start = time.time()
+        self._cpu_start = self._cpu_clock()
+        self._peak_rss_start = get_process_peak_rss()
+
+    def finish(self, result: typing.Any, cached: bool = False) -> dict[str, typing.Any]:
+        """Return the metrics of the work item, whose (possibly spilled) result is provided."""
+        peak_rss = get_process_peak_rss()
+        return {
+            "start": self._start,
+            "end": time.time(),
+            "cpu_time": self._cpu_clock() - self._cpu_start,
+            "worker_peak_rss": peak_rss,
+            "peak_rss_increase": peak_rss - self._peak_rss_start if peak_rss is not None else None,
+            "input_bytes": self.input_bytes,
+            "output_bytes": get_pickled_size(result) if self.pickled else None,
+            "cached": cached,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+
+
+class _TaskRecord:
+    def __init__(self, task: Task):
+        self.task = task
+        self.status = None
+        self.executor = task.executor
+        self.ready_at = None
+        self.queue_wait = 0.0
+        self.work_items = []
+        self.error = None
+
+
+class RunProfile:
+    """Collect the metrics of the tasks of a run, and write them as a run profile.
+
+    The scheduler reports when tasks become ready, are submitted, complete or fail (see TaskScheduler); the metrics
+    of each work item are reported by the work items themselves (see WorkItemProbe).
+
+    Parameters
+    ----------
+    name : str
+        The name of the pipeline.
+    run_id : str
+        The identifier of the run.
+    """
+
+    def __init__(self, name: str, run_id: str):
+        self.name = name
+        self.run_id = run_id
+        self.start = time.time()
+        self.end = None
+        self._records: dict[Task, _TaskRecord] = {}
+
+    def _record(self, task: Task) -> _TaskRecord:
+        if task not in self._records:
+            self._records[task] = _TaskRecord(task)
+
+        return self._records[task]
+
+    def ready(self, task: Task):
+        """Record that the task is ready to run (its upstream tasks are finished, or its retry delay is over)."""
+        record = self._record(task)
+        if record.ready_at is None:
+            record.ready_at = time.time()
+
+    def submitted(self, task: Task, executor: str):
+        """Record that the task has been handed to the pool of its executor, after waiting for its turn (and CPUs)."""
+        record = self._record(task)
+        record.executor = executor
+        if record.ready_at is not None:
+            record.queue_wait += time.time() - record.ready_at
+            record.ready_at = None
+
+    def add_work_item(self, task: Task, metrics: dict[str, typing.Any] | None):
+        """Record the metrics of a finished work item of the task (one per chunk for map tasks)."""
+        if metrics is not None:
+            self._record(task).work_items.append(metrics)
+
+    def finished(self, task: Task, status: str, error: BaseException | None = None):
+        """Record the final status of the task."""
+        record = self._record(task)
+        record.status = status
+        record.error = str(error) if error is not None else None
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        """Return the run profile as a JSON-serializable dictionary."""
+        end = self.end or time.time()
+        ids = {task: i for i, task in enumerate(self._records)}
+        tasks = []
+        for task, record in self._records.items():
+            items = record.work_items
+            start = min((item["start"] for item in items), default=None)
+            task_end = max((item["end"] for item in items), default=None)
+            tasks.append(
+                {
+                    "id": ids[task],
+                    "name": task.name,
+                    "executor": record.executor,
+                    "status": record.status,
+                    "error": record.error,
+                    "attempts": task.attempts,
+                    "retries": max(task.attempts - 1, 0),
+                    "upstream": [ids[upstream] for upstream in task.get_upstream_tasks() if upstream in ids],
+                    "start": start,
+                    "end": task_end,
+                    "queue_wait": record.queue_wait,
+                    "wall_time": task_end - start if items else None,
+                    "cpu_time": sum(item["cpu_time"] for item in items) if items else None,
+                    "worker_peak_rss": max((item["worker_peak_rss"] or 0 for item in items), default=None),
+                    "peak_rss_increase": max((item["peak_rss_increase"] or 0 for item in items), default=None),
+                    "input_bytes": _sum_or_none(item["input_bytes"] for item in items),
+                    "output_bytes": _sum_or_none(item["output_bytes"] for item in items),
+                    "work_items": items,
+                }
+            )
+
+        return {
+            "pipeline": self.name,
+            "run_id": self.run_id,
+            "start": self.start,
+            "end": end,
+            "wall_time": end - self.start,
+            "critical_path": get_critical_path(tasks),
+            "tasks": tasks,
+        }
+
+    def to_trace(self, profile: dict[str, typing.Any] | None = None) -> dict[str, typing.Any]:
+        """Return the run profile in the Chrome trace event format.
+
+        Each work item is a complete event on the thread of the process that ran it, and the queue wait of each task
+        is an event of the scheduler process.
+        """
+        profile = profile or self.to_dict()
+        scheduler_pid = os.getpid()
+        events = [_metadata_event("process_name", scheduler_pid, {"name": f"{self.name} (scheduler)"})]
+        worker_pids = set()
+        for task in profile["tasks"]:
+            for chunk, item in enumerate(task["work_items"]):
+                worker_pids.add(item["pid"])
+                args = {key: item[key] for key in _TRACE_ARGS}
+                if len(task["work_items"]) > 1:
+                    args["chunk"] = chunk
+                events.append(
+                    {
+                        "name": task["name"],
+                        "cat": "task",
+                        "ph": "X",
+                        "ts": _to_microseconds(item["start"] - self.start),
+                        "dur": _to_microseconds(item["end"] - item["start"]),
+                        "pid": item["pid"],
+                        "tid": item["tid"],
+                        "args": {"task_id": task["id"], "retries": task["retries"], **args},
+                    }
+                )
+            if task["queue_wait"] and task["start"] is not None:
+                events.append(
+                    {
+                        "name": f"{task['name']} (queued)",
+                        "cat": "queue",
+                        "ph": "X",
+                        "ts": _to_microseconds(task["start"] - task["queue_wait"] - self.start),
+                        "dur": _to_microseconds(task["queue_wait"]),
+                        "pid": scheduler_pid,
+                        "tid": 0,
+                        "args": {"task_id": task["id"]},
+                    }
+                )
+        for pid in sorted(worker_pids - {scheduler_pid}):
+            events.append(_metadata_event("process_name", pid, {"name": f"worker {pid}"}))
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, directory: str | os.PathLike[str]) -> list[Path]:
+        """Write the run profile (profile.json) and its trace (trace.json) to the directory, and return their paths."""
+        self.end = self.end or time.time()
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        profile = self.to_dict()
+        paths = [directory / "profile.json", directory / "trace.json"]
+        for path, content in zip(paths, (profile, self.to_trace(profile))):
+            with open(path, "w") as f:
+                json.dump(content, f)
+
+        return paths
+
+
+def get_critical_path(tasks: list[dict[str, typing.Any]]) -> list[int]:
+    """Return the ids of the tasks on the critical path of the run.
+
+    The critical path ends with the last task to finish, and goes back through the upstream task that finished last
+    (the one the task was waiting for).
+    """
+    by_id = {task["id"]: task for task in tasks if task["end"] is not None}
+    if not by_id:
+        return []
+
+    path = [max(by_id.values(), key=lambda task: task["end"])]
+    while True:
+        upstream = [by_id[i] for i in path[-1]["upstream"] if i in by_id]
+        if not upstream:
+            break
+        path.append(max(upstream, key=lambda task: task["end"]))
+
+    return [task["id"] for task in reversed(path)]
+
+
+def get_profile_path(run_id: str) -> Path:
+    """Return the directory of the profile of a run, in the workspace tmp directory (or in HEXA_PROFILE_PATH)."""
+    from openhexa.sdk.workspaces import workspace
+
+    return Path(Settings.profile_path() or Path(workspace.tmp_path) / "profiles") / run_id
+
+
+def _sum_or_none(values: typing.Iterable[int | None]) -> int | None:
+    values = [value for value in values if value is not None]
+    return sum(values) if values else None
+
+
+def _to_microseconds(seconds: float) -> int:
+    return int(seconds * 1_000_000)
+
+
+def _metadata_event(name: str, pid: int, args: dict[str, typing.Any]) -> dict[str, typing.Any]:
+    return {"name": name, "ph": "M", "pid": pid, "tid": 0, "args": args}
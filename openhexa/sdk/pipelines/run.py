@@ -1,12 +1,26 @@
 """Pipeline run module."""
 
+import asyncio
 import errno
 import os
 
 from openhexa.sdk.pipelines.log_level import LogLevel
-from openhexa.sdk.utils import Environment, get_environment, get_timestamp, graphql
+from openhexa.sdk.pipelines.telemetry import ADD_OUTPUT, telemetry
+from openhexa.sdk.utils import Environment, get_environment, get_timestamp, graphql, graphql_async
 from openhexa.sdk.workspaces import workspace
 
+ADD_PIPELINE_OUTPUT = """
+    mutation addPipelineOutput ($input: AddPipelineOutputInput!) {
+        addPipelineOutput(input: $input) { success errors }
+    }
+"""
+
+LOG_PIPELINE_MESSAGE = """
+    mutation logPipelineMessage ($input: LogPipelineMessageInput!) {
+        logPipelineMessage(input: $input) { success errors }
+    }
+"""
+
 
 class CurrentRun:
     """Represents the current run of a pipeline.
@@ -31,29 +45,34 @@ class CurrentRun:
 
         This output will be visible in the web interface, on the pipeline run page.
         """
-        stripped_path = path.replace(workspace.files_path, "")
-        name = stripped_path.strip("/")
         if self._connected:
-            res = graphql(
-                """
-                mutation addPipelineOutput ($input: AddPipelineOutputInput!) {
-                    addPipelineOutput(input: $input) { success errors }
-                }""",
-                {
-                    "input": {
-                        "uri": f"gs://{os.environ['WORKSPACE_BUCKET_NAME']}{stripped_path}",
-                        "type": "file",
-                        "name": name,
-                    }
-                },
-            )
-            if not res["addPipelineOutput"]["success"]:
-                if "FILE_NOT_FOUND" in res["addPipelineOutput"]["errors"]:
-                    raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
-
-                raise Exception(res["addPipelineOutput"]["errors"])
+            self._check_file_output(self._add_output(self._file_output_input(path)), path)
+        else:
+            print(f"Sending output with path {path.replace(workspace.files_path, '')}")
+
+    async def add_file_output_async(self, path: str):
+        """Record a run output for a file creation operation, without blocking the event loop."""
+        if self._connected:
+            self._check_file_output(await self._add_output_async(self._file_output_input(path)), path)
         else:
-            print(f"Sending output with path {stripped_path}")
+            print(f"Sending output with path {path.replace(workspace.files_path, '')}")
+
+    @staticmethod
+    def _file_output_input(path: str) -> dict:
+        stripped_path = path.replace(workspace.files_path, "")
+        return {
+            "uri": f"gs://{os.environ['WORKSPACE_BUCKET_NAME']}{stripped_path}",
+            "type": "file",
+            "name": stripped_path.strip("/"),
+        }
+
+    @staticmethod
+    def _check_file_output(res: dict, path: str):
+        if not res["addPipelineOutput"]["success"]:
+            if "FILE_NOT_FOUND" in res["addPipelineOutput"]["errors"]:
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+
+            raise Exception(res["addPipelineOutput"]["errors"])
 
     def add_database_output(self, table_name: str):
         """Record a run output for a database operation.
@@ -61,25 +80,45 @@ class CurrentRun:
         This output will be visible in the web interface, on the pipeline run page.
         """
         if self._connected:
-            res = graphql(
-                """
-                mutation addPipelineOutput ($input: AddPipelineOutputInput!) {
-                    addPipelineOutput(input: $input) { success errors }
-                }""",
-                {
-                    "input": {
-                        "uri": f"postgresql://{workspace.database_host}/{workspace.database_name}/{table_name}",
-                        "type": "db",
-                        "name": table_name,
-                    }
-                },
-            )
-            if not res["addPipelineOutput"]["success"]:
-                if "TABLE_NOT_FOUND" in res["addPipelineOutput"]["errors"]:
-                    raise Exception(f"{table_name} doesn't exist in workspace {workspace.slug}")
+            self._check_database_output(self._add_output(self._database_output_input(table_name)), table_name)
+        else:
+            print(f"Sending output with table_name {table_name}")
+
+    async def add_database_output_async(self, table_name: str):
+        """Record a run output for a database operation, without blocking the event loop."""
+        if self._connected:
+            res = await self._add_output_async(self._database_output_input(table_name))
+            self._check_database_output(res, table_name)
         else:
             print(f"Sending output with table_name {table_name}")
 
+    @staticmethod
+    def _database_output_input(table_name: str) -> dict:
+        return {
+            "uri": f"postgresql://{workspace.database_host}/{workspace.database_name}/{table_name}",
+            "type": "db",
+            "name": table_name,
+        }
+
+    @staticmethod
+    def _check_database_output(res: dict, table_name: str):
+        if not res["addPipelineOutput"]["success"]:
+            if "TABLE_NOT_FOUND" in res["addPipelineOutput"]["errors"]:
+                raise Exception(f"{table_name} doesn't exist in workspace {workspace.slug}")
+
+    def _add_output(self, output_input: dict) -> dict:
+        # During a pipeline run, the output is sent along with the pending telemetry (and waited for)
+        if telemetry.active:
+            return {"addPipelineOutput": telemetry.call(ADD_OUTPUT, output_input)}
+
+        return graphql(ADD_PIPELINE_OUTPUT, {"input": output_input})
+
+    async def _add_output_async(self, output_input: dict) -> dict:
+        if telemetry.active:
+            return {"addPipelineOutput": await asyncio.to_thread(telemetry.call, ADD_OUTPUT, output_input)}
+
+        return await graphql_async(ADD_PIPELINE_OUTPUT, {"input": output_input})
+
     def log_debug(self, message: str):
         """Log a message with the DEBUG level."""
         self._log_message(LogLevel.DEBUG, message)
@@ -100,6 +139,26 @@ class CurrentRun:
         """Log a message with the CRITICAL level."""
         self._log_message(LogLevel.CRITICAL, message)
 
+    async def log_debug_async(self, message: str):
+        """Log a message with the DEBUG level, without blocking the event loop."""
+        await self._log_message_async(LogLevel.DEBUG, message)
+
+    async def log_info_async(self, message: str):
+        """Log a message with the INFO level, without blocking the event loop."""
+        await self._log_message_async(LogLevel.INFO, message)
+
+    async def log_warning_async(self, message: str):
+        """Log a message with the WARNING level, without blocking the event loop."""
+        await self._log_message_async(LogLevel.WARNING, message)
+
+    async def log_error_async(self, message: str):
+        """Log a message with the ERROR level, without blocking the event loop."""
+        await self._log_message_async(LogLevel.ERROR, message)
+
+    async def log_critical_async(self, message: str):
+        """Log a message with the CRITICAL level, without blocking the event loop."""
+        await self._log_message_async(LogLevel.CRITICAL, message)
+
     def _log_message(
         self,
         log_level: LogLevel,
@@ -109,14 +168,22 @@ class CurrentRun:
 
         if log_level < settings.log_level:  # Ignore messages with lower log level than the settings
             return
-        if self._connected:
-            graphql(
-                """
-                mutation logPipelineMessage ($input: LogPipelineMessageInput!) {
-                    logPipelineMessage(input: $input) { success errors }
-                }""",
-                {"input": {"priority": log_level.name, "message": str(message)}},
-            )
+        if self._connected and telemetry.active:
+            telemetry.log_message(log_level.name, str(message))
+        elif self._connected:
+            graphql(LOG_PIPELINE_MESSAGE, {"input": {"priority": log_level.name, "message": str(message)}})
+        else:
+            print(get_timestamp(), log_level.name, message)
+
+    async def _log_message_async(self, log_level: LogLevel, message: str):
+        from openhexa.cli.settings import settings
+
+        if log_level < settings.log_level:
+            return
+        if self._connected and telemetry.active:
+            telemetry.log_message(log_level.name, str(message))
+        elif self._connected:
+            await graphql_async(LOG_PIPELINE_MESSAGE, {"input": {"priority": log_level.name, "message": str(message)}})
         else:
             print(get_timestamp(), log_level.name, message)
 
@@ -2,12 +2,16 @@
 
 import ast
 import base64
+import hashlib
 import importlib
 import io
+import json
 import os
 import sys
+import tempfile
 from collections.abc import Callable
 from dataclasses import dataclass, field
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
 from typing import Any
 from zipfile import ZipFile
@@ -33,6 +37,11 @@ _AST_CALLABLE_TYPES: dict[str, type] = {
     "ChoicesFromFile": ChoicesFromFile,
 }
 
+# Cache of the specs extracted from pipeline files, relative to the pipeline directory
+PIPELINE_SPEC_CACHE = Path(".openhexa") / "pipeline_spec.json"
+
+_WIDGETS_BY_VALUE = {widget.value: widget for widget in [*DHIS2Widget, *IASOWidget]}
+
 
 @dataclass
 class Argument:
@@ -222,130 +231,236 @@ def _get_decorator_spec(decorator: ast.Call, args: tuple[Argument, ...]) -> dict
     return args_spec
 
 
-def get_pipeline(pipeline_path: Path) -> Pipeline:
-    """Return the pipeline with metadata and parameters from the pipeline code.
+def _find_pipeline_function(tree: ast.Module) -> ast.FunctionDef | None:
+    """Return the first function decorated with the pipeline decorator.
+
+    Pipeline functions are almost always defined at the top level of the module: the top-level statements are scanned
+    first, and the whole tree is only walked if none of them is a pipeline function.
+    """
+    for nodes in (tree.body, ast.walk(tree)):
+        for node in nodes:
+            if isinstance(node, ast.FunctionDef) and _get_decorators_by_name(node, "pipeline"):
+                return node
+
+    return None
+
+
+def _get_pipeline_spec(tree: ast.Module) -> dict[str, Any]:
+    """Extract the specification of the pipeline (name, timeout, parameters) from the AST of a pipeline file.
 
     Args:
-        pipeline_path: Path to the pipeline directory
+        tree: The AST of the pipeline file
 
     Raises
     ------
         PipelineNotFound: If no function with openhexa.sdk pipeline decorator is found.
-        InvalidParameterError: If the parameter type is invalid/unknown.
         ValueError: If the value of an argument is not a primitive type.
 
     Returns
     -------
-        Pipeline: The pipeline object with parameters and metadata.
+        A dictionary with the name, timeout, parameters (as keyword arguments of Parameter, with the type name) and
+        deprecation warnings of the pipeline.
     """
-    pipeline_file = Path(pipeline_path) / "pipeline.py"
-
-    try:
-        with open(pipeline_file) as f:
-            tree = ast.parse(f.read())
-    except (FileNotFoundError, PermissionError) as e:
-        raise PipelineNotFound(f"Could not read pipeline file: {e}")
-
-    for node in ast.walk(tree):
-        if not isinstance(node, ast.FunctionDef):
-            continue
+    node = _find_pipeline_function(tree)
+    if node is None:
+        raise PipelineNotFound("No function with openhexa.sdk pipeline decorator found.")
+
+    pipeline_decorator = _get_decorators_by_name(node, "pipeline")[0]
+    pipeline_args = _get_decorator_spec(
+        pipeline_decorator,
+        (
+            Argument("code", [ast.Constant]),
+            Argument("name", [ast.Constant]),
+            Argument("timeout", [ast.Constant]),
+        ),
+    )
+
+    # Extract code and name values for validation
+    code_arg = pipeline_args.get("code", {"value": None, "is_keyword": False})
+    name_arg = pipeline_args.get("name", {"value": None, "is_keyword": False})
+
+    # Handle deprecated 'code' argument
+    warnings = []
+    if code_arg["value"] is not None:
+        if code_arg["is_keyword"]:
+            warnings.append(
+                f"The 'code' argument is deprecated and should not be used as a keyword. "
+                f"Replace 'code=\"{code_arg['value']}\"' by 'name=\"{code_arg['value']}\"'"
+            )
 
-        pipeline_decorators = _get_decorators_by_name(node, "pipeline")
-        if not pipeline_decorators:
-            continue
+        if name_arg["value"] is not None:
+            warnings.append(
+                f"Providing both 'code' and 'name' is deprecated. "
+                f"Please remove 'code' and only use 'name' when decorating the pipeline: "
+                f'@pipeline(name="{name_arg["value"]}")'
+            )
 
-        pipeline_decorator = pipeline_decorators[0]
-        pipeline_args = _get_decorator_spec(
-            pipeline_decorator,
+    # Process parameters
+    parameters = []
+    for parameter_decorator in _get_decorators_by_name(node, "parameter"):
+        parameter_args = _get_decorator_spec(
+            parameter_decorator,
             (
                 Argument("code", [ast.Constant]),
+                Argument("type", [ast.Name]),
                 Argument("name", [ast.Constant]),
-                Argument("timeout", [ast.Constant]),
+                Argument(
+                    "choices",
+                    [ast.List, ast.Call, ast.Constant],
+                    transform=lambda v: ChoicesFromFile(v) if isinstance(v, str) else v,
+                ),
+                Argument("help", [ast.Constant]),
+                Argument("default", [ast.Constant, ast.List]),
+                Argument("widget", [ast.Attribute]),
+                Argument("connection", [ast.Constant]),
+                Argument("required", [ast.Constant], default_value=True),
+                Argument("multiple", [ast.Constant], default_value=False),
+                Argument("directory", [ast.Constant]),
+                Argument("disables", [ast.List]),
+                Argument("disable_when", [ast.Constant], default_value=True),
             ),
         )
+        parameters.append({k: v["value"] for k, v in parameter_args.items()})
+
+    return {
+        # Prefer 'name', fall back to 'code'
+        "name": name_arg["value"] if name_arg["value"] is not None else code_arg["value"],
+        "timeout": pipeline_args.get("timeout", {"value": None})["value"],
+        "parameters": parameters,
+        "warnings": warnings,
+    }
 
-        # Extract code and name values for validation
-        code_arg = pipeline_args.get("code", {"value": None, "is_keyword": False})
-        name_arg = pipeline_args.get("name", {"value": None, "is_keyword": False})
-
-        # Handle deprecated 'code' argument
-        if code_arg["value"] is not None:
-            if code_arg["is_keyword"]:
-                print(
-                    "\n\033[93m",
-                    f"The 'code' argument is deprecated and should not be used as a keyword. "
-                    f"Replace 'code=\"{code_arg['value']}\"' by 'name=\"{code_arg['value']}\"'\033[0m",
-                    "\n",
-                    flush=True,
-                )
 
-            if name_arg["value"] is not None:
-                print(
-                    "\n\033[93m",
-                    f"Providing both 'code' and 'name' is deprecated. "
-                    f"Please remove 'code' and only use 'name' when decorating the pipeline: "
-                    f'@pipeline(name="{name_arg["value"]}")\033[0m',
-                    "\n",
-                    flush=True,
-                )
+def _get_parameter(parameter_spec: dict[str, Any]) -> Parameter:
+    """Build a parameter from its specification, as returned by _get_pipeline_spec() or read from the cache.
 
-        # Determine the pipeline name (prefer 'name', fall back to 'code')
-        pipeline_name = name_arg["value"] if name_arg["value"] is not None else code_arg["value"]
-
-        # Extract timeout
-        timeout = pipeline_args.get("timeout", {"value": None})["value"]
-
-        # Process parameters
-        pipeline_parameters = []
-        for parameter_decorator in _get_decorators_by_name(node, "parameter"):
-            parameter_args = _get_decorator_spec(
-                parameter_decorator,
-                (
-                    Argument("code", [ast.Constant]),
-                    Argument("type", [ast.Name]),
-                    Argument("name", [ast.Constant]),
-                    Argument(
-                        "choices",
-                        [ast.List, ast.Call, ast.Constant],
-                        transform=lambda v: ChoicesFromFile(v) if isinstance(v, str) else v,
-                    ),
-                    Argument("help", [ast.Constant]),
-                    Argument("default", [ast.Constant, ast.List]),
-                    Argument("widget", [ast.Attribute]),
-                    Argument("connection", [ast.Constant]),
-                    Argument("required", [ast.Constant], default_value=True),
-                    Argument("multiple", [ast.Constant], default_value=False),
-                    Argument("directory", [ast.Constant]),
-                    Argument("disables", [ast.List]),
-                    Argument("disable_when", [ast.Constant], default_value=True),
-                ),
-            )
+    Raises
+    ------
+        InvalidParameterError: If the parameter type is invalid/unknown.
+    """
+    param_kwargs = dict(parameter_spec)
+    try:
+        arg_type_name = param_kwargs.pop("type")
+        if arg_type_name not in TYPES_BY_PYTHON_TYPE:
+            raise InvalidParameterError(f"Unsupported parameter type: {arg_type_name}")
 
-            try:
-                arg_type_name = parameter_args.pop("type")["value"]
-                if arg_type_name not in TYPES_BY_PYTHON_TYPE:
-                    raise InvalidParameterError(f"Unsupported parameter type: {arg_type_name}")
+        type_class = TYPES_BY_PYTHON_TYPE[arg_type_name]()
 
-                type_class = TYPES_BY_PYTHON_TYPE[arg_type_name]()
+        return Parameter(type=type_class.expected_type, **param_kwargs)
+    except KeyError as e:
+        raise InvalidParameterError(f"Missing required parameter attribute: {e}")
 
-                # Convert args spec to parameter kwargs
-                param_kwargs = {k: v["value"] for k, v in parameter_args.items()}
 
-                parameter = Parameter(type=type_class.expected_type, **param_kwargs)
-                pipeline_parameters.append(parameter)
+def _encode_spec_value(value: Any) -> Any:
+    """Encode the values of pipeline specs that are not natively supported by JSON (json.dumps default hook)."""
+    if isinstance(value, ChoicesFromFile):
+        return {"choices_from_file": value.to_dict()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
-            except KeyError as e:
-                raise InvalidParameterError(f"Missing required parameter attribute: {e}")
 
-        validate_parameters(pipeline_parameters)
+def _decode_parameter_spec(parameter_spec: dict[str, Any]) -> dict[str, Any]:
+    """Decode a parameter specification read from the cache (the reverse of _encode_spec_value)."""
+    choices = parameter_spec.get("choices")
+    if isinstance(choices, dict):
+        parameter_spec["choices"] = ChoicesFromFile(**choices["choices_from_file"])
+    if parameter_spec.get("widget") is not None:
+        parameter_spec["widget"] = _WIDGETS_BY_VALUE[parameter_spec["widget"]]
 
-        # Create and return the pipeline
-        return Pipeline(
-            parameters=pipeline_parameters,
-            function=None,
-            name=pipeline_name,
-            timeout=timeout,
-        )
+    return parameter_spec
+
+
+def _get_spec_cache_key(source: bytes) -> str:
+    """Return the cache key of the spec of a pipeline file: a hash of its content and of the SDK version."""
+    try:
+        sdk_version = version("openhexa.sdk")
+    except PackageNotFoundError:
+        sdk_version = None
+
+    return hashlib.sha256(f"{sdk_version}\0".encode() + source).hexdigest()
+
+
+def _read_cached_spec(cache_file: Path, key: str) -> dict[str, Any] | None:
+    """Return the cached pipeline spec if it exists and was extracted from the same pipeline file, None otherwise."""
+    try:
+        cached = json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("key") != key:
+        return None
+
+    try:
+        spec = cached["spec"]
+        spec["parameters"] = [_decode_parameter_spec(parameter_spec) for parameter_spec in spec["parameters"]]
+    except (KeyError, TypeError, InvalidParameterError):  # Cache written by an incompatible version of the SDK
+        return None
+
+    return spec
+
+
+def _write_cached_spec(cache_file: Path, key: str, spec: dict[str, Any]):
+    """Write the pipeline spec to the cache, ignoring read-only pipeline directories and unserializable values."""
+    try:
+        content = json.dumps({"key": key, "spec": spec}, default=_encode_spec_value, indent=2)
+        cache_file.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+            os.replace(tmp_path, cache_file)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def get_pipeline(pipeline_path: Path) -> Pipeline:
+    """Return the pipeline with metadata and parameters from the pipeline code.
+
+    The specification of the pipeline extracted from the pipeline file is cached in the .openhexa directory of the
+    pipeline directory, keyed by a hash of the content of the file, so that the file is only parsed again when it
+    changes. Set the HEXA_PIPELINE_SPEC_CACHE environment variable to "false" to disable the cache.
+
+    Args:
+        pipeline_path: Path to the pipeline directory
+
+    Raises
+    ------
+        PipelineNotFound: If no function with openhexa.sdk pipeline decorator is found.
+        InvalidParameterError: If the parameter type is invalid/unknown.
+        ValueError: If the value of an argument is not a primitive type.
+
+    Returns
+    -------
+        Pipeline: The pipeline object with parameters and metadata.
+    """
+    pipeline_file = Path(pipeline_path) / "pipeline.py"
+
+    try:
+        source = pipeline_file.read_bytes()
+    except (FileNotFoundError, PermissionError) as e:
+        raise PipelineNotFound(f"Could not read pipeline file: {e}")
 
-    # If we get here, no pipeline was found
-    raise PipelineNotFound("No function with openhexa.sdk pipeline decorator found.")
+    cache_file = Path(pipeline_path) / PIPELINE_SPEC_CACHE
+    use_cache = Settings.pipeline_spec_cache()
+    key = _get_spec_cache_key(source)
+    spec = _read_cached_spec(cache_file, key) if use_cache else None
+    is_cached = spec is not None
+    if spec is None:
+        spec = _get_pipeline_spec(ast.parse(source))
+
+    for warning in spec["warnings"]:
+        print("\n\033[93m", f"{warning}\033[0m", "\n", flush=True)
+
+    pipeline_parameters = [_get_parameter(parameter_spec) for parameter_spec in spec["parameters"]]
+    validate_parameters(pipeline_parameters)
+
+    if use_cache and not is_cached:
+        _write_cached_spec(cache_file, key, spec)
+
+    return Pipeline(
+        parameters=pipeline_parameters,
+        function=None,
+        name=spec["name"],
+        timeout=spec["timeout"],
+    )
@@ -0,0 +1,460 @@
+"""Event-driven scheduler running the tasks of a pipeline."""
+
+from __future__ import annotations
+
+import datetime
+import heapq
+import os
+import queue
+import time
+import typing
+from collections import deque
+
+from openhexa.sdk.utils import get_timestamp
+
+from .checkpoint import RunCheckpoints, get_checkpoint_key
+from .code_profile import CodeProfiler
+from .executor import PROCESS, PoolGroup
+from .profile import CANCELLED, FAILED, RESTORED, SKIPPED, SUCCEEDED, RunProfile
+from .stream import StreamProducer, TaskStream
+from .task import MapTask, Task, TaskCom
+from .transport import ResultTransport
+
+
+class TaskFailedError(Exception):
+    """Raised by the scheduler when a task failed (after all its retries)."""
+
+    def __init__(self, task: Task, error: BaseException):
+        super().__init__(str(error))
+        self.task = task
+        self.error = error
+
+
+def build_task_graph(tasks: list[Task]) -> tuple[dict[Task, int], dict[Task, list[Task]]]:
+    """Build the in-degree and dependents indexes of the task dependency graph.
+
+    Upstream tasks that already have a result (or that are not part of the provided task list) are not counted as
+    pending dependencies.
+    """
+    in_degree = {task: 0 for task in tasks}
+    dependents = {task: [] for task in tasks}
+    for task in tasks:
+        for upstream in task.get_upstream_tasks():
+            if upstream in dependents:
+                in_degree[task] += 1
+                dependents[upstream].append(task)
+
+    return in_degree, dependents
+
+
+def _get_task_width(task: Task) -> int:
+    """Return the number of work items of a task that can run at the same time.
+
+    Map tasks count for their number of chunks, or for the number of CPUs when it is not known before the run.
+    """
+    if isinstance(task, MapTask):
+        max_chunks = task.get_max_chunks()
+        return max(1, max_chunks if max_chunks is not None else os.cpu_count() or 1)
+
+    return 1
+
+
+def get_graph_width(tasks: list[Task]) -> int:
+    """Return the width of the task graph, i.e. the largest number of work items sharing the same depth.
+
+    This is the number of work items that can be ready at the same time in a level-by-level execution (map tasks
+    counting for their number of chunks), and is used as an upper bound for the size of the worker pool.
+    """
+    in_degree, dependents = build_task_graph(tasks)
+    level = [task for task in tasks if in_degree[task] == 0]
+    width = 0
+    while level:
+        width = max(width, sum(_get_task_width(task) for task in level))
+        next_level = []
+        for task in level:
+            for dependent in dependents[task]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    next_level.append(dependent)
+        level = next_level
+
+    return width
+
+
+class _MapState:
+    """Results of the chunks of a map task being run."""
+
+    def __init__(self, sizes: list[int]):
+        self.sizes = sizes
+        self.results = [None] * len(sizes)
+        self.pending = len(sizes)
+        self.done_items = 0
+        self.result = None
+        self.start_time = datetime.datetime.now(datetime.UTC)
+        self.end_time = None
+
+    @property
+    def progress(self) -> float:
+        """The fraction of the elements that have been processed."""
+        return self.done_items / sum(self.sizes) if self.sizes else 1
+
+    def add(self, chunk: int, task_com: TaskCom):
+        """Record the results of a chunk."""
+        self.results[chunk] = task_com.result
+        self.pending -= 1
+        self.done_items += self.sizes[chunk]
+
+    def gather(self) -> TaskCom:
+        """Return the outcome of the map task, with the results of all the elements in order."""
+        self.result = [result for results in self.results for result in results]
+        self.end_time = datetime.datetime.now(datetime.UTC)
+
+        return TaskCom(self)
+
+
+class TaskScheduler:
+    """Run pipeline tasks as soon as their upstream tasks are finished.
+
+    Completion is signalled through the pool callbacks, which feed a queue the scheduler blocks on: there is no
+    polling involved, and a finished task releases its dependents in O(out-degree) thanks to a precomputed
+    in-degree / dependents index.
+
+    Each task is routed to the pool of its executor. Tasks running in worker processes reserve as many workers as
+    their number of CPUs (times their number of chunks for map tasks, capped to the size of the pool), and wait for
+    enough workers to be available before being submitted. Large results of tasks running in worker processes, and
+    large inputs of these tasks, are spilled to disk by the result transport.
+
+    Map tasks are split into chunks, each chunk being submitted as a separate work item. Their progress (as well as
+    the progress of the whole run) is reported each time the overall percentage changes.
+
+    Generator tasks run on dedicated threads (see StreamProducer): their downstream task is released as soon as the
+    generator is started, and consumes the chunks through a TaskStream while they are produced.
+
+    Failed (or timed out) tasks are retried according to their retry options. When a task fails for good, the
+    scheduler stops: tasks that have not been started are marked as skipped, and running tasks are cancelled when
+    the pools are terminated.
+
+    Parameters
+    ----------
+    tasks : list[Task]
+        The tasks to run.
+    pools : PoolGroup
+        The pools to use for task execution.
+    on_progress : typing.Callable[[int], None]
+        Called with the progress percentage each time a task is finished.
+    transport : ResultTransport, optional
+        The result transport used by tasks running in worker processes.
+    checkpoints : RunCheckpoints, optional
+        If provided, the outcome of each finished task is checkpointed, and tasks with a checkpoint in the run to
+        resume from are restored instead of being executed.
+    total : int, optional
+        The total number of tasks used to compute the progress (defaults to the number of tasks to run).
+    profile : RunProfile, optional
+        If provided, the work items are profiled, and their metrics are collected in the run profile along with the
+        queue wait, retries and outcome of each task.
+    profiler : CodeProfiler, optional
+        If provided, the code of the tasks is profiled (see CodeProfiler).
+    """
+
+    def __init__(
+        self,
+        tasks: list[Task],
+        pools: PoolGroup,
+        on_progress: typing.Callable[[int], None],
+        transport: ResultTransport | None = None,
+        checkpoints: RunCheckpoints | None = None,
+        total: int | None = None,
+        profile: RunProfile | None = None,
+        profiler: CodeProfiler | None = None,
+    ):
+        self.tasks = tasks
+        self.pools = pools
+        self.on_progress = on_progress
+        self.transport = transport
+        self.checkpoints = checkpoints
+        self.total = total if total is not None else len(tasks)
+        self.profile = profile
+        self.profiler = profiler
+
+        self.in_degree, self.dependents = build_task_graph(tasks)
+        self.ready = deque(task for task in tasks if self.in_degree[task] == 0)
+        self.completions = queue.SimpleQueue()
+        self.completed = 0
+        self.last_progress = None
+        self.running = {}  # task -> deadline (None if the task has no timeout)
+        self.delayed = []  # heap of (time at which the task can be retried, attempt, task id, task)
+        self.free_cpus = pools.max_workers
+        self.reserved_cpus = {}
+        self.maps = {}  # map task -> _MapState
+        self.waiting_for_cpus = deque()
+        self.checkpoint_keys = {}
+        self.producers = []
+        self.spilled_results = {}  # upstream task -> its result, spilled for tasks running in worker processes
+
+        if profile is not None:
+            for task in self.ready:
+                profile.ready(task)
+        for task in tasks:
+            if task.streaming and len(self.dependents[task]) > 1:
+                raise ValueError(f'Generator task "{task.name}" can only have one downstream task')
+
+    def run(self):
+        """Run all the tasks.
+
+        Raises
+        ------
+        TaskFailedError
+            If a task failed after all its retries.
+        """
+        try:
+            while self.ready or self.running or self.delayed:
+                while self.ready:
+                    self._submit(self.ready.popleft())
+
+                try:
+                    task, attempt, chunk, task_com, error = self.completions.get(timeout=self._get_wait_timeout())
+                except queue.Empty:
+                    self._handle_timeouts()
+                    self._release_delayed()
+                    continue
+
+                if task not in self.running or attempt != task.attempts:
+                    continue  # outcome of an attempt that timed out or failed, ignore it
+                if self.profile is not None and error is None:
+                    self.profile.add_work_item(task, getattr(task_com, "metrics", None))
+                if chunk is not None and error is None:
+                    task_com = self._gather_chunk(task, chunk, task_com)
+                    if task_com is None:
+                        continue  # other chunks are still running
+                self._release(task)
+
+                if error is not None:
+                    self._handle_failure(task, error)
+                else:
+                    self._handle_success(task, task_com)
+        finally:
+            for producer in self.producers:
+                producer.cancel()
+
+    def _submit(self, task: Task):
+        executor = task.executor or self.pools.default_executor
+
+        # Generator tasks cannot be restored: their chunks are not stored
+        if self.checkpoints is not None and not task.streaming and task not in self.checkpoint_keys:
+            self.checkpoint_keys[task] = get_checkpoint_key(task.get_work_item())
+            task_com = self.checkpoints.restore(self.checkpoint_keys[task]) if self.checkpoint_keys[task] else None
+            if task_com is not None:
+                print(f'{get_timestamp()} Restored task "{task.compute.__name__}" from checkpoint')
+                task.pooled = True
+                self._complete(task, task_com, RESTORED)
+                return
+
+        if task.streaming:
+            self._start_stream(task, executor)
+            return
+
+        # Only send the task function and its resolved inputs to the worker, not the task graph
+        transport = self.transport if executor == PROCESS else None
+        inputs = self._spill_inputs(task) if transport is not None else None
+        profile = self.profile is not None
+        if isinstance(task, MapTask):
+            work_items = task.get_chunk_work_items(
+                transport, self.pools.max_workers, profile=profile, profiler=self.profiler, inputs=inputs
+            )
+        else:
+            work_items = [task.get_work_item(transport, profile=profile, profiler=self.profiler, inputs=inputs)]
+
+        if executor == PROCESS:
+            reserved_cpus = min(task.cpus * max(len(work_items), 1), self.pools.max_workers)
+            if reserved_cpus > self.free_cpus:
+                self.waiting_for_cpus.append(task)
+                return
+            self.free_cpus -= reserved_cpus
+            self.reserved_cpus[task] = reserved_cpus
+
+        task.attempts += 1
+        attempt = task.attempts
+        if attempt == 1:
+            print(f'{get_timestamp()} Started task "{task.compute.__name__}"')
+        else:
+            print(f'{get_timestamp()} Started task "{task.compute.__name__}" (attempt {attempt}/{task.retries + 1})')
+
+        self.running[task] = time.monotonic() + task.timeout if task.timeout is not None else None
+        task.pooled = True
+        if self.profile is not None:
+            self.profile.submitted(task, executor)
+        if isinstance(task, MapTask):
+            self.maps[task] = _MapState([len(work_item.args[0]) for work_item in work_items])
+            if not work_items:
+                self.completions.put((task, attempt, None, self.maps.pop(task).gather(), None))
+
+        pool = self.pools.get(executor)
+        for chunk, work_item in enumerate(work_items):
+            chunk = chunk if isinstance(task, MapTask) else None
+            pool.apply_async(
+                work_item.run,
+                callback=lambda task_com, task=task, attempt=attempt, chunk=chunk: self.completions.put(
+                    (task, attempt, chunk, task_com, None)
+                ),
+                error_callback=lambda e, task=task, attempt=attempt, chunk=chunk: self.completions.put(
+                    (task, attempt, chunk, None, e)
+                ),
+            )
+
+    def _spill_inputs(self, task: Task) -> dict[Task, typing.Any]:
+        """Spill the large results of the upstream tasks of a task sent to worker processes, whatever their executor.
+
+        Results of tasks run in threads (or inline) are spilled in the main process, once for all their downstream
+        tasks, so that they are not pickled through the pool pipes. The collection of a map task is split into chunks
+        in the main process, and is not spilled.
+        """
+        collection = task.task_args[0] if isinstance(task, MapTask) and task.task_args else None
+        inputs = {}
+        for upstream in task.get_upstream_tasks():
+            if upstream is collection and upstream not in task.task_kwargs.values():
+                continue
+            if upstream not in self.spilled_results:
+                self.spilled_results[upstream] = self.transport.dump(upstream.result)
+            inputs[upstream] = self.spilled_results[upstream]
+
+        return inputs
+
+    def _gather_chunk(self, task: MapTask, chunk: int, task_com: TaskCom) -> TaskCom | None:
+        """Record the results of a chunk of a map task, and return the outcome of the task if it is complete."""
+        state = self.maps[task]
+        state.add(chunk, task_com)
+        if state.pending > 0:
+            self._report_progress()
+            return None
+
+        del self.maps[task]
+        return state.gather()
+
+    def _start_stream(self, task: Task, executor: str):
+        """Start the producer thread of a generator task, and release its downstream task right away."""
+        consumers = self.dependents[task]
+        queues = [
+            self.pools.create_queue(consumer.executor or self.pools.default_executor, task.buffer_size)
+            for consumer in consumers
+        ]
+        # The stream is passed to the downstream task in place of the task result
+        task.result = TaskStream(task.name, queues[0]) if queues else None
+
+        task.attempts += 1
+        attempt = task.attempts
+        print(f'{get_timestamp()} Started task "{task.compute.__name__}"')
+        self.running[task] = None
+        if self.profile is not None:
+            self.profile.submitted(task, executor)
+        producer = StreamProducer(
+            task.get_work_item(profile=self.profile is not None, profiler=self.profiler),
+            queues,
+            callback=lambda task_com: self.completions.put((task, attempt, None, task_com, None)),
+            error_callback=lambda e: self.completions.put((task, attempt, None, None, e)),
+        )
+        producer.start()
+        self.producers.append(producer)
+        task.pooled = True
+        self._release_dependents(task)
+
+    def _release(self, task: Task):
+        """Mark the task as not running anymore, and give back its workers to the tasks waiting for CPUs."""
+        del self.running[task]
+        self.maps.pop(task, None)
+        if task in self.reserved_cpus:
+            self.free_cpus += self.reserved_cpus.pop(task)
+            self.ready.extendleft(reversed(self.waiting_for_cpus))
+            self.waiting_for_cpus.clear()
+
+    def _handle_success(self, task: Task, task_com: TaskCom):
+        if self.checkpoints is not None and self.checkpoint_keys.get(task) is not None:
+            self.checkpoints.save(self.checkpoint_keys[task], task_com)
+        self._complete(task, task_com)
+
+    def _complete(self, task: Task, task_com: TaskCom, status: str = SUCCEEDED):
+        if self.profile is not None:
+            self.profile.finished(task, status)
+        task.start_time = task_com.start_time
+        task.end_time = task_com.end_time
+
+        self.completed += 1
+        print(f'{get_timestamp()} Finished task "{task.compute.__name__}"')
+        self._report_progress()
+
+        # The downstream task of a generator task has been released when the generator was started
+        if not task.streaming:
+            task.result = task_com.result
+            self._release_dependents(task)
+
+    def _report_progress(self):
+        """Report the progress of the run, including the partial progress of map tasks, if it has changed."""
+        completed = self.completed + sum(state.progress for state in self.maps.values())
+        progress = int(round(completed / self.total * 100, 6))  # avoid floating point errors such as 28.999...
+        if progress != self.last_progress:
+            self.last_progress = progress
+            self.on_progress(progress)
+
+    def _release_dependents(self, task: Task):
+        for dependent in self.dependents[task]:
+            self.in_degree[dependent] -= 1
+            if self.in_degree[dependent] == 0:
+                self.ready.append(dependent)
+                if self.profile is not None:
+                    self.profile.ready(dependent)
+
+    def _handle_failure(self, task: Task, error: BaseException):
+        # Streams cannot be replayed: tasks consuming a stream are not retried
+        consumes_stream = any(upstream.streaming for upstream in task.get_upstream_tasks())
+        if task.attempts <= task.retries and not consumes_stream:
+            delay = task.retry_backoff * 2 ** (task.attempts - 1)
+            print(
+                f'{get_timestamp()} Task "{task.compute.__name__}" failed (attempt {task.attempts}/{task.retries + 1})'
+                f": {error}. Retrying in {delay:g}s"
+            )
+            heapq.heappush(self.delayed, (time.monotonic() + delay, task.attempts, id(task), task))
+            return
+
+        print(f'{get_timestamp()} Failed task "{task.compute.__name__}": {error}')
+        if self.profile is not None:
+            self.profile.finished(task, FAILED, error)
+        self._skip_pending_tasks(failed_task=task)
+        raise TaskFailedError(task, error)
+
+    def _skip_pending_tasks(self, failed_task: Task):
+        """Mark all tasks that are not finished nor running as skipped (running tasks are cancelled by the caller)."""
+        for task in self.tasks:
+            if task is not failed_task and task.end_time is None and task not in self.running:
+                task.skipped = True
+                print(f'{get_timestamp()} Skipped task "{task.compute.__name__}"')
+                if self.profile is not None:
+                    self.profile.finished(task, SKIPPED)
+        for task in self.running:
+            print(f'{get_timestamp()} Cancelling task "{task.compute.__name__}"')
+            if self.profile is not None:
+                self.profile.finished(task, CANCELLED)
+
+    def _get_wait_timeout(self) -> float | None:
+        """Return the time until the next task deadline or retry (None if there is none)."""
+        deadlines = [deadline for deadline in self.running.values() if deadline is not None]
+        if self.delayed:
+            deadlines.append(self.delayed[0][0])
+        if not deadlines:
+            return None
+
+        return max(0, min(deadlines) - time.monotonic())
+
+    def _handle_timeouts(self):
+        now = time.monotonic()
+        for task, deadline in list(self.running.items()):
+            if deadline is not None and deadline <= now:
+                # The attempt cannot be interrupted, but its outcome will be ignored
+                self._release(task)
+                self._handle_failure(task, TimeoutError(f"Task timed out after {task.timeout:g}s"))
+
+    def _release_delayed(self):
+        now = time.monotonic()
+        while self.delayed and self.delayed[0][0] <= now:
+            task = heapq.heappop(self.delayed)[-1]
+            self.ready.append(task)
+            if self.profile is not None:
+                self.profile.ready(task)
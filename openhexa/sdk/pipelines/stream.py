@@ -0,0 +1,136 @@
+"""Streaming of the chunks yielded by generator tasks to downstream tasks.
+
+A task whose function is a generator function is a streaming task. Instead of waiting for the whole result, its
+downstream task is started as soon as the generator is started, and receives a TaskStream: an iterable over the
+chunks yielded by the generator. Chunks go through a bounded queue, so that the generator is paused when the
+downstream task falls behind (backpressure), and only a few chunks are held in memory at any time.
+"""
+
+import contextlib
+import datetime
+import queue
+import threading
+import typing
+
+from .profile import WorkItemProbe
+from .transport import load_result
+
+# Delay between two checks of the cancellation flag while waiting for room in a full queue, in seconds
+_PUT_INTERVAL = 0.1
+
+
+class StreamError(Exception):
+    """Raised when iterating over the stream of a generator task that failed."""
+
+
+class _EndOfStream:
+    """Marker sent after the last chunk of a stream, holding the error of the generator if it failed."""
+
+    def __init__(self, error: str | None = None):
+        self.error = error
+
+
+class TaskStream:
+    """Iterable over the chunks yielded by a generator task.
+
+    Streams are fed by a single producer and can only be iterated once. They are picklable when backed by a
+    multiprocess manager queue, which is the case when the downstream task runs in a worker process.
+
+    Parameters
+    ----------
+    name : str
+        The name of the generator task.
+    chunks : queue.Queue
+        The bounded queue the chunks are read from.
+    """
+
+    def __init__(self, name: str, chunks: queue.Queue):
+        self.name = name
+        self.chunks = chunks
+
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        """Yield the chunks as they are produced, raising a StreamError if the generator task fails."""
+        while True:
+            chunk = self.chunks.get()
+            if isinstance(chunk, _EndOfStream):
+                if chunk.error is not None:
+                    raise StreamError(f'Task "{self.name}" failed: {chunk.error}')
+                return
+            yield chunk
+
+    def __repr__(self):
+        """Safe representation of the stream."""
+        return f"<TaskStream {self.name}>"
+
+
+class StreamProducer(threading.Thread):
+    """Thread running a generator task, and sending the chunks it yields to the streams of its downstream tasks.
+
+    Producers run on dedicated threads of the main process rather than in the pools, so that a generator blocked by
+    backpressure never holds a worker needed by its consumer.
+
+    Parameters
+    ----------
+    work_item : TaskWorkItem
+        The work item of the generator task.
+    queues : list[queue.Queue]
+        The queues of the downstream streams.
+    callback : typing.Callable
+        Called with the TaskCom of the generator task when the generator is exhausted.
+    error_callback : typing.Callable
+        Called with the exception raised by the generator, if any.
+    """
+
+    def __init__(
+        self,
+        work_item,
+        queues: list[queue.Queue],
+        callback: typing.Callable,
+        error_callback: typing.Callable[[BaseException], None],
+    ):
+        super().__init__(name=f"stream-{work_item.name}", daemon=True)
+        self.work_item = work_item
+        self.queues = queues
+        self.callback = callback
+        self.error_callback = error_callback
+        self._cancelled = threading.Event()
+
+    def run(self):
+        """Iterate over the generator, blocking when the downstream queues are full."""
+        from .task import TaskCom
+
+        work_item = self.work_item
+        probe = WorkItemProbe(work_item.args, work_item.kwargs, pickled=False) if work_item.profile else None
+        work_item.start_time = datetime.datetime.now(datetime.UTC)
+        try:
+            args = [load_result(a) for a in work_item.args]
+            kwargs = {k: load_result(a) for k, a in work_item.kwargs.items()}
+            profiler = work_item.profiler.profile(work_item.name) if work_item.profiler else contextlib.nullcontext()
+            with profiler:
+                for chunk in work_item.function(*args, **kwargs):
+                    self._put_all(chunk)
+                    if self._cancelled.is_set():
+                        return
+        except BaseException as e:
+            self._put_all(_EndOfStream(str(e)))
+            self.error_callback(e)
+            return
+
+        self._put_all(_EndOfStream())
+        work_item.end_time = datetime.datetime.now(datetime.UTC)
+        if probe is not None:
+            work_item.metrics = probe.finish(None)
+        self.callback(TaskCom(work_item))
+
+    def cancel(self):
+        """Stop the producer after the current chunk (or while it waits for room in a full queue)."""
+        self._cancelled.set()
+
+    def _put_all(self, chunk: typing.Any):
+        for chunks in self.queues:
+            while not self._cancelled.is_set():
+                try:
+                    chunks.put(chunk, timeout=_PUT_INTERVAL)
+                    break
+                except queue.Full:
+                    continue
@@ -5,10 +5,20 @@ See https://github.com/BLSQ/openhexa/wiki/Writing-OpenHEXA-pipelines#pipelines-a
 
 from __future__ import annotations
 
+import contextlib
 import datetime
+import inspect
 import typing
 
 import openhexa.sdk.pipelines.pipeline
+from openhexa.sdk.utils import get_timestamp
+
+from .cache import TaskCache, get_task_cache_key, validate_cache_ttl
+from .code_profile import CodeProfiler
+from .executor import validate_executor
+from .profile import WorkItemProbe
+from .telemetry import worker_telemetry
+from .transport import ResultTransport, load_result
 
 
 class TaskCom:
@@ -21,6 +31,104 @@ class TaskCom:
         self.result = task.result
         self.start_time = task.start_time
         self.end_time = task.end_time
+        self.metrics = getattr(task, "metrics", None)
+
+
+class TaskWorkItem:
+    """Self-contained unit of work sent to pool workers.
+
+    Work items only hold the task function and its concrete inputs (or handles to spilled results), so that the cost
+    of sending them to workers does not depend on the shape of the task graph.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        function: typing.Callable,
+        args: typing.Sequence[typing.Any],
+        kwargs: dict[str, typing.Any],
+        transport: ResultTransport | None = None,
+        cache: TaskCache | None = None,
+        cache_ttl: int | None = None,
+        profile: bool = False,
+        profiler: CodeProfiler | None = None,
+    ):
+        self.name = name
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.transport = transport
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.profile = profile
+        self.profiler = profiler
+        self.result = None
+        self.start_time = None
+        self.end_time = None
+        self.metrics = None
+
+    def run(self) -> TaskCom:
+        """Run the task function and return its result as a TaskCom instance.
+
+        If the work item has a cache and a fresh result is stored for the same function code and inputs, the cached
+        result is returned without executing the function.
+
+        If the work item is profiled, its metrics are measured (see WorkItemProbe) and returned along with its result.
+        If it has a code profiler, the execution of the function is profiled (see CodeProfiler).
+        """
+        probe = WorkItemProbe(self.args, self.kwargs, pickled=self.transport is not None) if self.profile else None
+        cache_key = self.get_key() if self.cache is not None else None
+        self.start_time = datetime.datetime.now(datetime.UTC)
+        hit, self.result = self.cache.get(cache_key, self.cache_ttl) if cache_key is not None else (False, None)
+        if hit:
+            print(f'{get_timestamp()} Using cached result for task "{self.name}"')
+        else:
+            args = [load_result(a) for a in self.args]
+            kwargs = {k: load_result(a) for k, a in self.kwargs.items()}
+            # In worker processes, the telemetry of the task is sent before the task completes
+            with worker_telemetry(), self.profiler.profile(self.name) if self.profiler else contextlib.nullcontext():
+                self.result = self.execute(args, kwargs)
+            if cache_key is not None:
+                self.cache.put(cache_key, self.result)
+        self.end_time = datetime.datetime.now(datetime.UTC)
+
+        # large results are spilled to disk rather than sent back through the pool
+        if self.transport is not None:
+            self.result = self.transport.dump(self.result)
+        if probe is not None:
+            self.metrics = probe.finish(self.result, cached=hit)
+
+        return TaskCom(self)
+
+    def get_key(self) -> str | None:
+        """Return the key identifying the work item in the task cache and in checkpoints (see get_task_cache_key())."""
+        return get_task_cache_key(self.function, self.args, self.kwargs, variant=type(self).__name__)
+
+    def execute(self, args: list[typing.Any], kwargs: dict[str, typing.Any]) -> typing.Any:
+        """Call the task function with the loaded inputs."""
+        return self.function(*args, **kwargs)
+
+
+class MapWorkItem(TaskWorkItem):
+    """Work item applying the task function to each element of a chunk of a collection.
+
+    The chunk is the first argument of the work item, the other arguments being passed to each call. The bounds of the
+    chunk in the collection (None for the work item of the whole map task) are part of its key.
+    """
+
+    def __init__(self, *args, bounds: tuple[int, int] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bounds = bounds
+
+    def get_key(self) -> str | None:
+        """Return the key identifying the work item, including the bounds of its chunk."""
+        variant = f"{type(self).__name__}{list(self.bounds) if self.bounds is not None else ''}"
+        return get_task_cache_key(self.function, self.args, self.kwargs, variant=variant)
+
+    def execute(self, args: list[typing.Any], kwargs: dict[str, typing.Any]) -> list[typing.Any]:
+        """Call the task function for each element of the chunk, and return the list of results."""
+        items, *args = args
+        return [self.function(item, *args, **kwargs) for item in items]
 
 
 class Task:
@@ -29,9 +137,32 @@ class Task:
     See https://github.com/BLSQ/openhexa/wiki/Writing-OpenHEXA-pipelines#pipelines-and-tasks for more information.
     """
 
-    def __init__(self, function: typing.Callable):
+    work_item_class = TaskWorkItem
+
+    def __init__(
+        self,
+        function: typing.Callable,
+        executor: str | None = None,
+        cpus: int = 1,
+        cache: bool = False,
+        cache_ttl: int | None = None,
+        retries: int = 0,
+        retry_backoff: float = 1,
+        timeout: float | None = None,
+        buffer_size: int = 8,
+    ):
         self.name = function.__name__
         self.compute = function
+        self.executor = executor
+        self.cpus = cpus
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.buffer_size = buffer_size
+        self.attempts = 0
+        self.skipped = False
         self.inputs = []
         self.result = None
         self.start_time = None
@@ -41,6 +172,11 @@ class Task:
         self.active = False
         self.pooled = False
 
+    @property
+    def streaming(self) -> bool:
+        """Whether the task function is a generator function, whose chunks are streamed to the downstream task."""
+        return inspect.isgeneratorfunction(self.compute)
+
     def is_ready(self) -> bool:
         """Determine whether the task is ready to be run.
 
@@ -76,6 +212,13 @@ class Task:
 
         return list(set(tasks))
 
+    def get_upstream_tasks(self) -> list[Task]:
+        """Return the tasks this task directly depends on, without duplicates and in argument order."""
+        upstream = [a for a in self.task_args if issubclass(type(a), Task)]
+        upstream += [a for a in self.task_kwargs.values() if issubclass(type(a), Task)]
+
+        return list(dict.fromkeys(upstream))
+
     def run(self) -> TaskCom:
         """Run the task.
 
@@ -88,12 +231,35 @@ class Task:
             # already executed, return previous result
             return self.result
 
+        task_com = self.get_work_item().run()
+        self.result = task_com.result
+        self.start_time = task_com.start_time
+        self.end_time = task_com.end_time
+
+        # done!
+        return task_com
+
+    def get_work_item(
+        self,
+        transport: ResultTransport | None = None,
+        profile: bool = False,
+        profiler: CodeProfiler | None = None,
+        inputs: dict[Task, typing.Any] | None = None,
+    ) -> TaskWorkItem:
+        """Build the work item corresponding to the task, with the results of upstream tasks as inputs.
+
+        Upstream tasks must have been executed: their results (or handles to their spilled results) replace them in
+        the task arguments, so that the work item does not reference the task graph. The inputs argument can provide
+        values to use in place of the results of some upstream tasks (e.g. handles to their spilled results).
+        """
+        inputs = inputs or {}
+
         # forge task inputs
         r_task_args = []
         for a in self.task_args:
             if issubclass(type(a), Task):
-                # previous task; execute + fw results
-                r_task_args.append(a.result)
+                # previous task; fw results
+                r_task_args.append(inputs.get(a, a.result))
             else:
                 # normal parameters, follow up
                 r_task_args.append(a)
@@ -101,17 +267,21 @@ class Task:
         r_task_kwargs = {}
         for k, a in self.task_kwargs.items():
             if issubclass(type(a), Task):
-                r_task_kwargs[k] = a.result
+                r_task_kwargs[k] = inputs.get(a, a.result)
             else:
                 r_task_kwargs[k] = a
 
-        # execute the task
-        self.start_time = datetime.datetime.now(datetime.UTC)
-        self.result = self.compute(*r_task_args, **r_task_kwargs)
-        self.end_time = datetime.datetime.now(datetime.UTC)
-
-        # done!
-        return TaskCom(self)
+        return self.work_item_class(
+            self.name,
+            self.compute,
+            r_task_args,
+            r_task_kwargs,
+            transport=transport,
+            cache=TaskCache.from_settings() if self.cache else None,
+            cache_ttl=self.cache_ttl,
+            profile=profile,
+            profiler=profiler,
+        )
 
     def __call__(self, *task_args, **task_kwargs):
         """Wrap the task with args and kwargs and return it."""
@@ -127,19 +297,174 @@ class Task:
         return self.name
 
 
+class MapTask(Task):
+    """Task applying its function to each element of a collection, in parallel chunks (see PipelineWithTask.map()).
+
+    The collection is the first argument of the task. Its result is the list of the results for each element.
+    """
+
+    work_item_class = MapWorkItem
+
+    def __init__(self, function: typing.Callable, chunksize: int | None = None, **options):
+        super().__init__(function, **options)
+        self.chunksize = chunksize
+
+    def get_max_chunks(self) -> int | None:
+        """Return the maximum number of chunks of the task, or None if the collection is the result of an upstream task.
+
+        Unless the task has an explicit chunk size, the number of chunks depends on the size of the pool, and is at most
+        the number of elements of the collection.
+        """
+        items = self.task_args[0] if self.task_args else []
+        if isinstance(items, Task) or not isinstance(items, typing.Sized):
+            return None
+        if self.chunksize is None:
+            return len(items)
+
+        return -(-len(items) // self.chunksize)
+
+    def get_chunk_work_items(
+        self,
+        transport: ResultTransport | None = None,
+        max_workers: int = 1,
+        profile: bool = False,
+        profiler: CodeProfiler | None = None,
+        inputs: dict[Task, typing.Any] | None = None,
+    ) -> list[MapWorkItem]:
+        """Split the collection into chunks, and return one work item per chunk.
+
+        Unless the task has an explicit chunk size, the collection is split into about 4 chunks per worker.
+        """
+        work_item = self.get_work_item(transport, profile, profiler, inputs)
+        items, *args = work_item.args
+        items = list(load_result(items))
+        chunksize = self.chunksize or get_default_chunksize(len(items), max_workers)
+
+        return [
+            MapWorkItem(
+                self.name,
+                self.compute,
+                [items[i : i + chunksize], *args],
+                work_item.kwargs,
+                transport=transport,
+                cache=work_item.cache,
+                cache_ttl=self.cache_ttl,
+                profile=profile,
+                profiler=profiler,
+                bounds=(i, min(i + chunksize, len(items))),
+            )
+            for i in range(0, len(items), chunksize)
+        ]
+
+
+def get_default_chunksize(length: int, max_workers: int) -> int:
+    """Return the default chunk size of a map task, following the heuristic of multiprocessing.Pool.map()."""
+    chunksize, extra = divmod(length, max_workers * 4)
+
+    return max(chunksize + (1 if extra else 0), 1)
+
+
 class PipelineWithTask:
-    """Pipeline with attached tasks, usually through the @task decorator."""
+    """Pipeline with attached tasks, usually through the @task decorator.
+
+    The options (scheduling hints, caching) are applied to every task created from the decorated function.
+    """
 
     def __init__(
         self,
         function: typing.Callable,
         pipeline: openhexa.sdk.pipelines.Pipeline,
+        executor: str | None = None,
+        cpus: int = 1,
+        cache: bool = False,
+        cache_ttl: int | datetime.timedelta | None = None,
+        retries: int = 0,
+        retry_backoff: float = 1,
+        timeout: float | None = None,
+        buffer_size: int = 8,
     ):
+        if executor is not None:
+            validate_executor(executor)
+        if not isinstance(cpus, int) or cpus < 1:
+            raise ValueError(f"Invalid cpus {cpus!r}, expected a positive integer")
+        if not isinstance(retries, int) or retries < 0:
+            raise ValueError(f"Invalid retries {retries!r}, expected a positive integer or 0")
+        if not isinstance(retry_backoff, int | float) or retry_backoff < 0:
+            raise ValueError(f"Invalid retry_backoff {retry_backoff!r}, expected a positive number of seconds or 0")
+        if timeout is not None and (not isinstance(timeout, int | float) or timeout <= 0):
+            raise ValueError(f"Invalid timeout {timeout!r}, expected a positive number of seconds")
+        if not isinstance(buffer_size, int) or buffer_size < 1:
+            raise ValueError(f"Invalid buffer_size {buffer_size!r}, expected a positive integer")
+        if inspect.isgeneratorfunction(function) and (cache or retries > 0 or timeout is not None):
+            raise ValueError(f'Generator task "{function.__name__}" cannot be cached, retried or timed out')
+
         self.function = function
         self.pipeline = pipeline
+        self.executor = executor
+        self.cpus = cpus
+        self.cache = cache
+        self.cache_ttl = validate_cache_ttl(cache_ttl)
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.buffer_size = buffer_size
 
     def __call__(self, *task_args, **task_kwargs) -> Task:
         """Attach the new task to the decorated pipeline and return it."""
-        task = Task(self.function)(*task_args, **task_kwargs)
+        task = Task(
+            self.function,
+            executor=self.executor,
+            cpus=self.cpus,
+            cache=self.cache,
+            cache_ttl=self.cache_ttl,
+            retries=self.retries,
+            retry_backoff=self.retry_backoff,
+            timeout=self.timeout,
+            buffer_size=self.buffer_size,
+        )(*task_args, **task_kwargs)
+        self.pipeline.tasks.append(task)
+        return task
+
+    def map(self, iterable: typing.Iterable | Task, *task_args, chunksize: int | None = None, **task_kwargs) -> Task:
+        """Attach a task applying the decorated function to each element of the iterable to the pipeline.
+
+        The elements are processed in parallel chunks, and the result of the task (passed to downstream tasks) is the
+        list of the results for each element, in order.
+
+        Parameters
+        ----------
+        iterable : typing.Iterable | Task
+            The collection to map over, or an upstream task returning it.
+        *task_args, **task_kwargs
+            Additional arguments passed to the function for each element (possibly upstream tasks).
+        chunksize : int, optional
+            The number of elements processed by each work item (by default, about 4 chunks per worker).
+
+        Examples
+        --------
+        >>> @pipeline("my-pipeline")
+        ... def my_pipeline():
+        ...     org_units = get_org_units()
+        ...     reports = build_report.map(org_units, period="2024")
+        ...     publish(reports)
+        """
+        if inspect.isgeneratorfunction(self.function):
+            raise ValueError(f'Generator task "{self.function.__name__}" cannot be mapped')
+        if isinstance(iterable, Task) and iterable.streaming:
+            raise ValueError(f'Cannot map over generator task "{iterable.name}"')
+        if chunksize is not None and (not isinstance(chunksize, int) or chunksize < 1):
+            raise ValueError(f"Invalid chunksize {chunksize!r}, expected a positive integer")
+
+        task = MapTask(
+            self.function,
+            chunksize=chunksize,
+            executor=self.executor,
+            cpus=self.cpus,
+            cache=self.cache,
+            cache_ttl=self.cache_ttl,
+            retries=self.retries,
+            retry_backoff=self.retry_backoff,
+            timeout=self.timeout,
+        )(iterable, *task_args, **task_kwargs)
         self.pipeline.tasks.append(task)
         return task
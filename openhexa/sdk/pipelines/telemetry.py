@@ -0,0 +1,211 @@
+"""Batched, asynchronous telemetry channel for pipeline runs.
+
+During a pipeline run, log messages and progress updates are not sent to the OpenHEXA backend on the caller's thread.
+They are queued, and a background thread sends them in batches, as a single GraphQL request with one aliased
+mutation per operation. Batches are sent every FLUSH_INTERVAL seconds, as soon as MAX_BATCH_SIZE operations are
+queued, when an operation needs an answer (run outputs), and when the channel is flushed or stopped.
+
+Queuing never blocks: when the queue is full, messages are dropped (and a warning is printed).
+"""
+
+import os
+import queue
+import threading
+import typing
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from multiprocess import parent_process  # NOQA
+
+from openhexa.sdk.utils import get_timestamp, graphql
+
+if typing.TYPE_CHECKING:
+    from .run import CurrentRun
+
+FLUSH_INTERVAL = 1.0
+MAX_BATCH_SIZE = 50
+MAX_QUEUE_SIZE = 10_000
+
+LOG_MESSAGE = ("logPipelineMessage", "LogPipelineMessageInput")
+UPDATE_PROGRESS = ("updatePipelineProgress", "UpdatePipelineProgressInput")
+ADD_OUTPUT = ("addPipelineOutput", "AddPipelineOutputInput")
+
+
+class _Operation:
+    """A queued mutation, with the future receiving its result if the caller waits for it."""
+
+    def __init__(self, mutation: tuple[str, str], variables: dict, future: Future | None = None):
+        self.mutation = mutation
+        self.variables = variables
+        self.future = future
+
+
+def build_batch_mutation(operations: list[_Operation]) -> tuple[str, dict]:
+    """Build a single GraphQL mutation running all the provided operations, using one alias per operation.
+
+    Returns
+    -------
+    tuple[str, dict]
+        The mutation document and its variables. The result of the operation at index i is aliased as "op<i>".
+    """
+    definitions = []
+    fields = []
+    variables = {}
+    for i, operation in enumerate(operations):
+        field, input_type = operation.mutation
+        definitions.append(f"$input{i}: {input_type}!")
+        fields.append(f"op{i}: {field}(input: $input{i}) {{ success errors }}")
+        variables[f"input{i}"] = operation.variables
+
+    return f"mutation batch({', '.join(definitions)}) {{\n  " + "\n  ".join(fields) + "\n}", variables
+
+
+class TelemetryDispatcher:
+    """Background dispatcher batching the telemetry operations of a process.
+
+    The dispatcher is bound to the process that started it: in other processes (worker processes forked from it for
+    instance), it is not active until started again.
+    """
+
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        """Whether the dispatcher has been started in the current process (and not stopped)."""
+        return self._thread is not None and self._pid == os.getpid()
+
+    def start(self):
+        """Start the dispatcher thread, if it is not already running in the current process."""
+        with self._lock:
+            if self.active:
+                return
+            self._queue = queue.Queue(MAX_QUEUE_SIZE)
+            self._pid = os.getpid()
+            self._dropped = 0
+            self._thread = threading.Thread(target=self._run, name="PipelineTelemetry", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Send all the pending operations and stop the dispatcher thread."""
+        with self._lock:
+            if not self.active:
+                return
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def flush(self):
+        """Block until all the operations queued so far have been sent."""
+        if self.active:
+            self.call(None)
+
+    def log_message(self, priority: str, message: str):
+        """Queue a log message, without blocking."""
+        self._put(_Operation(LOG_MESSAGE, {"priority": priority, "message": message}))
+
+    def update_progress(self, percent: int):
+        """Queue a progress update, without blocking (only the last update of a batch is sent)."""
+        self._put(_Operation(UPDATE_PROGRESS, {"percent": percent}))
+
+    def call(self, mutation: tuple[str, str] | None, variables: dict | None = None) -> dict | None:
+        """Send an operation with the pending ones, and wait for its result ({"success": ..., "errors": ...})."""
+        future = Future()
+        self._queue.put(_Operation(mutation, variables, future))
+
+        return future.result()
+
+    def _put(self, operation: _Operation):
+        try:
+            self._queue.put_nowait(operation)
+        except queue.Full:
+            self._dropped += 1
+            if self._dropped == 1:
+                print(f"{get_timestamp()} Telemetry queue is full, messages are being dropped")
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=FLUSH_INTERVAL))
+                # Collect what is already queued, up to the batch size, unless someone waits for an answer
+                while len(batch) < MAX_BATCH_SIZE and batch[-1] is not None and batch[-1].future is None:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            if batch and batch[-1] is None:
+                stopping = True
+                batch.pop()
+            self._send(batch)
+
+    def _send(self, batch: list[_Operation]):
+        # Only the last progress update matters
+        progress = [operation for operation in batch if operation.mutation == UPDATE_PROGRESS]
+        operations = [
+            operation
+            for operation in batch
+            if operation.mutation is not None and (operation.mutation != UPDATE_PROGRESS or operation is progress[-1])
+        ]
+
+        results = {}
+        error = None
+        if operations:
+            try:
+                results = graphql(*build_batch_mutation(operations))
+            except Exception as e:
+                error = e
+                print(f"{get_timestamp()} Failed to send {len(operations)} telemetry operation(s): {e}")
+
+        for i, operation in enumerate(operations):
+            if operation.future is not None:
+                if error is not None:
+                    operation.future.set_exception(error)
+                else:
+                    operation.future.set_result(results[f"op{i}"])
+        # Flush markers
+        for operation in batch:
+            if operation.mutation is None:
+                operation.future.set_result(None)
+
+
+telemetry = TelemetryDispatcher()
+
+
+@contextmanager
+def telemetry_manager(run_context: "CurrentRun"):
+    """Context manager running the telemetry dispatcher for the duration of a pipeline run.
+
+    Parameters
+    ----------
+    run_context : CurrentRun
+        The current pipeline run context (nothing is dispatched when running locally).
+    """
+    if not run_context._connected:
+        yield None
+        return
+
+    telemetry.start()
+    try:
+        yield telemetry
+    finally:
+        telemetry.stop()
+
+
+@contextmanager
+def worker_telemetry():
+    """Context manager sending the telemetry of a task running in a worker process before it completes."""
+    if parent_process() is None or "HEXA_SERVER_URL" not in os.environ:
+        yield
+        return
+
+    telemetry.start()
+    try:
+        yield
+    finally:
+        telemetry.flush()
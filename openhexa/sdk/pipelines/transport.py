@@ -0,0 +1,166 @@
+"""Transport layer for task results.
+
+Task results are sent back from worker processes (and then to downstream tasks) by pickling them through the pool
+pipes. For large results (raster bytes, arrays, data frames...), this means several full copies of the data. The
+result transport writes such results to spill files instead, and only a small handle travels through the pool.
+Downstream tasks load the result from the file, using memory-mapping when the format allows it.
+
+Supported formats:
+
+- ``bytes`` / ``bytearray``: raw buffer
+- ``numpy.ndarray`` (non-object dtypes): ``.npy`` file, memory-mapped in copy-on-write mode when loaded
+- ``pandas.DataFrame``: Arrow IPC file (requires ``pyarrow``), memory-mapped when loaded
+
+Other values (including subclasses of these types, and data frames that Arrow cannot convert) are returned as is and
+go through the pool pipes as before.
+
+Spill files are removed at the end of the run: the spilled results of the tasks are loaded back in memory first, so
+that Task.result remains usable after the run.
+"""
+
+import os
+import shutil
+import sys
+import typing
+import uuid
+from pathlib import Path
+
+BYTES = "bytes"
+BYTEARRAY = "bytearray"
+NDARRAY = "ndarray"
+DATAFRAME = "dataframe"
+
+
+class SpilledResult:
+    """Lightweight, picklable handle to a task result written to a spill file by the result transport."""
+
+    def __init__(self, path: str, kind: str, size: int):
+        self.path = path
+        self.kind = kind
+        self.size = size
+
+    def load(self, mmap: bool = True) -> typing.Any:
+        """Load the result from its spill file.
+
+        Parameters
+        ----------
+        mmap : bool
+            Whether arrays and data frames are memory-mapped. Results that must remain usable once the spill file is
+            removed are read in memory instead.
+        """
+        if self.kind == BYTES:
+            return Path(self.path).read_bytes()
+        elif self.kind == BYTEARRAY:
+            return bytearray(Path(self.path).read_bytes())
+        elif self.kind == NDARRAY:
+            import numpy as np
+
+            # Copy-on-write mapping: the array can be modified without altering the spill file
+            return np.load(self.path, mmap_mode="c" if mmap else None, allow_pickle=False)
+        elif self.kind == DATAFRAME:
+            import pyarrow as pa
+
+            with pa.memory_map(self.path, "r") if mmap else pa.OSFile(self.path, "rb") as source:
+                return pa.ipc.open_file(source).read_all().to_pandas()
+
+        raise ValueError(f"Unsupported spilled result kind: {self.kind}")
+
+    def __repr__(self):
+        """Safe representation of the spilled result."""
+        return f"<SpilledResult kind={self.kind} size={self.size} path={self.path}>"
+
+
+def load_result(value: typing.Any, mmap: bool = True) -> typing.Any:
+    """Return the actual value of a task result, loading it from its spill file if needed (see SpilledResult.load())."""
+    if isinstance(value, SpilledResult):
+        return value.load(mmap=mmap)
+
+    return value
+
+
+class ResultTransport:
+    """Spill large task results to files in a run-specific directory.
+
+    Parameters
+    ----------
+    directory : str
+        The directory where spill files are written. It is created on the first spill, and removed by cleanup().
+    threshold : int
+        The size (in bytes) above which results are spilled.
+    """
+
+    def __init__(self, directory: str, threshold: int):
+        self.directory = directory
+        self.threshold = threshold
+
+    def dump(self, value: typing.Any) -> typing.Any:
+        """Spill the provided result if it is large enough and has a supported type.
+
+        Returns
+        -------
+        typing.Any
+            A SpilledResult handle if the value has been spilled, the value itself otherwise.
+        """
+        kind, size = _get_kind_and_size(value)
+        if kind is None or size < self.threshold:
+            return value
+
+        Path(self.directory).mkdir(parents=True, exist_ok=True)
+        path = os.path.join(self.directory, uuid.uuid4().hex)
+        if kind in (BYTES, BYTEARRAY):
+            with open(path, "wb") as f:
+                f.write(value)
+        elif kind == NDARRAY:
+            import numpy as np
+
+            path = f"{path}.npy"
+            np.save(path, value, allow_pickle=False)
+        elif kind == DATAFRAME:
+            import pyarrow as pa
+
+            try:
+                table = pa.Table.from_pandas(value)
+            except pa.ArrowException:
+                # Some data frames cannot be converted (e.g. object columns with mixed types): send them as is
+                return value
+            path = f"{path}.arrow"
+            with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        return SpilledResult(path, kind, size)
+
+    def cleanup(self):
+        """Remove all the spill files written during the run."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _get_kind_and_size(value: typing.Any) -> tuple[str | None, int]:
+    """Return the spill kind and the (approximate) in-memory size of the value.
+
+    numpy and pandas are only looked up in already imported modules: if the task did not import them, the value
+    cannot be an array or a data frame. Subclasses (GeoDataFrame, masked arrays...) are not spilled, since they would
+    be loaded back as instances of the base class.
+    """
+    if type(value) is bytes:
+        return BYTES, len(value)
+    elif type(value) is bytearray:
+        return BYTEARRAY, len(value)
+
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and type(value) is numpy.ndarray and not value.dtype.hasobject:
+        return NDARRAY, value.nbytes
+
+    pandas = sys.modules.get("pandas")
+    if pandas is not None and type(value) is pandas.DataFrame and _has_pyarrow():
+        return DATAFRAME, int(value.memory_usage(index=True, deep=False).sum())
+
+    return None, 0
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+
+    return True
@@ -1,17 +1,20 @@
 """Miscellaneous utility functions."""
 
 import abc
+import asyncio
+import collections
 import contextlib
 import datetime
 import enum
 import os
 import typing
+from concurrent.futures import ThreadPoolExecutor
 
 import httpx
 import requests
 
-from openhexa.graphql import BaseOpenHexaClient
-from openhexa.utils import create_requests_session
+from openhexa.graphql import BaseAsyncOpenHexaClient, BaseOpenHexaClient
+from openhexa.utils import get_shared_httpx_async_transport, get_shared_requests_session
 
 
 def get_timestamp() -> str:
@@ -67,6 +70,51 @@ class Settings:
         """Return the debug flag from environment variables."""
         return bool(os.getenv("DEBUG") or os.getenv("HEXA_DEBUG"))
 
+    @staticmethod
+    def task_result_spill_threshold() -> int:
+        """Return the size (in bytes) above which task results are spilled to disk instead of being pickled."""
+        return int(os.getenv("HEXA_TASK_RESULT_SPILL_THRESHOLD", 16 * 1024 * 1024))
+
+    @staticmethod
+    def task_cache_path() -> str | None:
+        """Return the task cache directory from environment variables, if set."""
+        return os.getenv("HEXA_TASK_CACHE_PATH")
+
+    @staticmethod
+    def task_cache_max_size() -> int:
+        """Return the maximum size (in bytes) of the task cache."""
+        return int(os.getenv("HEXA_TASK_CACHE_MAX_SIZE", 5 * 1024 * 1024 * 1024))
+
+    @staticmethod
+    def dataset_cache_path() -> str | None:
+        """Return the dataset file cache directory from environment variables, if set."""
+        return os.getenv("HEXA_DATASET_CACHE_PATH")
+
+    @staticmethod
+    def dataset_cache_max_size() -> int:
+        """Return the maximum size (in bytes) of the dataset file cache (0 disables the cache)."""
+        return int(os.getenv("HEXA_DATASET_CACHE_MAX_SIZE", 5 * 1024 * 1024 * 1024))
+
+    @staticmethod
+    def checkpoint_path() -> str | None:
+        """Return the task checkpoint directory from environment variables, if set."""
+        return os.getenv("HEXA_CHECKPOINT_PATH")
+
+    @staticmethod
+    def profile_mode() -> str | None:
+        """Return the code profiling mode of pipeline runs ("cpu" or "memory") from environment variables, if set."""
+        return os.getenv("HEXA_PROFILE", "").lower() or None
+
+    @staticmethod
+    def profile_path() -> str | None:
+        """Return the directory of run profiles from environment variables, if set."""
+        return os.getenv("HEXA_PROFILE_PATH")
+
+    @staticmethod
+    def pipeline_spec_cache() -> bool:
+        """Return whether the specs extracted from pipeline files are cached in the pipeline directories."""
+        return os.getenv("HEXA_PIPELINE_SPEC_CACHE", "True").lower() not in ("0", "false")
+
 
 class Environment(enum.Enum):
     """Enumeration of supported runtime environments."""
@@ -88,10 +136,10 @@ def get_environment():
 
 
 def graphql(operation: str, variables: dict[str | typing.Any] | None = None) -> dict[str | typing.Any]:
-    """Performa GraphQL query."""
+    """Perform a GraphQL query (using the process-wide pooled session)."""
     auth_token = os.environ["HEXA_TOKEN"]
     headers = {"Authorization": f"Bearer {auth_token}"}
-    session = create_requests_session(verify=Settings.verify_ssl())
+    session = get_shared_requests_session(verify=Settings.verify_ssl())
 
     try:
         req = session.post(
@@ -114,6 +162,33 @@ def graphql(operation: str, variables: dict[str | typing.Any] | None = None) ->
     return body["data"]
 
 
+async def graphql_async(operation: str, variables: dict[str | typing.Any] | None = None) -> dict[str | typing.Any]:
+    """Perform a GraphQL query without blocking the event loop (using the pooled connections of the loop)."""
+    auth_token = os.environ["HEXA_TOKEN"]
+    verify = Settings.verify_ssl()
+
+    try:
+        async with httpx.AsyncClient(verify=verify, transport=get_shared_httpx_async_transport(verify)) as client:
+            response = await client.post(
+                f"{os.environ['HEXA_SERVER_URL'].rstrip('/')}/graphql/",
+                headers={"Authorization": f"Bearer {auth_token}"},
+                json={
+                    "query": operation,
+                    "variables": variables if variables is not None else {},
+                },
+            )
+            response.raise_for_status()
+    except httpx.ConnectError as e:
+        handle_ssl_error(e)
+        raise
+
+    body = response.json()
+    if "errors" in body:
+        raise Exception(body["errors"])
+
+    return body["data"]
+
+
 class OpenHexaClient(BaseOpenHexaClient):
     """OpenHexaClient is a class that provides methods to interact with the OpenHexa GraphQL API."""
 
@@ -134,13 +209,44 @@ class OpenHexaClient(BaseOpenHexaClient):
             raise
 
 
+class AsyncOpenHexaClient(BaseAsyncOpenHexaClient):
+    """Asynchronous client for the OpenHexa GraphQL API, to be created within a running event loop.
+
+    Unlike OpenHexaClient, it has no generated methods (the generated client is synchronous): GraphQL operations are
+    run with query().
+
+    Examples
+    --------
+    >>> async with AsyncOpenHexaClient() as client:
+    ...     data = await client.query("query { me { user { email } } }")
+    """
+
+    def __init__(self, token: str | None = None, server_url: str | None = None):
+        """Initialize the AsyncOpenHexaClient with the OpenHexa API URL and headers.
+
+        Args:
+            token: Authentication token. If not provided, will use HEXA_TOKEN environment variable.
+            server_url: Server URL. If not provided, will use HEXA_SERVER_URL environment variable.
+        """
+        url = server_url or f"{os.environ['HEXA_SERVER_URL'].rstrip('/')}/graphql/"
+        token = token or os.getenv("HEXA_TOKEN")
+
+        super().__init__(url=url, token=token, verify=Settings.verify_ssl())
+
+
 class Iterator(metaclass=abc.ABCMeta):
-    """A generic class for iterating through API list responses."""
+    """A generic class for iterating through API list responses.
+
+    Subclasses either implement _fetch_page(), fetching a page by number, or _next_page(), fetching pages one after
+    another. When pages can be fetched by number, the pages following the first one (which gives the total number of
+    pages) are fetched concurrently, up to max_concurrency pages ahead of the page being consumed.
+    """
 
     def __init__(
         self,
         item_to_value=lambda x: x,
         per_page=None,
+        max_concurrency=4,
     ):
         self._started = False
         self.__active_iterator = None
@@ -152,12 +258,16 @@ class Iterator(metaclass=abc.ABCMeta):
             single item.
         """
         self.per_page = per_page
+        self.max_concurrency = max_concurrency
+        """int: The maximum number of pages fetched at the same time, ahead of the page being consumed."""
 
         # The attributes below will change over the life of the iterator.
         self.page_number = 0
         """int: The current page of results."""
         self.num_results = 0
         """int: The total number of results fetched so far."""
+        self.total_pages = None
+        """int: The total number of pages, once the first page has been fetched by _fetch_page()."""
 
     def _items_iter(self):
         for page in self._page_iter(increment=False):
@@ -180,6 +290,25 @@ class Iterator(metaclass=abc.ABCMeta):
 
         return next(self.__active_iterator)
 
+    def __aiter__(self) -> typing.AsyncGenerator[typing.Any, None]:
+        """Implement __aiter__(), fetching the pages without blocking the event loop."""
+        if self._started:
+            raise ValueError("Iterator has already started", self)
+        self._started = True
+
+        return self._items_aiter()
+
+    async def _items_aiter(self):
+        if self._can_fetch_pages(async_=True):
+            pages = self._fetched_pages_async()
+        else:
+            pages = self._next_pages_async()
+        async for page in pages:
+            self.page_number += 1
+            for item in page:
+                self.num_results += 1
+                yield item
+
     def _page_iter(self, increment: bool):
         """Generate pages of API responses.
 
@@ -190,27 +319,112 @@ class Iterator(metaclass=abc.ABCMeta):
             This is useful since a page iterator will want to increment by results per page while an
             items iterator will want to increment per item.
         """
-        page = self._next_page()
-        while page is not None:
+        pages = self._fetched_pages() if self._can_fetch_pages() else self._next_pages()
+        for page in pages:
             self.page_number += 1
             if increment:
                 self.num_results += page.num_items
             yield page
+
+    def _next_pages(self):
+        page = self._next_page()
+        while page is not None:
+            yield page
             page = self._next_page()
 
-    @abc.abstractmethod
-    def _next_page(self):
-        """Get the next page in the iterator.
+    async def _next_pages_async(self):
+        page = await self._next_page_async()
+        while page is not None:
+            yield page
+            page = await self._next_page_async()
+
+    def _fetched_pages(self):
+        page, self.total_pages = self._fetch_page(1)
+        if self.total_pages <= 1:
+            yield page
+            return
 
-        This does nothing and is intended to be over-ridden by subclasses
-        to return the next :class:`Page`.
+        executor = ThreadPoolExecutor(max_workers=max(self.max_concurrency, 1), thread_name_prefix="page-fetch")
+        futures = collections.deque()
+        next_page_number = 2
+        try:
+            while True:
+                # Keep max_concurrency pages in flight while the current page is consumed
+                while next_page_number <= self.total_pages and len(futures) < max(self.max_concurrency, 1):
+                    futures.append(executor.submit(self._fetch_page, next_page_number))
+                    next_page_number += 1
+                yield page
+                if not futures:
+                    return
+                page, _ = futures.popleft().result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _fetched_pages_async(self):
+        page, self.total_pages = await self._fetch_page_async(1)
+        tasks = collections.deque()
+        next_page_number = 2
+        try:
+            while True:
+                while next_page_number <= self.total_pages and len(tasks) < max(self.max_concurrency, 1):
+                    tasks.append(asyncio.ensure_future(self._fetch_page_async(next_page_number)))
+                    next_page_number += 1
+                yield page
+                if not tasks:
+                    return
+                page, _ = await tasks.popleft()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _can_fetch_pages(self, async_: bool = False) -> bool:
+        method = "_fetch_page_async" if async_ else "_fetch_page"
+        return getattr(type(self), method) is not getattr(Iterator, method)
+
+    def _fetch_page(self, page_number: int) -> tuple["Page", int]:
+        """Fetch the page with the provided number (starting at 1), and return it along with the total number of pages.
+
+        Subclasses able to fetch pages by number override this method, allowing pages to be fetched concurrently.
 
         Raises
         ------
-            NotImplementedError: Always, this method is abstract.
+            NotImplementedError: If pages cannot be fetched by number.
         """
         raise NotImplementedError
 
+    async def _fetch_page_async(self, page_number: int) -> tuple["Page", int]:
+        """Fetch the page with the provided number asynchronously (see _fetch_page())."""
+        raise NotImplementedError
+
+    def _next_page(self):
+        """Get the next page in the iterator, or None after the last page.
+
+        Subclasses that cannot fetch pages by number (see _fetch_page()) override this method to return the next
+        :class:`Page`.
+
+        Raises
+        ------
+            NotImplementedError: If neither this method nor _fetch_page() is implemented.
+        """
+        if not self._can_fetch_pages():
+            raise NotImplementedError
+        if self.total_pages is not None and self.page_number >= self.total_pages:
+            return None
+        page, self.total_pages = self._fetch_page(self.page_number + 1)
+
+        return page
+
+    async def _next_page_async(self):
+        """Get the next page in the iterator, asynchronously.
+
+        Subclasses supporting ``async for`` override this method, or _fetch_page_async().
+
+        Raises
+        ------
+            NotImplementedError: If the iterator does not support asynchronous iteration.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support asynchronous iteration")
+
 
 class Page:
     """Single page of results in an iterator.
@@ -13,7 +13,7 @@ from openhexa.utils import stringcase
 
 from ..datasets import Dataset
 from ..files import File
-from ..utils import OpenHexaClient, graphql
+from ..utils import OpenHexaClient, graphql, graphql_async
 from .connection import (
     ConnectionClasses,
     CustomConnection,
@@ -24,6 +24,71 @@ from .connection import (
     S3Connection,
 )
 
+CREATE_DATASET = """
+    mutation createDataset($input: CreateDatasetInput!) {
+        createDataset(input: $input) {
+            success
+            errors
+            dataset {
+                slug
+            }
+        }
+    }
+"""
+
+GET_DATASET = """
+    query getDataset($datasetSlug: String!, $workspaceSlug: String!) {
+        datasetLinkBySlug(datasetSlug: $datasetSlug, workspaceSlug: $workspaceSlug) {
+            id
+            dataset {
+                id
+                slug
+                name
+                description
+                latestVersion {
+                    id
+                    name
+                    description
+                }
+                workspace {
+                    slug
+                }
+            }
+        }
+    }
+"""
+
+LIST_DATASETS = """
+    query getWorkspaceDatasets($slug: String!) {
+        workspace(slug: $slug) {
+            datasets {
+                items {
+                    id
+                    dataset {
+                        id
+                        slug
+                        name
+                        description
+                        workspace {
+                            slug
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+def _build_dataset(dataset: dict) -> Dataset:
+    return Dataset(
+        id=dataset["id"],
+        slug=dataset["slug"],
+        name=dataset["name"],
+        description=dataset["description"],
+        source_workspace_slug=dataset["workspace"]["slug"],
+    )
+
 
 class WorkspaceConfigError(Exception):
     """Raised whenever the system cannot find an environment variable required to configure the current workspace."""
@@ -500,32 +565,29 @@ class CurrentWorkspace:
         ValueError
             If the dataset could not be created
         """
-        rsp = graphql(
-            """
-        mutation createDataset($input: CreateDatasetInput!) {
-            createDataset(input: $input) {
-                success
-                errors
-                dataset {
-                    slug
-                }
+        rsp = graphql(CREATE_DATASET, self._create_dataset_variables(name, description))
+        return self.get_dataset(self._get_created_dataset_slug(rsp))
+
+    async def create_dataset_async(self, name: str, description: str) -> Dataset:
+        """Create a new dataset, without blocking the event loop (see create_dataset())."""
+        rsp = await graphql_async(CREATE_DATASET, self._create_dataset_variables(name, description))
+        return await self.get_dataset_async(self._get_created_dataset_slug(rsp))
+
+    def _create_dataset_variables(self, name: str, description: str) -> dict:
+        return {
+            "input": {
+                "workspaceSlug": self.slug,
+                "name": name,
+                "description": description,
             }
         }
-        """,
-            {
-                "input": {
-                    "workspaceSlug": self.slug,
-                    "name": name,
-                    "description": description,
-                }
-            },
-        )
 
+    @staticmethod
+    def _get_created_dataset_slug(rsp: dict) -> str:
         if rsp["createDataset"]["success"] is False:
             raise ValueError(rsp["createDataset"]["errors"][0])
 
-        identifier = rsp["createDataset"]["dataset"]["slug"]
-        return self.get_dataset(identifier)
+        return rsp["createDataset"]["dataset"]["slug"]
 
     def get_dataset(self, identifier: str, source_workspace_slug: str = None) -> Dataset:
         """Get a dataset by its identifier.
@@ -549,29 +611,18 @@ class CurrentWorkspace:
             If the dataset does not exist
         """
         response = graphql(
-            """
-            query getDataset($datasetSlug: String!, $workspaceSlug: String!) {
-                datasetLinkBySlug(datasetSlug: $datasetSlug, workspaceSlug: $workspaceSlug) {
-                    id
-                    dataset {
-                        id
-                        slug
-                        name
-                        description
-                        latestVersion {
-                            id
-                            name
-                            description
-                        }
-                        workspace {
-                            slug
-                        }
-                    }
-                }
-            }
-        """,
-            {"datasetSlug": identifier, "workspaceSlug": source_workspace_slug or self.slug},
+            GET_DATASET, {"datasetSlug": identifier, "workspaceSlug": source_workspace_slug or self.slug}
+        )
+        return self._get_dataset_from_response(response, identifier, source_workspace_slug)
+
+    async def get_dataset_async(self, identifier: str, source_workspace_slug: str = None) -> Dataset:
+        """Get a dataset by its identifier, without blocking the event loop (see get_dataset())."""
+        response = await graphql_async(
+            GET_DATASET, {"datasetSlug": identifier, "workspaceSlug": source_workspace_slug or self.slug}
         )
+        return self._get_dataset_from_response(response, identifier, source_workspace_slug)
+
+    def _get_dataset_from_response(self, response: dict, identifier: str, source_workspace_slug: str | None) -> Dataset:
         data = response["datasetLinkBySlug"]
 
         if data is None:
@@ -584,13 +635,7 @@ class CurrentWorkspace:
                 )
             )
 
-        return Dataset(
-            id=data["dataset"]["id"],
-            slug=data["dataset"]["slug"],
-            name=data["dataset"]["name"],
-            description=data["dataset"]["description"],
-            source_workspace_slug=data["dataset"]["workspace"]["slug"],
-        )
+        return _build_dataset(data["dataset"])
 
     def list_datasets(self) -> list[Dataset]:
         """List datasets in a workspace.
@@ -599,43 +644,13 @@ class CurrentWorkspace:
         -------
         List of Datasets
         """
-        response = graphql(
-            """
-            query getWorkspaceDatasets($slug: String!) {
-                workspace(slug: $slug) {
-                    datasets {
-                        items {
-                            id
-                            dataset {
-                                id
-                                slug
-                                name
-                                description
-                                workspace {
-                                    slug
-                                }
-                            }
-                        }
-
-                    }
-                }
-            }
-        """,
-            {"slug": self.slug},
-        )
-        data = response["workspace"]["datasets"]["items"]
-        datasets = [
-            Dataset(
-                id=d["dataset"]["id"],
-                slug=d["dataset"]["slug"],
-                name=d["dataset"]["name"],
-                description=d["dataset"]["description"],
-                source_workspace_slug=d["dataset"]["workspace"]["slug"],
-            )
-            for d in data
-        ]
+        response = graphql(LIST_DATASETS, {"slug": self.slug})
+        return [_build_dataset(d["dataset"]) for d in response["workspace"]["datasets"]["items"]]
 
-        return datasets
+    async def list_datasets_async(self) -> list[Dataset]:
+        """List datasets in a workspace, without blocking the event loop (see list_datasets())."""
+        response = await graphql_async(LIST_DATASETS, {"slug": self.slug})
+        return [_build_dataset(d["dataset"]) for d in response["workspace"]["datasets"]["items"]]
 
     def get_file(self, path: str) -> File:
         """Get a file by its path.
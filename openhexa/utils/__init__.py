@@ -1,5 +1,17 @@
 """Utils pacakge for OpenHexa."""
 
-from .session import create_requests_session
+from .disk_cache import DiskCache
+from .session import (
+    create_requests_session,
+    get_shared_httpx_async_transport,
+    get_shared_httpx_transport,
+    get_shared_requests_session,
+)
 
-__all__ = ["create_requests_session"]
+__all__ = [
+    "create_requests_session",
+    "get_shared_requests_session",
+    "get_shared_httpx_transport",
+    "get_shared_httpx_async_transport",
+    "DiskCache",
+]
@@ -0,0 +1,88 @@
+"""Size-bounded, content-addressed file cache with LRU eviction."""
+
+import os
+import tempfile
+import typing
+from pathlib import Path
+
+
+class DiskCache:
+    """Store files in a directory, identified by a key (usually a hash of their content or of their inputs).
+
+    Entries are written atomically, so that several processes can safely share the same cache directory. When the
+    total size of the cache exceeds max_size, the least recently used entries are evicted (the modification time of
+    an entry is updated every time it is read).
+
+    Parameters
+    ----------
+    directory : str | os.PathLike
+        The directory of the cache. It is created on the first write.
+    max_size : int
+        The maximum total size of the cache, in bytes.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str], max_size: int):
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+    def path(self, key: str) -> Path:
+        """Return the path of the entry for the provided key (entries are sharded by the first two characters)."""
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> Path | None:
+        """Return the path of the entry for the provided key if it exists, marking it as recently used."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        return path
+
+    def put(self, key: str, write: typing.Callable[[typing.BinaryIO], None]) -> Path:
+        """Create or replace the entry for the provided key.
+
+        Parameters
+        ----------
+        key : str
+            The key of the entry.
+        write : typing.Callable
+            A function writing the content of the entry to the provided binary file object.
+        """
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+        return path
+
+    def delete(self, key: str):
+        """Delete the entry for the provided key, if it exists."""
+        self.path(key).unlink(missing_ok=True)
+
+    def evict(self):
+        """Delete the least recently used entries until the cache fits in its maximum size."""
+        entries = []
+        total_size = 0
+        for path in self.directory.glob("*/*"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # Evicted by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
@@ -1,18 +1,34 @@
-"""Custom HttpClient with retry mechanism."""
+"""Custom HttpClient with retry mechanism, and process-wide pooled HTTP clients."""
 
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
 
+import httpx
 import requests
 import urllib3
 from requests import Session
 from requests.adapters import HTTPAdapter
 from urllib3.util import Retry
 
+# Maximum number of connections kept alive per host by the shared clients
+SHARED_POOL_SIZE = 32
+
+_shared_lock = threading.Lock()
+_shared_pid = None
+_shared_sessions = {}
+_shared_transports = {}
+_shared_async_transports = weakref.WeakKeyDictionary()  # event loop -> {verify: transport}
+
 
 def create_requests_session(
     retries=3,
     backoff_factor=0.3,
     status_forcelist=(500, 502, 504),
     verify=True,
+    pool_maxsize=10,
 ) -> Session:
     """Return a Session object with retry capability."""
     session = requests.Session()
@@ -28,7 +44,86 @@ def create_requests_session(
         backoff_factor=backoff_factor,
         status_forcelist=status_forcelist,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(max_retries=retry, pool_maxsize=pool_maxsize)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
+
+
+class _SharedTransport(httpx.HTTPTransport):
+    """HTTP transport shared by several clients, which must not close it when they are closed themselves."""
+
+    def close(self):
+        """Keep the connection pool open for the other clients."""
+        pass
+
+
+class _SharedAsyncTransport(httpx.AsyncHTTPTransport):
+    """Async HTTP transport shared by several clients, which must not close it when they are closed themselves."""
+
+    async def aclose(self):
+        """Keep the connection pool open for the other clients."""
+        pass
+
+
+def _reset_shared_clients_after_fork():
+    """Forget the shared clients inherited from another process: their connections cannot be shared."""
+    global _shared_pid
+    if _shared_pid != os.getpid():
+        _shared_sessions.clear()
+        _shared_transports.clear()
+        _shared_pid = os.getpid()
+
+
+def get_shared_requests_session(verify: bool = True, retries: int = 3) -> Session:
+    """Return the process-wide requests session, keeping connections alive across calls.
+
+    The session is created on first use in each process (including worker processes), and has the same retry
+    capability as the sessions returned by create_requests_session(). Callers sending streamed bodies, which cannot be
+    sent again by the transport, use a session without retries (retries=0) and handle retries themselves.
+    """
+    with _shared_lock:
+        _reset_shared_clients_after_fork()
+        if (verify, retries) not in _shared_sessions:
+            _shared_sessions[verify, retries] = create_requests_session(
+                retries=retries, verify=verify, pool_maxsize=SHARED_POOL_SIZE
+            )
+
+        return _shared_sessions[verify, retries]
+
+
+def get_shared_httpx_transport(verify: bool = True) -> httpx.BaseTransport:
+    """Return the process-wide httpx transport, holding a pool of keep-alive connections.
+
+    httpx clients using this transport share their connections while keeping their own headers. HTTP/2 is enabled
+    when the h2 package is installed. The transport is created on first use in each process.
+    """
+    with _shared_lock:
+        _reset_shared_clients_after_fork()
+        if verify not in _shared_transports:
+            _shared_transports[verify] = _SharedTransport(
+                verify=verify,
+                http2=importlib.util.find_spec("h2") is not None,
+                limits=httpx.Limits(max_connections=SHARED_POOL_SIZE, max_keepalive_connections=SHARED_POOL_SIZE),
+            )
+
+        return _shared_transports[verify]
+
+
+def get_shared_httpx_async_transport(verify: bool = True) -> httpx.AsyncBaseTransport:
+    """Return the httpx async transport shared by the clients of the running event loop.
+
+    Async connections are bound to the event loop they were opened in: each event loop has its own pool, which is
+    discarded with the loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _shared_lock:
+        transports = _shared_async_transports.setdefault(loop, {})
+        if verify not in transports:
+            transports[verify] = _SharedAsyncTransport(
+                verify=verify,
+                http2=importlib.util.find_spec("h2") is not None,
+                limits=httpx.Limits(max_connections=SHARED_POOL_SIZE, max_keepalive_connections=SHARED_POOL_SIZE),
+            )
+
+        return transports[verify]
@@ -1,13 +1,15 @@
 """Tests related to the parsing of the pipeline code."""
 
 import io
+import os
 import tempfile
+from pathlib import Path
 from unittest import TestCase
 from unittest.mock import patch
 
 from openhexa.sdk.pipelines.exceptions import InvalidParameterError, PipelineNotFound
 from openhexa.sdk.pipelines.parameter import DHIS2Widget, IASOWidget
-from openhexa.sdk.pipelines.runtime import get_pipeline
+from openhexa.sdk.pipelines.runtime import PIPELINE_SPEC_CACHE, get_pipeline
 
 
 class AstTest(TestCase):
@@ -725,3 +727,48 @@ class AstTest(TestCase):
                 pipeline = get_pipeline(tmpdirname)
                 self.assertEqual(pipeline.to_dict()["name"], "Test pipeline")
                 self.assertIn("Providing both 'code' and 'name' is deprecated.", fake_stdout.getvalue())
+
+    def test_pipeline_spec_cache(self):
+        """The spec of the pipeline is cached, and the pipeline file is only parsed again when it changes."""
+        source = "\n".join(
+            [
+                "from openhexa.sdk.pipelines import pipeline, parameter",
+                "from openhexa.sdk import DHIS2Connection",
+                "from openhexa.sdk.pipelines.parameter import DHIS2Widget",
+                "",
+                "@parameter('dhis2', type=DHIS2Connection)",
+                "@parameter('districts', name='Districts', type=str, choices='data/districts.csv')",
+                "@parameter('org_units', type=str, widget=DHIS2Widget.ORG_UNITS, connection='dhis2', multiple=True)",
+                "@parameter('years', type=int, choices=[2023, 2024], default=[2024], multiple=True)",
+                "@pipeline('test', name='Test pipeline', timeout=42)",
+                "def test_pipeline(dhis2, districts, org_units, years):",
+                "    pass",
+                "",
+            ]
+        )
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            with open(f"{tmpdirname}/pipeline.py", "w") as f:
+                f.write(source)
+            with patch("sys.stdout", new=io.StringIO()):
+                pipeline = get_pipeline(tmpdirname)
+                with patch("openhexa.sdk.pipelines.runtime.ast.parse") as mock_parse:
+                    cached_pipeline = get_pipeline(tmpdirname)
+                mock_parse.assert_not_called()
+            self.assertEqual(cached_pipeline.to_dict(), pipeline.to_dict())
+            self.assertEqual(cached_pipeline.parameters[2].widget, DHIS2Widget.ORG_UNITS)
+
+            with open(f"{tmpdirname}/pipeline.py", "w") as f:
+                f.write(source.replace("timeout=42", "timeout=43"))
+            with patch("sys.stdout", new=io.StringIO()):
+                self.assertEqual(get_pipeline(tmpdirname).timeout, 43)
+
+    def test_pipeline_spec_cache_disabled(self):
+        """The spec of the pipeline is not cached when HEXA_PIPELINE_SPEC_CACHE is false."""
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            with open(f"{tmpdirname}/pipeline.py", "w") as f:
+                f.write(
+                    "from openhexa.sdk.pipelines import pipeline\n\n@pipeline('Test')\ndef test_pipeline():\n    pass\n"
+                )
+            with patch.dict(os.environ, {"HEXA_PIPELINE_SPEC_CACHE": "false"}):
+                self.assertEqual(get_pipeline(tmpdirname).name, "Test")
+            self.assertFalse((Path(tmpdirname) / PIPELINE_SPEC_CACHE).exists())
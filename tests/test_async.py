@@ -0,0 +1,174 @@
+"""Asynchronous API test module."""
+
+import asyncio
+import io
+import json
+import os
+from unittest import mock
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from openhexa.sdk.datasets.dataset import Dataset, DatasetFile, DatasetVersion
+from openhexa.sdk.datasets.url_cache import download_urls
+from openhexa.sdk.pipelines.run import CurrentRun
+from openhexa.sdk.utils import graphql_async
+from openhexa.sdk.workspaces.current_workspace import CurrentWorkspace
+
+
+@mock.patch.dict(os.environ, {"HEXA_SERVER_URL": "https://app.openhexa.test", "HEXA_TOKEN": "token"})
+def test_graphql_async():
+    """GraphQL queries are sent with the token, and errors are raised."""
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(request)
+        body = json.loads(request.content)
+        if body["variables"].get("fail"):
+            return httpx.Response(200, json={"errors": [{"message": "Oops"}]})
+        return httpx.Response(200, json={"data": {"me": {"id": "1"}}})
+
+    with patch("openhexa.sdk.utils.get_shared_httpx_async_transport", return_value=httpx.MockTransport(handler)):
+        assert asyncio.run(graphql_async("query { me { id } }")) == {"me": {"id": "1"}}
+        with pytest.raises(Exception, match="Oops"):
+            asyncio.run(graphql_async("query { me { id } }", {"fail": True}))
+
+    assert str(requests[0].url) == "https://app.openhexa.test/graphql/"
+    assert requests[0].headers["Authorization"] == "Bearer token"
+
+
+@patch("openhexa.sdk.datasets.dataset.graphql_async", new_callable=AsyncMock)
+def test_iterate_versions_async(mock_graphql):
+    """Versions can be iterated over with async for, fetching pages as needed."""
+    mock_graphql.side_effect = [
+        {
+            "dataset": {
+                "versions": {
+                    "items": [
+                        {"id": str(i), "name": f"v{i}", "createdAt": "2024-01-01"} for i in range(page, page + 2)
+                    ],
+                    "totalPages": 2,
+                }
+            }
+        }
+        for page in (1, 3)
+    ]
+    dataset = Dataset(id="dataset-id", slug="dataset", name="Dataset", description="")
+
+    async def collect():
+        return [version.name async for version in dataset.versions]
+
+    assert asyncio.run(collect()) == ["v1", "v2", "v3", "v4"]
+    assert [call.args[1]["page"] for call in mock_graphql.call_args_list] == [1, 2]
+
+
+@patch("openhexa.sdk.datasets.dataset.graphql_async", new_callable=AsyncMock)
+def test_add_file_async(mock_graphql):
+    """Files are streamed to the upload URL by chunks, then registered in the version."""
+    mock_graphql.side_effect = [
+        {"generateDatasetUploadUrl": {"success": True, "errors": [], "uploadUrl": "https://storage.test/upload"}},
+        {
+            "createDatasetVersionFile": {
+                "success": True,
+                "errors": [],
+                "file": {
+                    "id": "file-id",
+                    "uri": "data.csv",
+                    "filename": "data.csv",
+                    "contentType": "text/csv",
+                    "createdAt": "2024-01-01",
+                },
+            }
+        },
+    ]
+    uploads = []
+
+    def handler(request: httpx.Request):
+        uploads.append((request.method, request.headers["Content-Length"], request.read()))
+        return httpx.Response(200)
+
+    version = DatasetVersion(dataset=None, id="version-id", name="v1", created_at="2024-01-01")
+    content = b"a,b\n" * 1000
+    with (
+        patch("openhexa.sdk.datasets.dataset.UPLOAD_CHUNK_SIZE", 1024),
+        patch(
+            "openhexa.sdk.datasets.dataset.get_shared_httpx_async_transport",
+            return_value=httpx.MockTransport(handler),
+        ),
+    ):
+        file = asyncio.run(version.add_file_async(io.BytesIO(content), filename="data.csv"))
+
+    assert file.id == "file-id"
+    assert uploads == [("PUT", str(len(content)), content)]
+    assert mock_graphql.call_args_list[1].args[1] == {
+        "input": {"versionId": "version-id", "contentType": "application/octet-stream", "uri": "data.csv"}
+    }
+
+
+@patch("openhexa.sdk.datasets.dataset.graphql_async", new_callable=AsyncMock)
+def test_read_async_refreshes_expired_urls_and_uses_cache(mock_graphql, tmp_path):
+    """Files are read again with a new download URL when the storage rejects it, and cached."""
+    download_urls.clear()
+    mock_graphql.return_value = {
+        "prepareVersionFileDownload": {"success": True, "errors": [], "downloadUrl": "https://storage.test/new"}
+    }
+    requested = []
+
+    def handler(request: httpx.Request):
+        requested.append(request.url.path)
+        return httpx.Response(403 if request.url.path == "/expired" else 200, content=b"content")
+
+    file = DatasetFile(version=None, id="file-id", uri="data.bin", filename="data.bin", content_type="", created_at="")
+    download_urls.set(file.id, "https://storage.test/expired")
+    with (
+        patch.dict(os.environ, {"HEXA_DATASET_CACHE_PATH": str(tmp_path / "cache")}),
+        patch(
+            "openhexa.sdk.datasets.dataset.get_shared_httpx_async_transport",
+            return_value=httpx.MockTransport(handler),
+        ),
+    ):
+        assert asyncio.run(file.read_async()) == b"content"
+        assert asyncio.run(file.read_async()) == b"content"
+
+    assert requested == ["/expired", "/new"]
+    assert mock_graphql.call_count == 1
+    download_urls.clear()
+
+
+@mock.patch.dict(os.environ, {"HEXA_WORKSPACE": "workspace-slug"})
+@patch("openhexa.sdk.workspaces.current_workspace.graphql_async", new_callable=AsyncMock)
+def test_list_datasets_async(mock_graphql):
+    """Workspace datasets can be listed without blocking the event loop."""
+    mock_graphql.return_value = {
+        "workspace": {
+            "datasets": {
+                "items": [
+                    {
+                        "id": "link-id",
+                        "dataset": {
+                            "id": "dataset-id",
+                            "slug": "dataset",
+                            "name": "Dataset",
+                            "description": "",
+                            "workspace": {"slug": "workspace-slug"},
+                        },
+                    }
+                ]
+            }
+        }
+    }
+
+    datasets = asyncio.run(CurrentWorkspace().list_datasets_async())
+
+    assert [dataset.slug for dataset in datasets] == ["dataset"]
+    assert mock_graphql.call_args.args[1] == {"slug": "workspace-slug"}
+
+
+@mock.patch.dict(os.environ, {"HEXA_SERVER_URL": "https://app.openhexa.test"})
+@patch("openhexa.sdk.pipelines.run.graphql_async", new_callable=AsyncMock)
+def test_log_message_async(mock_graphql):
+    """Log messages are sent without blocking the event loop."""
+    asyncio.run(CurrentRun().log_warning_async("Careful"))
+
+    assert mock_graphql.call_args.args[1] == {"input": {"priority": "WARNING", "message": "Careful"}}
@@ -0,0 +1,79 @@
+"""Task checkpoint test module."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from openhexa.sdk.pipelines.checkpoint import RunCheckpoints
+from openhexa.sdk.pipelines.pipeline import Pipeline, PipelineRunError
+from openhexa.sdk.pipelines.task import TaskWorkItem
+from openhexa.sdk.pipelines.transport import ResultTransport, SpilledResult
+
+
+def test_checkpoints_save_and_restore(tmp_path):
+    """Checkpoints of a run can be restored by a later run, and are recorded for that run as well."""
+    task_com = TaskWorkItem("task", lambda: 42, [], {}).run()
+    RunCheckpoints(str(tmp_path), "run-1").save("abcdef", task_com)
+
+    assert RunCheckpoints(str(tmp_path), "run-2").restore("abcdef") is None
+    assert RunCheckpoints(str(tmp_path), "run-2", resume_from="run-1").restore("unknown") is None
+
+    restored = RunCheckpoints(str(tmp_path), "run-2", resume_from="run-1").restore("abcdef")
+    assert restored.result == 42
+    assert restored.end_time == task_com.end_time
+    assert (tmp_path / "run-2" / "abcdef.pkl").exists()
+
+
+def test_checkpoints_copy_spilled_results(tmp_path):
+    """Spilled results are copied in the checkpoint directory, so that they outlive the run spill directory."""
+    transport = ResultTransport(str(tmp_path / "spill"), threshold=1)
+    task_com = TaskWorkItem("task", lambda: b"data", [], {}, transport=transport).run()
+    RunCheckpoints(str(tmp_path / "checkpoints"), "run-1").save("abcdef", task_com)
+    transport.cleanup()
+
+    restored = RunCheckpoints(str(tmp_path / "checkpoints"), "run-2", resume_from="run-1").restore("abcdef")
+    assert isinstance(restored.result, SpilledResult)
+    assert restored.result.load() == b"data"
+
+
+def test_pipeline_resume_from_failed_run(tmp_path):
+    """Resuming a failed run only executes the tasks that did not complete."""
+    calls = []
+    fail = True
+
+    def pipeline_func():
+        a = task_a()
+        task_c(task_b(a))
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="inline", checkpoint=True)
+
+    @pipeline.task
+    def task_a():
+        calls.append("task_a")
+        return 1
+
+    @pipeline.task
+    def task_b(x):
+        calls.append("task_b")
+        return x + 1
+
+    @pipeline.task
+    def task_c(x):
+        calls.append("task_c")
+        if fail:
+            raise ValueError("transient error")
+        return x * 10
+
+    with patch.dict(os.environ, {"HEXA_CHECKPOINT_PATH": str(tmp_path), "HEXA_RUN_ID": "run-1"}):
+        with pytest.raises(PipelineRunError):
+            pipeline.run({})
+
+    fail = False
+    pipeline.tasks = []
+    with patch.dict(os.environ, {"HEXA_CHECKPOINT_PATH": str(tmp_path), "HEXA_RUN_ID": "run-2"}):
+        pipeline.run({}, resume_from="run-1")
+
+    assert calls == ["task_a", "task_b", "task_c", "task_c"]
+    assert [t.result for t in pipeline.tasks] == [1, 2, 20]
+    assert len(list((tmp_path / "run-2").glob("*.pkl"))) == 3
@@ -1,6 +1,7 @@
 """CLI test module."""
 
 import base64
+import cProfile
 import os
 from io import BytesIO
 from pathlib import Path
@@ -86,6 +87,26 @@ class CliRunTest(TestCase):
             assert result.exit_code == 1
             self.assertTrue("does not contain a pipeline.py file" in str(result.exception))
 
+    @patch("openhexa.cli.cli.run_pipeline")
+    def test_run_pipeline_with_profile(self, mock_run_pipeline):
+        """Test that the hot spots of profiled runs are printed once the run is finished."""
+
+        def run_pipeline(path, config, image, debug, profile, profile_path):
+            cProfile.run("sorted(range(1000))", str(profile_path / "run-1" / "task-0.pstats"))
+            return MagicMock(logs=MagicMock(return_value=[]), wait=MagicMock(return_value={"StatusCode": 0}))
+
+        mock_run_pipeline.side_effect = run_pipeline
+        with self.runner.isolated_filesystem() as tmp:
+            (Path(tmp) / "profiles").mkdir()
+            with patch("openhexa.cli.cli.tempfile.mkdtemp", return_value=str(Path(tmp) / "profiles")):
+                (Path(tmp) / "profiles" / "run-1").mkdir()
+                result = self.runner.invoke(pipelines_run, [tmp, "--profile", "cpu", "--profile-top", "3"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(mock_run_pipeline.call_args.kwargs["profile"], "cpu")
+        self.assertIn("Top 3 functions by own time (1 profiles)", result.output)
+        self.assertIn("sorted", result.output)
+
     @patch("openhexa.cli.api.graphql")
     def test_download_pipeline_no_pipeline(self, mock_graphql):
         """Test the download pipeline command."""
@@ -370,6 +391,108 @@ class CliRunTest(TestCase):
                 result.output,
             )
 
+    @patch("openhexa.cli.cli.get_pipeline")
+    @patch("openhexa.cli.cli.get_pipelines_pages")
+    @patch("openhexa.cli.cli.get_pipeline_from_code")
+    @patch("openhexa.cli.cli.upload_pipeline")
+    @patch.dict(os.environ, {"HEXA_API_URL": "https://www.bluesquarehub.com/", "HEXA_WORKSPACE": "workspace"})
+    def test_push_unchanged_pipeline_is_skipped(
+        self, mock_upload_pipeline, mock_get_pipeline_from_code, mock_get_pipelines_pages, mock_get_pipeline
+    ):
+        """Pushing the same files as the current version of the pipeline does not create a new version."""
+        code = "code1"
+        with self.runner.isolated_filesystem() as tmp:
+            with open(Path(tmp) / python_file_name, "w") as f:
+                f.write(python_code)
+            mock_pipeline = MagicMock(spec=Pipeline)
+            mock_pipeline.name = pipeline_name
+            mock_get_pipeline.return_value = mock_pipeline
+            mock_get_pipelines_pages.return_value = {"items": [], "totalPages": 1}
+            mock_get_pipeline_from_code.return_value = {
+                "code": code,
+                "currentVersion": {"id": "previous-version-id", "name": "v1"},
+            }
+            mock_upload_pipeline.return_value = {
+                "versionName": version,
+                "pipeline": {
+                    "id": pipeline_id,
+                    "permissions": {"createTemplateVersion": {"isAllowed": False}},
+                    "template": None,
+                },
+                "id": pipeline_version_id,
+            }
+
+            result = self.runner.invoke(pipelines_push, [tmp, "--code", code, "--yes"])
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual(mock_upload_pipeline.call_count, 1)
+
+            mock_get_pipeline_from_code.return_value = {
+                "code": code,
+                "currentVersion": {"id": pipeline_version_id, "name": version},
+            }
+            result = self.runner.invoke(pipelines_push, [tmp, "--code", code, "--yes"])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn(f"No changes since version '{version}' was pushed", result.output)
+            self.assertEqual(mock_upload_pipeline.call_count, 1)
+
+            result = self.runner.invoke(pipelines_push, [tmp, "--code", code, "--yes", "--force"])
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual(mock_upload_pipeline.call_count, 2)
+
+            with open(Path(tmp) / python_file_name, "a") as f:
+                f.write("\n# changed\n")
+            result = self.runner.invoke(pipelines_push, [tmp, "--code", code, "--yes"])
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual(mock_upload_pipeline.call_count, 3)
+
+    @patch("openhexa.cli.cli.get_pipeline")
+    @patch("openhexa.cli.cli.get_pipelines_pages")
+    @patch("openhexa.cli.cli.get_pipeline_from_code")
+    @patch("openhexa.cli.cli.upload_pipeline")
+    @patch.dict(os.environ, {"HEXA_API_URL": "https://www.bluesquarehub.com/", "HEXA_WORKSPACE": "workspace"})
+    def test_push_unchanged_pipeline_with_version_options_is_not_skipped(
+        self, mock_upload_pipeline, mock_get_pipeline_from_code, mock_get_pipelines_pages, mock_get_pipeline
+    ):
+        """Pushing the same files with version options (name, description...) creates a new version."""
+        code = "code1"
+        with self.runner.isolated_filesystem() as tmp:
+            with open(Path(tmp) / python_file_name, "w") as f:
+                f.write(python_code)
+            mock_pipeline = MagicMock(spec=Pipeline)
+            mock_pipeline.name = pipeline_name
+            mock_get_pipeline.return_value = mock_pipeline
+            mock_get_pipelines_pages.return_value = {"items": [], "totalPages": 1}
+            mock_get_pipeline_from_code.return_value = {
+                "code": code,
+                "currentVersion": {"id": pipeline_version_id, "name": version},
+            }
+            mock_upload_pipeline.return_value = {
+                "versionName": version,
+                "pipeline": {
+                    "id": pipeline_id,
+                    "permissions": {"createTemplateVersion": {"isAllowed": False}},
+                    "template": None,
+                },
+                "id": pipeline_version_id,
+            }
+            result = self.runner.invoke(pipelines_push, [tmp, "--code", code, "--yes"])
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual(mock_upload_pipeline.call_count, 1)
+
+            for options in (
+                ["--name", "v2"],
+                ["--description", "New description"],
+                ["--link", "https://example.com"],
+                ["--tag", "new-tag"],
+                ["--functional-type", "extraction"],
+            ):
+                with self.subTest(options=options):
+                    call_count = mock_upload_pipeline.call_count
+                    result = self.runner.invoke(pipelines_push, [tmp, "--code", code, "--yes", *options])
+                    self.assertEqual(result.exit_code, 0, result.output)
+                    self.assertNotIn("No changes since version", result.output)
+                    self.assertEqual(mock_upload_pipeline.call_count, call_count + 1)
+
     @patch("openhexa.cli.cli.click.prompt")
     def test_select_pipeline(self, mock_prompt):
         workspace_pipelines = [
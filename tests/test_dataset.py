@@ -1,12 +1,15 @@
 """Dataset test module."""
 
 import os
+import threading
+from concurrent.futures import wait
 from unittest import TestCase
 from unittest.mock import patch
 
 from httmock import HTTMock, all_requests, response
 
-from openhexa.sdk.datasets import Dataset
+from openhexa.sdk.datasets import BulkUploadError, Dataset
+from openhexa.sdk.datasets.dataset import DatasetVersion
 from openhexa.sdk.workspaces import workspace
 
 
@@ -104,3 +107,142 @@ class DatasetTest(TestCase):
         self.assertEqual(v.id, "<newVersionId>")
         v = d.create_version("Second version")
         self.assertEqual(v.id, "<newVersionId>")
+
+    @patch.dict(os.environ, {"HEXA_TOKEN": "token", "HEXA_SERVER_URL": "http://server"})
+    @patch("openhexa.sdk.datasets.dataset.ADD_FILES_BATCH_SIZE", 2)
+    @patch("openhexa.sdk.datasets.upload.RETRY_BACKOFF", 0)
+    @patch("openhexa.sdk.datasets.dataset.graphql")
+    def test_add_files(self, mock_graphql):
+        """Ensure that files are added in batches, and returned in the order of the sources."""
+        version = DatasetVersion(dataset=None, id="version-id", name="v1", created_at="2021-01-01T00:00:00.000Z")
+
+        def graphql_responses(query, variables):
+            results = {}
+            for i in range(len(variables)):
+                uri = variables[f"input{i}"]["uri"]
+                if "generateDatasetUploadUrl" in query:
+                    results[f"op{i}"] = {"success": True, "errors": [], "uploadUrl": f"http://storage/{uri}"}
+                else:
+                    file = {"id": f"id-{uri}", "filename": uri, "uri": uri, "contentType": "text/csv", "createdAt": ""}
+                    results[f"op{i}"] = {"success": True, "errors": [], "file": file}
+            return results
+
+        mock_graphql.side_effect = graphql_responses
+        uploads = {}
+
+        @all_requests
+        def storage_responses(url, request):
+            uploads[url.path] = b"".join(request.body)
+            return response(500 if url.path == "/broken.csv" else 200)
+
+        sources = [(f"content {i}".encode(), f"file-{i}.csv") for i in range(5)]
+        with HTTMock(storage_responses):
+            files = version.add_files(sources, max_concurrency=3)
+            self.assertEqual([f.id for f in files], [f"id-file-{i}.csv" for i in range(5)])
+            self.assertEqual(uploads["/file-3.csv"], b"content 3")
+            # 3 batches of upload URLs, 3 batches of registrations
+            self.assertEqual(mock_graphql.call_count, 6)
+
+            with self.assertRaises(BulkUploadError) as context:
+                version.add_files([(b"a", "a.csv"), (b"broken", "broken.csv"), (b"b", "b.csv")])
+        self.assertEqual([f and f.id for f in context.exception.files], ["id-a.csv", None, "id-b.csv"])
+        self.assertEqual(list(context.exception.errors), [1])
+
+    @patch.dict(os.environ, {"HEXA_TOKEN": "token", "HEXA_SERVER_URL": "http://server"})
+    @patch("openhexa.sdk.datasets.dataset.graphql")
+    def test_add_files_registers_uploaded_files_when_last_upload_url_fails(self, mock_graphql):
+        """Ensure that uploaded files are registered even if the upload URL of the last file cannot be generated."""
+        version = DatasetVersion(dataset=None, id="version-id", name="v1", created_at="2021-01-01T00:00:00.000Z")
+
+        def graphql_responses(query, variables):
+            results = {}
+            for i in range(len(variables)):
+                uri = variables[f"input{i}"]["uri"]
+                if "generateDatasetUploadUrl" in query and uri == "file-2.csv":
+                    results[f"op{i}"] = {"success": False, "errors": ["PERMISSION_DENIED"], "uploadUrl": None}
+                elif "generateDatasetUploadUrl" in query:
+                    results[f"op{i}"] = {"success": True, "errors": [], "uploadUrl": f"http://storage/{uri}"}
+                else:
+                    file = {"id": f"id-{uri}", "filename": uri, "uri": uri, "contentType": "text/csv", "createdAt": ""}
+                    results[f"op{i}"] = {"success": True, "errors": [], "file": file}
+            return results
+
+        mock_graphql.side_effect = graphql_responses
+
+        @all_requests
+        def storage_responses(url, request):
+            return response(200)
+
+        sources = [(b"content", f"file-{i}.csv") for i in range(3)]
+        # The first two files are uploaded before the upload URL of the last one is requested
+        with (
+            HTTMock(storage_responses),
+            patch("openhexa.sdk.datasets.dataset.wait", side_effect=lambda futures, return_when: wait(futures)),
+            self.assertRaises(BulkUploadError) as context,
+        ):
+            version.add_files(sources, max_concurrency=1)
+
+        self.assertEqual([f and f.id for f in context.exception.files], ["id-file-0.csv", "id-file-1.csv", None])
+        self.assertEqual(list(context.exception.errors), [2])
+
+    @patch.dict(os.environ, {"HEXA_TOKEN": "token", "HEXA_SERVER_URL": "http://server"})
+    @patch("openhexa.sdk.datasets.dataset.graphql")
+    def test_add_files_generates_upload_urls_as_uploads_progress(self, mock_graphql):
+        """Ensure that upload URLs are only generated a few files ahead of the uploads, so that they do not expire."""
+        version = DatasetVersion(dataset=None, id="version-id", name="v1", created_at="2021-01-01T00:00:00.000Z")
+        uploads = []
+        uploaded_before_url = {}
+
+        def graphql_responses(query, variables):
+            results = {}
+            for i in range(len(variables)):
+                uri = variables[f"input{i}"]["uri"]
+                if "generateDatasetUploadUrl" in query:
+                    uploaded_before_url[uri] = len(uploads)
+                    results[f"op{i}"] = {"success": True, "errors": [], "uploadUrl": f"http://storage/{uri}"}
+                else:
+                    file = {"id": f"id-{uri}", "filename": uri, "uri": uri, "contentType": "text/csv", "createdAt": ""}
+                    results[f"op{i}"] = {"success": True, "errors": [], "file": file}
+            return results
+
+        mock_graphql.side_effect = graphql_responses
+
+        @all_requests
+        def storage_responses(url, request):
+            uploads.append(url.path)
+            return response(200)
+
+        sources = [(b"content", f"file-{i}.csv") for i in range(8)]
+        with HTTMock(storage_responses):
+            files = version.add_files(sources, max_concurrency=2)
+
+        self.assertEqual(len(files), 8)
+        self.assertEqual(len(uploads), 8)
+        for i in range(8):
+            self.assertGreaterEqual(uploaded_before_url[f"file-{i}.csv"], i - 4)
+
+    @patch("openhexa.sdk.datasets.dataset.graphql")
+    def test_list_files_fetches_pages_concurrently(self, mock_graphql):
+        """Ensure that the pages following the first one are fetched concurrently, and iterated over in order."""
+        version = DatasetVersion(dataset=None, id="version-id", name="v1", created_at="2021-01-01T00:00:00.000Z")
+        third_page_requested = threading.Event()
+
+        def graphql_responses(query, variables):
+            page = variables["page"]
+            if page == 2:
+                # Only answered once the third page is requested as well
+                self.assertTrue(third_page_requested.wait(timeout=5))
+            elif page == 3:
+                third_page_requested.set()
+            items = [
+                {"id": f"{page}-{i}", "uri": "", "filename": "", "contentType": "", "createdAt": ""}
+                for i in range(variables["perPage"])
+            ]
+            return {"datasetVersion": {"files": {"items": items, "totalPages": 4}}}
+
+        mock_graphql.side_effect = graphql_responses
+        files = version.list_files(per_page=2, max_concurrency=2)
+
+        self.assertEqual([f.id for f in files], [f"{page}-{i}" for page in range(1, 5) for i in range(2)])
+        self.assertEqual(sorted(call.args[1]["page"] for call in mock_graphql.call_args_list), [1, 2, 3, 4])
+        self.assertEqual(files.total_pages, 4)
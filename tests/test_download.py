@@ -0,0 +1,289 @@
+"""Dataset file downloads test module."""
+
+import datetime
+import io
+import json
+import os
+import re
+import time
+from unittest.mock import patch
+
+import pytest
+from httmock import HTTMock, all_requests, response
+
+from openhexa.sdk.datasets.cache import DatasetFileCache
+from openhexa.sdk.datasets.dataset import DatasetFile, DatasetVersion, VersionFilesIterator
+from openhexa.sdk.datasets.url_cache import download_urls, get_url_expiry
+
+CONTENT = bytes(range(256)) * 40
+
+
+class FakeStorage:
+    """Storage serving a file, honouring range requests (and If-Range conditions)."""
+
+    def __init__(self, content: bytes = CONTENT, truncate_first: bool = False, etag: str = '"v1"'):
+        self.content = content
+        self.truncate_first = truncate_first
+        self.etag = etag
+        self.ranges = []
+
+    @property
+    def mock(self):
+        @all_requests
+        def handler(url, request):
+            requested = request.headers.get("Range")
+            self.ranges.append(requested)
+            if requested is None or request.headers.get("If-Range", self.etag) != self.etag:
+                content = self.content
+                if self.truncate_first:
+                    self.truncate_first = False
+                    content = content[: len(content) // 2]
+                return response(200, content, headers={"ETag": self.etag}, stream=True)
+
+            start, end = re.match(r"bytes=(\d+)-(\d*)", requested).groups()
+            start, end = int(start), min(int(end or len(self.content) - 1), len(self.content) - 1)
+            headers = {"Content-Range": f"bytes {start}-{end}/{len(self.content)}", "ETag": self.etag}
+            return response(206, self.content[start : end + 1], headers=headers, stream=True)
+
+        return HTTMock(handler)
+
+
+@pytest.fixture(autouse=True)
+def clear_download_urls():
+    """Start each test with an empty download URL cache."""
+    download_urls.clear()
+
+
+@pytest.fixture
+def dataset_file():
+    """Dataset file with a known download URL."""
+    file = DatasetFile(
+        version=None, id="file-id", uri="data.bin", filename="data.bin", content_type="", created_at="2024-01-01"
+    )
+    download_urls.set(file.id, "https://storage.test/data.bin")
+    return file
+
+
+def test_iter_chunks(dataset_file):
+    """File content can be iterated over by chunks."""
+    with FakeStorage().mock:
+        chunks = list(dataset_file.iter_chunks(chunk_size=4096))
+
+    assert [len(chunk) for chunk in chunks] == [4096, 4096, 2048]
+    assert b"".join(chunks) == CONTENT
+
+
+@patch("openhexa.sdk.datasets.download.RETRY_BACKOFF", 0)
+def test_download_to_resumes_interrupted_download(dataset_file, tmp_path):
+    """Interrupted downloads are resumed with a range request, and the file only appears once complete."""
+    storage = FakeStorage(truncate_first=True)
+    with storage.mock:
+        path = dataset_file.download_to(tmp_path)
+
+    assert path == tmp_path / "data.bin"
+    assert path.read_bytes() == CONTENT
+    assert storage.ranges == ["bytes=0-0", None, f"bytes={len(CONTENT) // 2}-"]
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_download_to_resumes_partial_file(dataset_file, tmp_path):
+    """Partial files left by a previous download of the same file are resumed."""
+    (tmp_path / "copy.bin.part").write_bytes(CONTENT[:1000])
+    (tmp_path / "copy.bin.part.json").write_text(json.dumps({"file_id": "file-id", "etag": '"v1"'}))
+    storage = FakeStorage()
+    with storage.mock:
+        dataset_file.download_to(tmp_path / "copy.bin")
+
+    assert (tmp_path / "copy.bin").read_bytes() == CONTENT
+    assert storage.ranges == ["bytes=0-0", "bytes=1000-"]
+    assert list(tmp_path.iterdir()) == [tmp_path / "copy.bin"]
+
+
+@pytest.mark.parametrize(
+    "identity",
+    [
+        None,
+        {"file_id": "other-file-id", "etag": '"v1"'},
+        {"file_id": "file-id", "etag": '"v0"'},
+    ],
+)
+def test_download_to_restarts_partial_file_of_another_file(dataset_file, tmp_path, identity):
+    """Partial files left by the download of another file, or of another version of the file, are not resumed."""
+    (tmp_path / "copy.bin.part").write_bytes(b"\xff" * 1000)
+    if identity is not None:
+        (tmp_path / "copy.bin.part.json").write_text(json.dumps(identity))
+    storage = FakeStorage()
+    with storage.mock:
+        dataset_file.download_to(tmp_path / "copy.bin")
+
+    assert (tmp_path / "copy.bin").read_bytes() == CONTENT
+    assert storage.ranges == ["bytes=0-0", None]
+
+
+def test_download_to_restarts_when_file_changed_during_download(dataset_file, tmp_path):
+    """The whole file is downloaded again if it changed since the partial file was written."""
+    (tmp_path / "copy.bin.part").write_bytes(CONTENT[:1000])
+    (tmp_path / "copy.bin.part.json").write_text(json.dumps({"file_id": "file-id", "etag": '"v1"'}))
+    storage = FakeStorage()
+    with storage.mock, patch("openhexa.sdk.datasets.download._get_size_and_etag", return_value=(len(CONTENT), '"v1"')):
+        storage.etag = '"v2"'
+        dataset_file.download_to(tmp_path / "copy.bin")
+
+    assert (tmp_path / "copy.bin").read_bytes() == CONTENT
+    assert storage.ranges == ["bytes=1000-"]
+
+
+@patch("openhexa.sdk.datasets.download.PARALLEL_THRESHOLD", 4096)
+@patch("openhexa.sdk.datasets.download.PART_SIZE", 4000)
+def test_download_to_parallel(dataset_file, tmp_path):
+    """Large files are downloaded by several ranged requests."""
+    storage = FakeStorage()
+    with storage.mock:
+        path = dataset_file.download_to(tmp_path / "data.bin", max_concurrency=3)
+
+    assert path.read_bytes() == CONTENT
+    assert sorted(storage.ranges[1:]) == ["bytes=0-3999", "bytes=4000-7999", "bytes=8000-10239"]
+
+
+def test_open_reads_ranges(dataset_file):
+    """Opened files are seekable, and only the parts that are read are downloaded."""
+    storage = FakeStorage()
+    with storage.mock, dataset_file.open(buffer_size=1024) as f:
+        f.seek(-10, io.SEEK_END)
+        assert f.read() == CONTENT[-10:]
+        f.seek(100)
+        assert f.read(5) == CONTENT[100:105]
+        assert f.tell() == 105
+
+    assert storage.ranges == ["bytes=0-0", "bytes=10230-10239", "bytes=100-1123"]
+
+
+def test_open_parquet(dataset_file):
+    """Parquet files can be read column by column from an opened file."""
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    buffer = io.BytesIO()
+    pq.write_table(pa.table({"district": ["a", "b"], "value": [1, 2], "other": [0.5, 1.5]}), buffer)
+
+    with FakeStorage(buffer.getvalue()).mock, dataset_file.open() as f:
+        table = pq.read_table(f, columns=["value"])
+
+    assert table.to_pydict() == {"value": [1, 2]}
+
+
+def test_cache_settings(tmp_path):
+    """The dataset file cache lives in the workspace tmp directory by default, and is disabled outside of workspaces."""
+    with patch.dict(os.environ, {}, clear=True):
+        assert DatasetFileCache.from_settings() is None
+    with patch.dict(os.environ, {"WORKSPACE_TMP_PATH": str(tmp_path)}, clear=True):
+        assert DatasetFileCache.from_settings().directory == str(tmp_path / ".cache" / "openhexa" / "datasets")
+    with patch.dict(os.environ, {"WORKSPACE_TMP_PATH": str(tmp_path), "HEXA_DATASET_CACHE_MAX_SIZE": "0"}):
+        assert DatasetFileCache.from_settings() is None
+
+
+@patch("openhexa.sdk.datasets.dataset.graphql")
+def test_cached_downloads(mock_graphql, tmp_path):
+    """Once downloaded, files are read, opened and downloaded from the cache, without preparing a download URL."""
+    mock_graphql.return_value = {
+        "prepareVersionFileDownload": {"success": True, "errors": [], "downloadUrl": "https://storage.test/data.bin"}
+    }
+    storage = FakeStorage()
+    with patch.dict(os.environ, {"HEXA_DATASET_CACHE_PATH": str(tmp_path / "cache")}), storage.mock:
+        file = DatasetFile(None, id="file-id", uri="data.bin", filename="data.bin", content_type="", created_at="")
+        assert file.read() == CONTENT
+        assert storage.ranges == [None]
+
+        file = DatasetFile(None, id="file-id", uri="data.bin", filename="data.bin", content_type="", created_at="")
+        assert file.read() == CONTENT
+        assert b"".join(file.iter_chunks(1000)) == CONTENT
+        with file.open() as f:
+            f.seek(-10, io.SEEK_END)
+            assert f.read() == CONTENT[-10:]
+        assert file.download_to(tmp_path).read_bytes() == CONTENT
+
+    assert storage.ranges == [None]
+    assert mock_graphql.call_count == 1
+
+
+def test_downloaded_files_are_cached(dataset_file, tmp_path):
+    """Files downloaded to disk are added to the cache."""
+    storage = FakeStorage()
+    with patch.dict(os.environ, {"HEXA_DATASET_CACHE_PATH": str(tmp_path / "cache")}), storage.mock:
+        dataset_file.download_to(tmp_path / "first.bin")
+        dataset_file.download_to(tmp_path / "second.bin")
+
+    assert (tmp_path / "second.bin").read_bytes() == CONTENT
+    assert storage.ranges == ["bytes=0-0", None]
+
+
+def test_get_url_expiry():
+    """The expiry of pre-signed URLs is read from their query string."""
+    assert (
+        get_url_expiry(
+            "https://storage.googleapis.com/b/f?X-Goog-Algorithm=GOOG4-RSA-SHA256&X-Goog-Date=20240101T000000Z"
+            "&X-Goog-Expires=3600&X-Goog-Signature=abc"
+        )
+        == datetime.datetime(2024, 1, 1, 1, tzinfo=datetime.UTC).timestamp()
+    )
+    assert (
+        get_url_expiry(
+            "https://bucket.s3.amazonaws.com/f?X-Amz-Date=20240101T000000Z&X-Amz-Expires=60&X-Amz-Signature=abc"
+        )
+        == datetime.datetime(2024, 1, 1, 0, 1, tzinfo=datetime.UTC).timestamp()
+    )
+    assert get_url_expiry("https://storage.googleapis.com/b/f?Expires=1704067200&Signature=abc") == 1704067200
+    assert get_url_expiry("https://storage.test/f") is None
+
+
+def test_download_urls_expire():
+    """Download URLs are not reused shortly before they expire."""
+    expires_soon = datetime.datetime.fromtimestamp(time.time() - 3600 + 30, tz=datetime.UTC)
+    download_urls.set("soon", f"https://s3.test/f?X-Amz-Date={expires_soon:%Y%m%dT%H%M%SZ}&X-Amz-Expires=3600")
+    download_urls.set("later", "https://s3.test/f?X-Amz-Date=20990101T000000Z&X-Amz-Expires=3600")
+
+    assert download_urls.get("soon") is None
+    assert download_urls.get("later") is not None
+
+
+@patch("openhexa.sdk.datasets.dataset.graphql")
+def test_download_url_refreshed_when_rejected(mock_graphql, dataset_file):
+    """A new download URL is prepared when the storage rejects the cached one."""
+    mock_graphql.return_value = {
+        "prepareVersionFileDownload": {"success": True, "errors": [], "downloadUrl": "https://storage.test/new"}
+    }
+
+    @all_requests
+    def storage(url, request):
+        return response(403) if url.path == "/data.bin" else response(200, CONTENT)
+
+    with HTTMock(storage):
+        assert dataset_file.read() == CONTENT
+
+    assert mock_graphql.call_count == 1
+    assert dataset_file.download_url == "https://storage.test/new"
+
+
+@patch("openhexa.sdk.datasets.dataset.graphql")
+def test_download_urls_prepared_by_page(mock_graphql):
+    """The download URLs of the files of a page are prepared by a single request, when the first one is needed."""
+
+    def graphql_responses(query, variables):
+        if "getDatasetFiles" in query:
+            items = [
+                {"id": f"file-{i}", "uri": "", "filename": f"{i}.csv", "contentType": "", "createdAt": ""}
+                for i in range(3)
+            ]
+            return {"datasetVersion": {"files": {"items": items, "totalPages": 1}}}
+        return {
+            f"op{i}": {"success": True, "errors": [], "downloadUrl": f"https://storage.test/{value['fileId']}"}
+            for i, value in enumerate(variables.values())
+        }
+
+    mock_graphql.side_effect = graphql_responses
+    version = DatasetVersion(dataset=None, id="version-id", name="v1", created_at="")
+
+    urls = [file.download_url for file in VersionFilesIterator(version)]
+
+    assert urls == [f"https://storage.test/file-{i}" for i in range(3)]
+    assert mock_graphql.call_count == 2
+    assert "op2: prepareVersionFileDownload(input: $input2)" in mock_graphql.call_args_list[1].args[0]
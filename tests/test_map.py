@@ -0,0 +1,198 @@
+"""Map task test module."""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from openhexa.sdk.pipelines.executor import PoolGroup
+from openhexa.sdk.pipelines.pipeline import Pipeline, PipelineRunError
+from openhexa.sdk.pipelines.scheduler import TaskScheduler, get_graph_width
+from openhexa.sdk.pipelines.task import MapTask, get_default_chunksize
+
+
+def test_map_task_gathers_results_in_order():
+    """The map task result is the list of the results of each element, and can be reduced by a downstream task."""
+
+    def pipeline_func():
+        squares = square.map(range(10), chunksize=3)
+        total(squares)
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="inline")
+
+    @pipeline.task
+    def square(x):
+        return x * x
+
+    @pipeline.task
+    def total(squares):
+        return sum(squares)
+
+    pipeline.run({})
+
+    assert isinstance(pipeline.tasks[0], MapTask)
+    assert pipeline.tasks[0].result == [x * x for x in range(10)]
+    assert pipeline.tasks[1].result == 285
+
+
+def test_map_task_over_upstream_result():
+    """The collection and the extra arguments can be the results of upstream tasks."""
+
+    def pipeline_func():
+        scale(multiply.map(get_items(), get_factor(), offset=1))
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="thread", max_workers=2)
+
+    @pipeline.task
+    def get_items():
+        return list(range(20))
+
+    @pipeline.task
+    def get_factor():
+        return 3
+
+    @pipeline.task
+    def multiply(x, factor, offset=0):
+        return x * factor + offset
+
+    @pipeline.task
+    def scale(values):
+        return max(values)
+
+    pipeline.run({})
+
+    assert pipeline.tasks[2].result == [x * 3 + 1 for x in range(20)]
+    assert pipeline.tasks[3].result == 58
+
+
+def test_map_task_in_worker_processes():
+    """Chunks are spread over the worker processes."""
+
+    def pipeline_func():
+        get_pid.map(range(8), chunksize=1)
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], max_workers=2)
+
+    @pipeline.task
+    def get_pid(_):
+        import os
+        import time
+
+        time.sleep(0.1)
+        return os.getpid()
+
+    pipeline.run({})
+
+    assert len(pipeline.tasks[0].result) == 8
+
+
+def test_map_task_progress_is_aggregated():
+    """The partial progress of map tasks is reported once per percentage change."""
+
+    def pipeline_func():
+        identity.map(range(100), chunksize=1)
+
+    pipeline = Pipeline("pipeline", pipeline_func, [])
+
+    @pipeline.task
+    def identity(x):
+        return x
+
+    pipeline.function()
+    progress = []
+    with PoolGroup("inline", max_workers=1) as pools:
+        TaskScheduler(pipeline.tasks, pools, on_progress=progress.append).run()
+
+    assert progress == list(range(1, 101))
+
+
+def test_empty_map_task():
+    """Mapping over an empty collection returns an empty list without submitting work."""
+
+    def pipeline_func():
+        identity.map([])
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="inline")
+
+    @pipeline.task
+    def identity(x):
+        return x
+
+    pipeline.run({})
+
+    assert pipeline.tasks[0].result == []
+
+
+def test_map_task_failure():
+    """An exception raised for any element fails the run."""
+
+    def pipeline_func():
+        invert.map([1, 2, 0, 4], chunksize=1)
+
+    pipeline = Pipeline("pipeline", pipeline_func, [])
+
+    @pipeline.task
+    def invert(x):
+        return 1 / x
+
+    pipeline.function()
+    with pytest.raises(PipelineRunError, match="division by zero"):
+        with PoolGroup("inline", max_workers=1) as pools:
+            pipeline._execute_tasks(pools)
+
+
+def test_map_task_invalid_options():
+    """Generator tasks cannot be mapped, and the chunk size must be positive."""
+
+    def generator(_):
+        yield 1
+
+    pipeline = Pipeline("pipeline", lambda: None, [])
+    with pytest.raises(ValueError):
+        pipeline.task(generator).map([1])
+    with pytest.raises(ValueError):
+        pipeline.task(lambda x: x).map([1], chunksize=0)
+
+
+def test_default_chunksize():
+    """The default chunk size aims at about 4 chunks per worker."""
+    assert get_default_chunksize(0, 4) == 1
+    assert get_default_chunksize(10, 4) == 1
+    assert get_default_chunksize(100, 4) == 7
+    assert get_default_chunksize(160, 4) == 10
+
+
+def test_map_task_chunks_run_in_parallel_by_default():
+    """Without an explicit pool size, the chunks of a map task count toward the width of the graph."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def pipeline_func():
+        total(work.map(range(16)))
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="thread")
+
+    @pipeline.task
+    def work(x):
+        barrier.wait()  # Blocks until another chunk is running at the same time
+        return x
+
+    @pipeline.task
+    def total(values):
+        return sum(values)
+
+    with patch("os.cpu_count", return_value=4):
+        pipeline.run({})
+
+    assert pipeline.tasks[1].result == 120
+
+
+def test_graph_width_counts_map_chunks():
+    """Map tasks count for their number of chunks, or the number of CPUs when the collection is not known yet."""
+    pipeline = Pipeline("pipeline", lambda: None, [])
+    source = pipeline.task(lambda: list(range(10)))()
+    work = pipeline.task(lambda x: x)
+
+    with patch("os.cpu_count", return_value=4):
+        assert get_graph_width([work.map(range(16))]) == 16
+        assert get_graph_width([work.map(range(16), chunksize=5)]) == 4
+        assert get_graph_width([source, work.map(source)]) == 4
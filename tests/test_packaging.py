@@ -0,0 +1,155 @@
+"""Packaging tests."""
+
+import io
+import os
+from pathlib import Path
+from unittest.mock import patch
+from zipfile import ZipFile
+
+import pytest
+
+from openhexa.cli.api import generate_zip_file
+from openhexa.cli.packaging import IgnoreRules, collect_files, get_manifest, get_manifest_digest, write_zip
+
+
+def write_files(directory: Path, files: dict[str, str]):
+    for name, content in files.items():
+        path = directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+@pytest.mark.parametrize(
+    "pattern,path,is_dir,expected",
+    [
+        ("*.py", "pipeline.py", False, True),
+        ("*.py", "src/module.py", False, True),
+        ("data/", "data", True, True),
+        ("data/", "data", False, None),
+        ("data/", "src/data", True, True),
+        ("/data", "src/data", True, None),
+        ("src/*.py", "src/module.py", False, True),
+        ("src/*.py", "src/package/module.py", False, None),
+        ("src/**/*.py", "src/package/module.py", False, True),
+        ("**/tmp", "a/b/tmp", True, True),
+        ("file_[0-9].py", "file_1.py", False, True),
+        ("file_[!0-9].py", "file_1.py", False, None),
+        ("# comment", "# comment", False, None),
+    ],
+)
+def test_ignore_rules_match(pattern, path, is_dir, expected):
+    assert IgnoreRules([pattern]).match(path, is_dir) is expected
+
+
+def test_ignore_rules_negation():
+    rules = IgnoreRules(["*.md", "!README.md"])
+    assert rules.match("notes.md", False) is True
+    assert rules.match("README.md", False) is False
+
+
+def test_collect_files(tmp_path):
+    write_files(
+        tmp_path,
+        {
+            "pipeline.py": "",
+            "requirements.txt": "",
+            "data.csv": "",
+            "Makefile": "",
+            "src/utils.py": "",
+            "src/__pycache__/utils.py": "",
+            ".git/hooks/hook.py": "",
+            "node_modules/package/index.md": "",
+            "workspace/script.py": "",
+            "env/pyvenv.cfg": "",
+            "env/lib/module.py": "",
+            "conda/bin/python": "",
+            "conda/lib/module.py": "",
+            "notebooks/exploration.ipynb": "",
+            "notebooks/.gitignore": "scratch_*\n",
+            "notebooks/scratch_1.ipynb": "",
+            "scratch_2.py": "",
+            ".gitignore": "build/\n*.md\n!README.md\n",
+            ".openhexaignore": "tests/\n",
+            "build/lib.py": "",
+            "tests/test_pipeline.py": "",
+            "README.md": "",
+            "NOTES.md": "",
+        },
+    )
+
+    files = collect_files(tmp_path, [tmp_path / "workspace"])
+
+    assert [file.as_posix() for file in files] == [
+        "README.md",
+        "pipeline.py",
+        "requirements.txt",
+        "scratch_2.py",
+        "notebooks/exploration.ipynb",
+        "src/utils.py",
+    ]
+
+
+def test_write_zip_is_reproducible(tmp_path):
+    write_files(tmp_path, {"pipeline.py": "print('hello')\n" * 100, "src/é.py": "", "run.sh.py": ""})
+    os.chmod(tmp_path / "run.sh.py", 0o755)
+    files = collect_files(tmp_path)
+
+    archive = io.BytesIO()
+    write_zip(archive, tmp_path, files)
+    os.utime(tmp_path / "pipeline.py", (0, 0))
+    other_archive = io.BytesIO()
+    write_zip(other_archive, tmp_path, files, max_workers=1)
+
+    assert archive.getvalue() == other_archive.getvalue()
+    with ZipFile(archive) as zip_file:
+        assert zip_file.testzip() is None
+        assert zip_file.namelist() == ["pipeline.py", "run.sh.py", "src/é.py"]
+        assert zip_file.read("pipeline.py") == b"print('hello')\n" * 100
+        assert zip_file.getinfo("run.sh.py").external_attr >> 16 == 0o100755
+        assert zip_file.getinfo("pipeline.py").date_time == (1980, 1, 1, 0, 0, 0)
+
+
+def test_write_zip_large_archive(tmp_path):
+    """Archives too large for the ZIP32 format are written by zipfile, with the same content."""
+    write_files(tmp_path, {"pipeline.py": "print('hello')\n", "src/utils.py": ""})
+    files = collect_files(tmp_path)
+
+    archive = io.BytesIO()
+    with patch("openhexa.cli.packaging._ZIP32_MAX_ENTRIES", 1):
+        write_zip(archive, tmp_path, files)
+
+    with ZipFile(archive) as zip_file:
+        assert zip_file.namelist() == ["pipeline.py", "src/utils.py"]
+        assert zip_file.read("pipeline.py") == b"print('hello')\n"
+        assert zip_file.getinfo("pipeline.py").date_time == (1980, 1, 1, 0, 0, 0)
+
+
+def test_manifest_digest(tmp_path):
+    write_files(tmp_path, {"pipeline.py": "print('hello')\n", "src/utils.py": ""})
+    digest = get_manifest_digest(get_manifest(tmp_path, collect_files(tmp_path)))
+
+    (tmp_path / "data.csv").write_text("not packaged")
+    assert get_manifest_digest(get_manifest(tmp_path, collect_files(tmp_path))) == digest
+
+    (tmp_path / "src" / "utils.py").write_text("VALUE = 1\n")
+    assert get_manifest_digest(get_manifest(tmp_path, collect_files(tmp_path))) != digest
+
+
+def test_generate_zip_file_excludes_workspace_files_path(tmp_path):
+    write_files(
+        tmp_path,
+        {
+            "pipeline.py": "",
+            "workspace.yaml": "files:\n  path: ./files\n",
+            "files/script.py": "",
+            "workspace/script.py": "",
+        },
+    )
+
+    with patch(
+        "openhexa.cli.api.get_local_workspace_config", return_value={"WORKSPACE_FILES_PATH": tmp_path / "files"}
+    ):
+        zip_file = generate_zip_file(tmp_path)
+
+    with ZipFile(zip_file) as archive:
+        assert archive.namelist() == ["pipeline.py"]
@@ -14,10 +14,12 @@ from openhexa.sdk import (
     PostgreSQLConnection,
     S3Connection,
 )
+from openhexa.sdk.pipelines.executor import PoolGroup, create_pool, preload_modules
 from openhexa.sdk.pipelines.heartbeat import HeartbeatThread
 from openhexa.sdk.pipelines.log_level import LogLevel
 from openhexa.sdk.pipelines.parameter import Parameter, ParameterValueError
-from openhexa.sdk.pipelines.pipeline import Pipeline
+from openhexa.sdk.pipelines.pipeline import Pipeline, PipelineRunError
+from openhexa.sdk.pipelines.task import Task
 from openhexa.sdk.utils import Environment
 
 
@@ -335,6 +337,404 @@ def test_pipeline_continues_execution_when_heartbeat_fails(mock_get_environment,
     ), "Heartbeat should have been attempted multiple times despite failures"
 
 
+class SynchronousPool:
+    """Minimal stand-in for a multiprocessing pool, running tasks as soon as they are submitted."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def apply_async(self, func, args=(), kwds=None, callback=None, error_callback=None):
+        self.submitted.append(func.__self__.name)
+        try:
+            result = func(*args, **(kwds or {}))
+        except Exception as e:
+            error_callback(e)
+        else:
+            callback(result)
+
+    def terminate(self):
+        pass
+
+
+def execute_tasks(pipeline, max_workers=4, pool=None):
+    """Execute the tasks of the pipeline with a synchronous pool, and return the pool."""
+    pool = pool or SynchronousPool()
+    with patch("openhexa.sdk.pipelines.executor.create_pool", return_value=pool):
+        pipeline._execute_tasks(PoolGroup("process", max_workers))
+
+    return pool
+
+
+def test_pipeline_execute_tasks_follows_dependencies():
+    """Tasks are submitted once their upstream tasks are done, and results flow to dependents."""
+
+    def pipeline_func():
+        a = task_a()
+        b = task_b(a)
+        c = task_c(a)
+        task_d(b, c=c)
+
+    pipeline = Pipeline("pipeline", pipeline_func, [])
+
+    @pipeline.task
+    def task_a():
+        return 1
+
+    @pipeline.task
+    def task_b(x):
+        return x + 1
+
+    @pipeline.task
+    def task_c(x):
+        return x * 10
+
+    @pipeline.task
+    def task_d(b, c):
+        return b + c
+
+    pipeline.function()
+    pool = execute_tasks(pipeline)
+
+    assert pool.submitted == ["task_a", "task_b", "task_c", "task_d"]
+    assert [t.result for t in pipeline.tasks] == [1, 2, 10, 12]
+    assert all(t.end_time is not None for t in pipeline.tasks)
+
+
+def test_pipeline_execute_tasks_raises_on_task_failure():
+    """A failing task stops the execution and its dependents are never submitted."""
+
+    def pipeline_func():
+        task_b(task_a())
+
+    pipeline = Pipeline("pipeline", pipeline_func, [])
+
+    @pipeline.task
+    def task_a():
+        raise ValueError("boom")
+
+    @pipeline.task
+    def task_b(x):
+        return x
+
+    pipeline.function()
+    pool = SynchronousPool()
+    with pytest.raises(PipelineRunError, match="boom"):
+        execute_tasks(pipeline, pool=pool)
+
+    assert pool.submitted == ["task_a"]
+    assert pipeline.tasks[1].skipped
+
+
+def test_pipeline_execute_tasks_retries_failed_tasks():
+    """A failing task is retried until it succeeds, with an exponential backoff."""
+    attempts = []
+
+    def pipeline_func():
+        task_b(task_a())
+
+    pipeline = Pipeline("pipeline", pipeline_func, [])
+
+    @pipeline.task(retries=2, retry_backoff=0.01)
+    def task_a():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise ValueError("transient")
+        return 1
+
+    @pipeline.task
+    def task_b(x):
+        return x + 1
+
+    pipeline.function()
+    pool = SynchronousPool()
+    execute_tasks(pipeline, pool=pool)
+
+    assert pool.submitted == ["task_a", "task_a", "task_a", "task_b"]
+    assert pipeline.tasks[0].attempts == 3
+    assert pipeline.tasks[1].result == 2
+    assert attempts[2] - attempts[1] >= 0.02
+
+
+def test_pipeline_execute_tasks_gives_up_after_retries():
+    """Once its retries are exhausted, the failing task fails the run."""
+
+    def pipeline_func():
+        task_a()
+
+    pipeline = Pipeline("pipeline", pipeline_func, [])
+
+    @pipeline.task(retries=1, retry_backoff=0)
+    def task_a():
+        raise ValueError("boom")
+
+    pipeline.function()
+    pool = SynchronousPool()
+    with pytest.raises(PipelineRunError, match="boom"):
+        execute_tasks(pipeline, pool=pool)
+
+    assert pool.submitted == ["task_a", "task_a"]
+
+
+def test_pipeline_execute_tasks_times_out(capsys):
+    """A task running longer than its timeout fails the run, and tasks that have not started are skipped."""
+
+    def pipeline_func():
+        task_b(task_a())
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="thread")
+
+    @pipeline.task(timeout=0.1)
+    def task_a():
+        time.sleep(2)
+
+    @pipeline.task
+    def task_b(x):
+        return x
+
+    pipeline.function()
+    start = time.monotonic()
+    with pytest.raises(PipelineRunError, match="timed out"):
+        with PoolGroup("thread", max_workers=2) as pools:
+            pipeline._execute_tasks(pools)
+
+    assert time.monotonic() - start < 1
+    assert pipeline.tasks[1].skipped
+    assert 'Skipped task "task_b"' in capsys.readouterr().out
+
+
+def test_task_work_item_does_not_reference_task_graph():
+    """Work items sent to workers only hold the task function and the results of upstream tasks."""
+
+    def pipeline_func():
+        a = task_a(b"x" * 1000)
+        task_b(a, y=task_a(b"y"), z=3)
+
+    pipeline = Pipeline("pipeline", pipeline_func, [])
+
+    @pipeline.task
+    def task_a(data):
+        return len(data)
+
+    @pipeline.task
+    def task_b(x, y, z):
+        return x + y + z
+
+    pipeline.function()
+    execute_tasks(pipeline)
+
+    work_item = pipeline.tasks[2].get_work_item()
+    assert work_item.args == [1000]
+    assert work_item.kwargs == {"y": 1, "z": 3}
+    assert not any(isinstance(v, Task) for v in [*work_item.args, *work_item.kwargs.values()])
+    assert work_item.run().result == 1004
+
+
+def test_pipeline_run_with_tasks():
+    """Tasks are executed in worker processes and their results are collected."""
+
+    def pipeline_func():
+        task_b(task_a(), y=3)
+
+    pipeline = Pipeline("pipeline", pipeline_func, [])
+
+    @pipeline.task
+    def task_a():
+        return 2
+
+    @pipeline.task
+    def task_b(x, y):
+        return x * y
+
+    pipeline.run({})
+
+    assert [t.result for t in pipeline.tasks] == [2, 6]
+
+
+def test_pipeline_run_streams_generator_task_to_process_task():
+    """A generator task streams its chunks to a downstream task running in a worker process."""
+
+    def pipeline_func():
+        consume(produce())
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="thread")
+
+    @pipeline.task(buffer_size=2)
+    def produce():
+        yield from range(20)
+
+    @pipeline.task(executor="process")
+    def consume(chunks):
+        return sum(chunks)
+
+    pipeline.run({})
+
+    assert pipeline.tasks[1].result == 190
+
+
+def test_pipeline_run_fails_when_generator_task_streaming_to_process_task_fails():
+    """An exception raised by a generator task partway through its stream fails the downstream process task."""
+
+    def pipeline_func():
+        consume(produce())
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="thread")
+
+    @pipeline.task(buffer_size=2)
+    def produce():
+        yield from range(10)
+        raise ValueError("boom")
+
+    @pipeline.task(executor="process")
+    def consume(chunks):
+        return sum(chunks)
+
+    with pytest.raises(PipelineRunError, match="boom"):
+        pipeline.run({})
+
+    assert pipeline.tasks[1].result is None
+
+
+@pytest.mark.parametrize("executor", ["inline", "thread"])
+def test_pipeline_run_with_executor(executor):
+    """Tasks can be run without spawning processes."""
+
+    def pipeline_func():
+        task_b(task_a(), y=3)
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor=executor)
+
+    @pipeline.task
+    def task_a():
+        return 2
+
+    @pipeline.task
+    def task_b(x, y):
+        return x * y
+
+    with patch("openhexa.sdk.pipelines.executor.get_context") as mock_get_context:
+        pipeline.run({})
+
+    mock_get_context.assert_not_called()
+    assert [t.result for t in pipeline.tasks] == [2, 6]
+
+
+@patch("openhexa.sdk.pipelines.executor.create_pool")
+def test_pipeline_run_max_workers(mock_create_pool):
+    """The pool size defaults to the graph width (bounded by the CPU count) and can be overridden."""
+
+    def pipeline_func():
+        a = task_a()
+        task_b(task_a(), task_a(), a)
+
+    pipeline = Pipeline("pipeline", pipeline_func, [])
+
+    @pipeline.task
+    def task_a():
+        return 1
+
+    @pipeline.task
+    def task_b(*args):
+        return sum(args)
+
+    mock_create_pool.return_value = SynchronousPool()
+    with patch("openhexa.sdk.pipelines.executor.os.cpu_count", return_value=64):
+        pipeline.run({})
+    mock_create_pool.assert_called_once_with("process", 3, preload=[])
+
+    pipeline.tasks = []
+    mock_create_pool.reset_mock()
+    pipeline.run({}, max_workers=2, executor="thread")
+    mock_create_pool.assert_called_once_with("thread", 2, preload=[])
+
+
+@pytest.mark.parametrize(
+    "start_methods,expected_context", [(["fork", "spawn", "forkserver"], "forkserver"), (["spawn"], "spawn")]
+)
+def test_create_pool_preloads_modules(start_methods, expected_context):
+    """Worker processes are forked from a forkserver importing the preloaded modules, or spawned as a fallback."""
+    with (
+        patch("openhexa.sdk.pipelines.executor.get_all_start_methods", return_value=start_methods),
+        patch("openhexa.sdk.pipelines.executor.get_context") as mock_get_context,
+    ):
+        create_pool("process", 2, preload=["json", "openhexa.sdk"])
+
+    mock_get_context.assert_called_once_with(expected_context)
+    context = mock_get_context.return_value
+    if expected_context == "forkserver":
+        context.set_forkserver_preload.assert_called_once_with(["openhexa.sdk", "json"])
+    else:
+        context.set_forkserver_preload.assert_not_called()
+    context.Pool.assert_called_once_with(processes=2, initializer=preload_modules, initargs=(["openhexa.sdk", "json"],))
+
+
+def test_preload_modules(capsys):
+    """Modules that cannot be imported are reported without failing the worker."""
+    preload_modules(["json", "not_a_module"])
+
+    assert "Module not_a_module could not be preloaded" in capsys.readouterr().out
+
+
+def test_pipeline_invalid_executor_options():
+    """Invalid executor names and pool sizes are rejected."""
+    with pytest.raises(ValueError):
+        Pipeline("pipeline", Mock(), [], executor="gpu")
+    with pytest.raises(ValueError):
+        Pipeline("pipeline", Mock(), [], max_workers=0)
+    with pytest.raises(ValueError):
+        Pipeline("pipeline", Mock(), []).run({}, executor="gpu")
+    with pytest.raises(ValueError):
+        Pipeline("pipeline", Mock(), [], preload="pandas")
+
+
+def test_pipeline_task_executor_hints(capsys):
+    """Tasks are routed to the pool of their executor, and process tasks reserve workers based on their CPUs."""
+
+    def pipeline_func():
+        data = download()
+        heavy(data)
+        light(data)
+
+    pipeline = Pipeline("pipeline", pipeline_func, [])
+
+    @pipeline.task(executor="thread")
+    def download():
+        return 1
+
+    @pipeline.task(cpus=2)
+    def heavy(x):
+        return x + 1
+
+    @pipeline.task
+    def light(x):
+        return x + 2
+
+    pipeline.function()
+    pools = {"thread": SynchronousPool(), "process": SynchronousPool()}
+    with patch("openhexa.sdk.pipelines.executor.create_pool", side_effect=lambda executor, *_, **__: pools[executor]):
+        pipeline._execute_tasks(PoolGroup("process", 2))
+
+    assert pools["thread"].submitted == ["download"]
+    assert pools["process"].submitted == ["heavy", "light"]
+    assert [t.result for t in pipeline.tasks] == [1, 2, 3]
+    # "heavy" reserves both workers: "light" can only start once it is finished
+    events = [line.split(" ", 1)[1] for line in capsys.readouterr().out.splitlines() if "task" in line]
+    assert events.index('Finished task "heavy"') < events.index('Started task "light"')
+
+
+def test_pipeline_task_invalid_hints():
+    """Invalid task hints are rejected when decorating the task."""
+    pipeline = Pipeline("pipeline", Mock(), [])
+
+    with pytest.raises(ValueError):
+        pipeline.task(executor="gpu")(lambda: None)
+    with pytest.raises(ValueError):
+        pipeline.task(cpus=0)(lambda: None)
+    with pytest.raises(ValueError):
+        pipeline.task(retries=-1)(lambda: None)
+    with pytest.raises(ValueError):
+        pipeline.task(timeout=0)(lambda: None)
+
+
 class TestLogLevel(TestCase):
     def test_parse_log_level(self):
         test_cases = [
@@ -0,0 +1,128 @@
+"""Run profile test module."""
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from openhexa.sdk.pipelines import code_profile
+from openhexa.sdk.pipelines.pipeline import Pipeline
+from openhexa.sdk.pipelines.task import TaskWorkItem
+from openhexa.sdk.pipelines.transport import ResultTransport
+
+
+def test_work_item_metrics(tmp_path):
+    """Profiled work items measure their execution, and the pickled size of their inputs and outputs."""
+    transport = ResultTransport(str(tmp_path), threshold=1_000_000)
+    task_com = TaskWorkItem("task", lambda x: x * 2, [b"abc"], {}, transport=transport, profile=True).run()
+
+    assert task_com.result == b"abcabc"
+    metrics = task_com.metrics
+    assert metrics["end"] >= metrics["start"]
+    assert metrics["cpu_time"] >= 0
+    assert metrics["input_bytes"] > 3
+    assert metrics["output_bytes"] > 6
+    assert metrics["pid"] == os.getpid()
+
+    # Reused workers report their lifetime peak RSS, and how much each work item raised it
+    with patch("openhexa.sdk.pipelines.profile.get_process_peak_rss", side_effect=[1000, 1500]):
+        metrics = TaskWorkItem("task", lambda: 42, [], {}, profile=True).run().metrics
+    assert metrics["worker_peak_rss"] == 1500
+    assert metrics["peak_rss_increase"] == 500
+
+    # Work items that are not sent to worker processes are not pickled
+    metrics = TaskWorkItem("task", lambda: 42, [], {}, profile=True).run().metrics
+    assert metrics["input_bytes"] is None and metrics["output_bytes"] is None
+    assert TaskWorkItem("task", lambda: 42, [], {}).run().metrics is None
+
+
+def test_pipeline_profile(tmp_path):
+    """Profiled runs write the metrics of their tasks, their critical path and a trace to the workspace tmp dir."""
+    attempts = []
+
+    def pipeline_func():
+        a = task_a()
+        task_c(task_b(a), task_d())
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="thread", profile=True)
+
+    @pipeline.task
+    def task_a():
+        return 1
+
+    @pipeline.task(retries=1, retry_backoff=0)
+    def task_b(x):
+        attempts.append(x)
+        if len(attempts) == 1:
+            raise ValueError("transient error")
+        return x + 1
+
+    @pipeline.task
+    def task_c(x, y):
+        return x + y
+
+    @pipeline.task
+    def task_d():
+        return 0
+
+    with patch.dict(os.environ, {"WORKSPACE_TMP_PATH": str(tmp_path), "HEXA_RUN_ID": "run-1"}):
+        pipeline.run({})
+
+    profile = json.loads((tmp_path / "profiles" / "run-1" / "profile.json").read_text())
+    tasks = {task["name"]: task for task in profile["tasks"]}
+    assert profile["run_id"] == "run-1"
+    assert {task["status"] for task in tasks.values()} == {"succeeded"}
+    assert tasks["task_b"]["retries"] == 1
+    assert tasks["task_a"]["executor"] == "thread"
+    assert all(task["queue_wait"] >= 0 and task["wall_time"] >= 0 for task in tasks.values())
+    assert [profile["tasks"][i]["name"] for i in profile["critical_path"]][-1] == "task_c"
+    assert tasks["task_c"]["upstream"] == [tasks["task_b"]["id"], tasks["task_d"]["id"]]
+
+    trace = json.loads((tmp_path / "profiles" / "run-1" / "trace.json").read_text())
+    events = [event for event in trace["traceEvents"] if event.get("cat") == "task"]
+    assert sorted(event["name"] for event in events) == ["task_a", "task_b", "task_c", "task_d"]
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+
+
+@pytest.mark.parametrize("mode, suffix, title", [("cpu", "pstats", "functions"), ("memory", "collapsed", "allocation")])
+def test_pipeline_code_profile(tmp_path, mode, suffix, title):
+    """With HEXA_PROFILE, the pipeline function and each task are profiled, and the profiles can be summarized."""
+
+    def pipeline_func():
+        build_rows()
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="inline")
+
+    @pipeline.task
+    def build_rows():
+        return [str(i) * 10 for i in range(10_000)]
+
+    with patch.dict(os.environ, {"HEXA_PROFILE": mode, "HEXA_PROFILE_PATH": str(tmp_path), "HEXA_RUN_ID": "run-1"}):
+        pipeline.run({})
+
+    names = sorted(path.name.rsplit("-", 1)[0] for path in (tmp_path / "run-1").glob(f"*.{suffix}"))
+    assert names == ["build_rows", "pipeline_func"]
+    summary = code_profile.summarize(tmp_path, top=5)
+    assert summary.startswith("Top ") and title in summary.splitlines()[0]
+    assert "test_profile.py" in summary
+
+
+def test_pipeline_invalid_code_profile_mode_is_ignored(tmp_path, caplog):
+    """An invalid HEXA_PROFILE value disables code profiling with a warning, instead of failing the run."""
+
+    def pipeline_func():
+        task()
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="inline")
+
+    @pipeline.task
+    def task():
+        return 42
+
+    with patch.dict(os.environ, {"HEXA_PROFILE": "true", "HEXA_PROFILE_PATH": str(tmp_path), "HEXA_RUN_ID": "run-1"}):
+        pipeline.run({})
+
+    assert pipeline.tasks[0].result == 42
+    assert "Invalid HEXA_PROFILE value 'true'" in caplog.text
+    assert not (tmp_path / "run-1").exists()
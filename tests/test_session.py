@@ -0,0 +1,51 @@
+"""Shared HTTP clients test module."""
+
+import os
+from unittest.mock import patch
+
+from openhexa.graphql import BaseOpenHexaClient
+from openhexa.utils.session import get_shared_httpx_transport, get_shared_requests_session
+
+
+def test_shared_requests_session_is_reused():
+    """The same session is returned for the same SSL verification setting."""
+    session = get_shared_requests_session()
+
+    assert get_shared_requests_session() is session
+    assert get_shared_requests_session(verify=False) is not session
+    assert session.get_adapter("https://example.org")._pool_maxsize == 32
+
+
+def test_shared_clients_are_recreated_in_child_processes():
+    """Clients inherited from a parent process are not reused."""
+    session = get_shared_requests_session()
+    transport = get_shared_httpx_transport()
+
+    with patch("openhexa.utils.session.os.getpid", return_value=os.getpid() + 1):
+        assert get_shared_requests_session() is not session
+        assert get_shared_httpx_transport() is not transport
+
+
+def test_openhexa_clients_share_connection_pool():
+    """OpenHEXA clients keep their own headers but share the transport, which survives closing a client."""
+    with BaseOpenHexaClient("https://app.openhexa.test/graphql/", token="token-1") as client_1:
+        client_2 = BaseOpenHexaClient("https://app.openhexa.test/graphql/", token="token-2")
+        assert client_1.http_client._transport is client_2.http_client._transport
+        assert client_1.http_client.headers["Authorization"] == "Bearer token-1"
+        assert client_2.http_client.headers["Authorization"] == "Bearer token-2"
+
+    assert client_1.http_client.is_closed
+    assert get_shared_httpx_transport() is client_2.http_client._transport
+    assert not client_2.http_client.is_closed
+
+
+@patch.dict(os.environ, {"HEXA_SERVER_URL": "https://app.openhexa.test", "HEXA_TOKEN": "token"})
+@patch("openhexa.sdk.utils.get_shared_requests_session")
+def test_graphql_uses_shared_session(mock_get_session):
+    """graphql() sends its requests through the shared session."""
+    from openhexa.sdk.utils import graphql
+
+    mock_get_session.return_value.post.return_value.json.return_value = {"data": {"me": None}}
+
+    assert graphql("query { me { id } }") == {"me": None}
+    mock_get_session.return_value.post.assert_called_once()
@@ -0,0 +1,151 @@
+"""Generator task streaming test module."""
+
+import threading
+
+import pytest
+
+from openhexa.sdk.pipelines.executor import PoolGroup
+from openhexa.sdk.pipelines.pipeline import Pipeline, PipelineRunError
+from openhexa.sdk.pipelines.stream import StreamError, TaskStream
+
+
+def test_generator_task_is_streamed_to_downstream_task():
+    """The downstream task consumes the chunks while the generator produces them, within the buffer size."""
+    produced = []
+    lags = []
+
+    def pipeline_func():
+        consume(produce())
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="inline")
+
+    @pipeline.task(buffer_size=2)
+    def produce():
+        for i in range(10):
+            produced.append(i)
+            yield i
+
+    @pipeline.task
+    def consume(chunks):
+        assert isinstance(chunks, TaskStream)
+        total = 0
+        for chunk in chunks:
+            lags.append(len(produced) - chunk)
+            total += chunk
+        return total
+
+    pipeline.run({})
+
+    assert pipeline.tasks[1].result == 45
+    # the producer is never more than a few chunks ahead of the consumer
+    assert max(lags) <= 4
+    assert all(task.end_time is not None for task in pipeline.tasks)
+
+
+def test_generator_tasks_can_be_chained():
+    """A generator task can consume the stream of another generator task."""
+
+    def pipeline_func():
+        collect(double(produce()))
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="thread")
+
+    @pipeline.task
+    def produce():
+        yield from range(5)
+
+    @pipeline.task
+    def double(chunks):
+        for chunk in chunks:
+            yield chunk * 2
+
+    @pipeline.task
+    def collect(chunks):
+        return list(chunks)
+
+    pipeline.run({})
+
+    assert pipeline.tasks[2].result == [0, 2, 4, 6, 8]
+
+
+def test_failing_generator_task_fails_the_run():
+    """An exception raised by the generator fails the run, and is raised in the downstream task."""
+    consumer_errors = []
+    started = threading.Event()
+    consumed = threading.Event()
+
+    def pipeline_func():
+        consume(produce())
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="thread")
+
+    @pipeline.task
+    def produce():
+        yield 1
+        started.wait(5)
+        raise ValueError("boom")
+
+    @pipeline.task
+    def consume(chunks):
+        try:
+            for _ in chunks:
+                started.set()
+        except StreamError as e:
+            consumer_errors.append(e)
+            raise
+        finally:
+            consumed.set()
+
+    pipeline.function()
+    with pytest.raises(PipelineRunError, match="boom"):
+        with PoolGroup("thread", max_workers=2) as pools:
+            pipeline._execute_tasks(pools)
+
+    assert consumed.wait(5)
+    assert len(consumer_errors) == 1
+
+
+def test_generator_task_in_worker_process():
+    """Streams are sent to downstream tasks running in worker processes through a manager queue."""
+
+    def pipeline_func():
+        consume(produce())
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], max_workers=1)
+
+    @pipeline.task
+    def produce():
+        yield from range(100)
+
+    @pipeline.task
+    def consume(chunks):
+        return sum(chunks)
+
+    pipeline.run({})
+
+    assert pipeline.tasks[1].result == 4950
+
+
+def test_generator_task_invalid_options():
+    """Generator tasks cannot be cached, retried or timed out, nor have several downstream tasks."""
+
+    def generator():
+        yield 1
+
+    def consume(chunks):
+        return chunks
+
+    pipeline = Pipeline("pipeline", lambda: None, [])
+    with pytest.raises(ValueError):
+        pipeline.task(cache=True)(generator)
+    with pytest.raises(ValueError):
+        pipeline.task(retries=1)(generator)
+    with pytest.raises(ValueError):
+        pipeline.task(buffer_size=0)(generator)
+
+    produce = pipeline.task(generator)()
+    pipeline.task(consume)(produce)
+    pipeline.task(consume)(produce)
+    with pytest.raises(ValueError, match="one downstream task"):
+        with PoolGroup("inline", max_workers=1) as pools:
+            pipeline._execute_tasks(pools)
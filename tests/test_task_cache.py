@@ -0,0 +1,129 @@
+"""Task cache test module."""
+
+import datetime
+import os
+from unittest.mock import patch
+
+import pytest
+
+from openhexa.sdk.pipelines.cache import TaskCache, get_task_cache_key
+from openhexa.sdk.pipelines.pipeline import Pipeline
+from openhexa.sdk.pipelines.task import MapWorkItem, TaskWorkItem
+from openhexa.sdk.pipelines.transport import ResultTransport
+from openhexa.utils import DiskCache
+
+
+def add(x, y):
+    return x + y
+
+
+def multiply(x, y):
+    return x * y
+
+
+def test_task_cache_key_is_stable():
+    """Cache keys depend on the function and on its inputs only."""
+    assert get_task_cache_key(add, [1], {"y": 2}) == get_task_cache_key(add, [1], {"y": 2})
+    assert get_task_cache_key(add, [1], {"y": 2}) != get_task_cache_key(add, [1], {"y": 3})
+    assert get_task_cache_key(add, [1], {"y": 2}) != get_task_cache_key(multiply, [1], {"y": 2})
+    assert get_task_cache_key(add, [1, 2], {}) != get_task_cache_key(add, [1], {"y": 2})
+    assert get_task_cache_key(add, [lambda: None], {}) is None
+
+
+def test_task_cache_key_ignores_set_order():
+    """Sets are hashed independently of their iteration order, which depends on PYTHONHASHSEED."""
+    first, second = {8, 16}, set([16, 8])
+    assert list(first) != list(second)
+    assert get_task_cache_key(add, [first], {}) == get_task_cache_key(add, [second], {})
+    assert get_task_cache_key(add, [{"a": frozenset(first)}], {}) == get_task_cache_key(
+        add, [{"a": frozenset(second)}], {}
+    )
+    assert get_task_cache_key(add, [first], {}) != get_task_cache_key(add, [frozenset(first)], {})
+    assert get_task_cache_key(add, [first], {}) != get_task_cache_key(add, [(8, 16)], {})
+
+
+def test_work_item_keys_depend_on_their_kind():
+    """A map task chunk and a plain task with the same inputs have different keys."""
+    items = [1, 2, 3]
+    task_key = TaskWorkItem("add", add, [items, 1], {}).get_key()
+    map_key = MapWorkItem("add", add, [items, 1], {}).get_key()
+    chunk_key = MapWorkItem("add", add, [items, 1], {}, bounds=(0, 3)).get_key()
+    other_chunk_key = MapWorkItem("add", add, [items, 1], {}, bounds=(3, 6)).get_key()
+
+    assert len({task_key, map_key, chunk_key, other_chunk_key}) == 4
+
+
+def test_task_cache_key_uses_spilled_content(tmp_path):
+    """Spilled inputs are hashed using their content, not their location."""
+    transport = ResultTransport(str(tmp_path), threshold=1)
+
+    first, second = transport.dump(b"data"), transport.dump(b"data")
+    assert first.path != second.path
+    assert get_task_cache_key(add, [first], {}) == get_task_cache_key(add, [second], {})
+    assert get_task_cache_key(add, [first], {}) != get_task_cache_key(add, [transport.dump(b"other")], {})
+
+
+def test_task_cache_get_put(tmp_path):
+    """Cached results can be read back, until they expire."""
+    cache = TaskCache(str(tmp_path), max_size=1024 * 1024)
+
+    assert cache.get("abcdef") == (False, None)
+    cache.put("abcdef", {"result": 42})
+    assert cache.get("abcdef") == (True, {"result": 42})
+    assert cache.get("abcdef", ttl=60) == (True, {"result": 42})
+
+    with patch("openhexa.sdk.pipelines.cache.time.time", return_value=datetime.datetime.now().timestamp() + 120):
+        assert cache.get("abcdef", ttl=60) == (False, None)
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    """The least recently used entries are evicted when the cache is full."""
+    cache = DiskCache(tmp_path, max_size=25)
+
+    cache.put("aa1", lambda f: f.write(b"x" * 10))
+    cache.put("bb2", lambda f: f.write(b"x" * 10))
+    os.utime(cache.path("aa1"), (0, 0))
+    os.utime(cache.path("bb2"), (1, 1))
+    assert cache.get("aa1") is not None  # aa1 becomes the most recently used entry
+    cache.put("cc3", lambda f: f.write(b"x" * 10))
+
+    assert cache.get("aa1") is not None
+    assert cache.get("bb2") is None
+    assert cache.get("cc3") is not None
+
+
+def test_pipeline_run_uses_task_cache(tmp_path):
+    """Cached tasks are not executed again when their code and inputs are unchanged."""
+    calls = []
+
+    def pipeline_func():
+        task_b(task_a(2))
+
+    pipeline = Pipeline("pipeline", pipeline_func, [], executor="inline")
+
+    @pipeline.task(cache=True)
+    def task_a(x):
+        calls.append("task_a")
+        return x * 10
+
+    @pipeline.task
+    def task_b(x):
+        calls.append("task_b")
+        return x + 1
+
+    with patch.dict(os.environ, {"HEXA_TASK_CACHE_PATH": str(tmp_path)}):
+        pipeline.run({})
+        pipeline.tasks = []
+        pipeline.run({})
+
+    assert calls == ["task_a", "task_b", "task_b"]
+    assert [t.result for t in pipeline.tasks] == [20, 21]
+
+
+def test_task_cache_invalid_ttl():
+    """The cache TTL must be a positive number of seconds or a timedelta."""
+    pipeline = Pipeline("pipeline", lambda: None, [])
+
+    with pytest.raises(ValueError):
+        pipeline.task(cache=True, cache_ttl=-1)(add)
+    assert pipeline.task(cache=True, cache_ttl=datetime.timedelta(hours=1))(add).cache_ttl == 3600
@@ -0,0 +1,129 @@
+"""Pipeline run telemetry test module."""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from openhexa.sdk.pipelines.run import CurrentRun
+from openhexa.sdk.pipelines.telemetry import (
+    ADD_OUTPUT,
+    LOG_MESSAGE,
+    TelemetryDispatcher,
+    _Operation,
+    build_batch_mutation,
+)
+
+
+def test_build_batch_mutation():
+    """Each operation is an aliased field of a single mutation, with its own input variable."""
+    mutation, variables = build_batch_mutation(
+        [
+            _Operation(LOG_MESSAGE, {"priority": "INFO", "message": "hello"}),
+            _Operation(ADD_OUTPUT, {"uri": "gs://bucket/file.csv", "type": "file", "name": "file.csv"}),
+        ]
+    )
+
+    assert mutation.startswith("mutation batch($input0: LogPipelineMessageInput!, $input1: AddPipelineOutputInput!)")
+    assert "op0: logPipelineMessage(input: $input0) { success errors }" in mutation
+    assert "op1: addPipelineOutput(input: $input1) { success errors }" in mutation
+    assert variables == {
+        "input0": {"priority": "INFO", "message": "hello"},
+        "input1": {"uri": "gs://bucket/file.csv", "type": "file", "name": "file.csv"},
+    }
+
+
+class GatedGraphQL:
+    """Fake graphql() function blocking on its first call until the gate is opened, recording the batches."""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+        self.batches = []
+
+    def __call__(self, mutation, variables):
+        self.entered.set()
+        self.gate.wait(5)
+        self.batches.append(list(variables.values()))
+        return {f"op{i}": {"success": True, "errors": [f"op{i}"]} for i in range(len(variables))}
+
+
+def test_dispatcher_batches_operations():
+    """Operations queued while a batch is being sent are sent together, keeping only the last progress update."""
+    fake_graphql = GatedGraphQL()
+    dispatcher = TelemetryDispatcher()
+    with patch("openhexa.sdk.pipelines.telemetry.graphql", fake_graphql):
+        dispatcher.start()
+        dispatcher.log_message("INFO", "first")
+        assert fake_graphql.entered.wait(5)
+        for i in range(3):
+            dispatcher.log_message("INFO", f"message {i}")
+        dispatcher.update_progress(10)
+        dispatcher.update_progress(20)
+        fake_graphql.gate.set()
+        dispatcher.stop()
+
+    assert fake_graphql.batches == [
+        [{"priority": "INFO", "message": "first"}],
+        [
+            {"priority": "INFO", "message": "message 0"},
+            {"priority": "INFO", "message": "message 1"},
+            {"priority": "INFO", "message": "message 2"},
+            {"percent": 20},
+        ],
+    ]
+    assert not dispatcher.active
+
+
+def test_dispatcher_call_waits_for_result():
+    """Operations sent with call() are sent along with the pending operations, and their result is returned."""
+    fake_graphql = GatedGraphQL()
+    dispatcher = TelemetryDispatcher()
+    with patch("openhexa.sdk.pipelines.telemetry.graphql", fake_graphql):
+        dispatcher.start()
+        dispatcher.log_message("INFO", "first")
+        assert fake_graphql.entered.wait(5)
+        dispatcher.log_message("INFO", "before output")
+        threading.Timer(0.1, fake_graphql.gate.set).start()
+        result = dispatcher.call(ADD_OUTPUT, {"uri": "gs://bucket/file.csv", "type": "file", "name": "file.csv"})
+        dispatcher.stop()
+
+    assert result == {"success": True, "errors": ["op1"]}
+    assert fake_graphql.batches[1] == [
+        {"priority": "INFO", "message": "before output"},
+        {"uri": "gs://bucket/file.csv", "type": "file", "name": "file.csv"},
+    ]
+
+
+@patch("openhexa.sdk.pipelines.telemetry.graphql", side_effect=Exception("unreachable"))
+def test_dispatcher_failures_do_not_raise(mock_graphql, capsys):
+    """Failing to send log messages does not interrupt the pipeline, but outputs report the error."""
+    dispatcher = TelemetryDispatcher()
+    dispatcher.start()
+    try:
+        dispatcher.log_message("INFO", "lost")
+        dispatcher.flush()
+        with pytest.raises(Exception, match="unreachable"):
+            dispatcher.call(ADD_OUTPUT, {"uri": "gs://bucket/file.csv", "type": "file", "name": "file.csv"})
+    finally:
+        dispatcher.stop()
+
+    assert "Failed to send 1 telemetry operation(s): unreachable" in capsys.readouterr().out
+
+
+@patch.object(CurrentRun, "_connected", True)
+@patch("openhexa.sdk.pipelines.run.graphql")
+@patch("openhexa.sdk.pipelines.telemetry.graphql")
+def test_current_run_logs_through_dispatcher(mock_telemetry_graphql, mock_graphql):
+    """During a run, log messages are queued instead of being sent on the caller's thread."""
+    dispatcher = TelemetryDispatcher()
+    with patch("openhexa.sdk.pipelines.run.telemetry", dispatcher):
+        dispatcher.start()
+        current_run = CurrentRun()
+        for i in range(10):
+            current_run.log_info(f"message {i}")
+        dispatcher.stop()
+
+    mock_graphql.assert_not_called()
+    sent = [variable for call in mock_telemetry_graphql.call_args_list for variable in call.args[1].values()]
+    assert sent == [{"priority": "INFO", "message": f"message {i}"} for i in range(10)]
@@ -0,0 +1,143 @@
+"""Task result transport test module."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from openhexa.sdk.pipelines.pipeline import Pipeline
+from openhexa.sdk.pipelines.transport import ResultTransport, SpilledResult, load_result
+
+
+def test_small_results_are_not_spilled(tmp_path):
+    """Results below the threshold, or with an unsupported type, are returned as is."""
+    transport = ResultTransport(str(tmp_path / "results"), threshold=10)
+
+    assert transport.dump(b"small") == b"small"
+    assert transport.dump({"a": "dict"}) == {"a": "dict"}
+    assert not (tmp_path / "results").exists()
+
+
+def test_bytes_results_are_spilled(tmp_path):
+    """Large bytes results are spilled, loaded back, and removed on cleanup."""
+    transport = ResultTransport(str(tmp_path / "results"), threshold=10)
+
+    handle = transport.dump(b"x" * 100)
+    assert isinstance(handle, SpilledResult)
+    assert handle.size == 100
+    assert load_result(handle) == b"x" * 100
+
+    handle = transport.dump(bytearray(b"y" * 100))
+    assert load_result(handle) == bytearray(b"y" * 100)
+    assert isinstance(load_result(handle), bytearray)
+
+    transport.cleanup()
+    assert not (tmp_path / "results").exists()
+
+
+def test_ndarray_results_are_spilled(tmp_path):
+    """Large numpy arrays are spilled and memory-mapped in copy-on-write mode."""
+    np = pytest.importorskip("numpy")
+    transport = ResultTransport(str(tmp_path / "results"), threshold=10)
+
+    array = np.arange(100, dtype="int64")
+    handle = transport.dump(array)
+    assert isinstance(handle, SpilledResult)
+
+    loaded = load_result(handle)
+    np.testing.assert_array_equal(loaded, array)
+    loaded[0] = 42  # copy-on-write: the spill file is left untouched
+    np.testing.assert_array_equal(load_result(handle), array)
+
+    in_memory = load_result(handle, mmap=False)
+    assert not isinstance(in_memory, np.memmap)
+    np.testing.assert_array_equal(in_memory, array)
+
+
+def test_dataframe_results_are_spilled(tmp_path):
+    """Large data frames are spilled as Arrow IPC files."""
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    transport = ResultTransport(str(tmp_path / "results"), threshold=10)
+
+    df = pd.DataFrame({"a": range(100), "b": [str(i) for i in range(100)]})
+    handle = transport.dump(df)
+    assert isinstance(handle, SpilledResult)
+    pd.testing.assert_frame_equal(load_result(handle), df)
+    pd.testing.assert_frame_equal(load_result(handle, mmap=False), df)
+
+
+def test_unsupported_dataframes_are_not_spilled(tmp_path):
+    """Data frames that Arrow cannot convert, and subclasses of supported types, are returned as is."""
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    transport = ResultTransport(str(tmp_path / "results"), threshold=10)
+
+    class SubDataFrame(pd.DataFrame):
+        pass
+
+    mixed = pd.DataFrame({"a": [1, "x"] * 50})
+    assert transport.dump(mixed) is mixed
+    subclass = SubDataFrame({"a": range(100)})
+    assert transport.dump(subclass) is subclass
+    assert not (tmp_path / "results").exists() or list((tmp_path / "results").iterdir()) == []
+
+
+def test_pipeline_run_spills_large_results(tmp_path):
+    """Large results go through spill files between worker processes, and are cleaned up at the end of the run."""
+
+    def pipeline_func():
+        task_b(task_a())
+
+    pipeline = Pipeline("pipeline", pipeline_func, [])
+
+    @pipeline.task
+    def task_a():
+        return b"x" * 1000
+
+    @pipeline.task
+    def task_b(data):
+        return len(data)
+
+    with patch.dict(os.environ, {"WORKSPACE_TMP_PATH": str(tmp_path), "HEXA_TASK_RESULT_SPILL_THRESHOLD": "100"}):
+        pipeline.run({})
+
+    # Spilled results are loaded back before the spill files are removed
+    assert pipeline.tasks[0].result == b"x" * 1000
+    assert pipeline.tasks[1].result == 1000
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_pipeline_run_spills_large_inputs_of_process_tasks(tmp_path):
+    """Large results of thread tasks are spilled in the main process before being sent to worker processes."""
+
+    def pipeline_func():
+        task_b(task_a())
+
+    pipeline = Pipeline("pipeline", pipeline_func, [])
+
+    @pipeline.task(executor="thread")
+    def task_a():
+        return b"x" * 1000
+
+    @pipeline.task(executor="process")
+    def task_b(data):
+        return len(data)
+
+    dumped = []
+    dump = ResultTransport.dump
+
+    def spy(self, value):
+        result = dump(self, value)
+        dumped.append((value, result))
+        return result
+
+    with (
+        patch.dict(os.environ, {"WORKSPACE_TMP_PATH": str(tmp_path), "HEXA_TASK_RESULT_SPILL_THRESHOLD": "100"}),
+        patch.object(ResultTransport, "dump", spy),
+    ):
+        pipeline.run({})
+
+    assert pipeline.tasks[0].result == b"x" * 1000
+    assert pipeline.tasks[1].result == 1000
+    assert any(value == b"x" * 1000 and isinstance(result, SpilledResult) for value, result in dumped)
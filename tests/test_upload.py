@@ -0,0 +1,163 @@
+"""Dataset file uploads test module."""
+
+import base64
+import hashlib
+import io
+from unittest.mock import patch
+
+import pytest
+from httmock import HTTMock, all_requests, response
+
+from openhexa.sdk.datasets.upload import ChecksumMismatchError, upload
+
+GCS_URL = "https://storage.googleapis.com/bucket/file.csv?X-Goog-SignedHeaders=host&X-Goog-Signature=abc"
+GCS_RESUMABLE_URL = (
+    "https://storage.googleapis.com/bucket/file.csv?X-Goog-SignedHeaders=host%3Bx-goog-resumable&X-Goog-Signature=abc"
+)
+SESSION_URL = "https://storage.googleapis.com/upload/session-1"
+
+
+def _md5(data: bytes) -> str:
+    return hashlib.md5(data).hexdigest()
+
+
+def test_single_upload_streams_chunks():
+    """Files are streamed by chunks, with progress reports, and their checksum is verified against the ETag."""
+    content = b"0123456789" * 10
+    received = []
+
+    @all_requests
+    def storage(url, request):
+        assert request.headers["Content-Length"] == "100"
+        received.append(b"".join(request.body))
+        return response(200, headers={"ETag": f'"{_md5(content)}"'})
+
+    progress = []
+    with HTTMock(storage):
+        sent = upload(
+            "https://s3.test/file",
+            io.BytesIO(content),
+            "text/csv",
+            chunk_size=30,
+            checksum="md5",
+            progress=lambda *a: progress.append(a),
+        )
+
+    assert sent == 100
+    assert received == [content]
+    assert progress == [(30, 100), (60, 100), (90, 100), (100, 100)]
+
+
+def test_single_upload_checksum_mismatch():
+    """A checksum that does not match the one of the stored object is an error."""
+
+    @all_requests
+    def storage(url, request):
+        b"".join(request.body)
+        return response(200, headers={"ETag": f'"{_md5(b"other")}"'})
+
+    with HTTMock(storage), pytest.raises(ChecksumMismatchError):
+        upload("https://s3.test/file", io.BytesIO(b"content"), "text/csv", checksum="md5")
+
+
+@patch("openhexa.sdk.datasets.upload.RETRY_BACKOFF", 0)
+def test_single_upload_retries_from_start():
+    """Transient failures are retried, sending the file again from the start."""
+    received = []
+
+    @all_requests
+    def storage(url, request):
+        received.append(b"".join(request.body))
+        return response(503 if len(received) == 1 else 200)
+
+    source = io.BytesIO(b"header,content")
+    source.seek(7)
+    with HTTMock(storage):
+        assert upload("https://s3.test/file", source, "text/csv", chunk_size=4) == 7
+
+    assert received == [b"content", b"content"]
+
+
+@patch("openhexa.sdk.datasets.upload.RETRY_BACKOFF", 0)
+@patch("openhexa.sdk.datasets.upload.RESUMABLE_CHUNK_ALIGNMENT", 4)
+def test_resumable_upload_resumes_from_persisted_offset():
+    """Large files uploaded to URLs signed for resumable sessions are resumed from the persisted offset after a failure."""
+    content = b"abcdefghijklmnopqrstuvwxyz"
+    stored = bytearray()
+    requests = []
+
+    @all_requests
+    def gcs(url, request):
+        if request.method == "POST":
+            assert request.headers["x-goog-resumable"] == "start"
+            return response(201, headers={"Location": SESSION_URL})
+
+        content_range = request.headers["Content-Range"]
+        requests.append(content_range)
+        if content_range == "bytes 8-15/26":
+            # Only the first half of the chunk is persisted before the connection is lost
+            stored.extend(request.body[:4])
+            return response(503)
+        if not content_range.startswith("bytes */"):
+            start = int(content_range.split(" ")[1].split("-")[0])
+            assert start == len(stored)
+            stored.extend(request.body)
+        if len(stored) == len(content):
+            return response(
+                200, headers={"x-goog-hash": f"md5={base64.b64encode(hashlib.md5(stored).digest()).decode()}"}
+            )
+        return response(308, headers={"Range": f"bytes=0-{len(stored) - 1}"})
+
+    progress = []
+    with HTTMock(gcs):
+        sent = upload(
+            GCS_RESUMABLE_URL,
+            io.BytesIO(content),
+            "text/csv",
+            chunk_size=9,
+            checksum="md5",
+            progress=lambda *a: progress.append(a),
+        )
+
+    assert sent == 26
+    assert bytes(stored) == content
+    assert requests == ["bytes 0-7/26", "bytes 8-15/26", "bytes */26", "bytes 12-19/26", "bytes 20-25/26"]
+    assert progress == [(8, 26), (12, 26), (20, 26), (26, 26)]
+
+
+def test_large_upload_to_put_url_is_single_upload():
+    """Large files uploaded to URLs signed for PUT requests are sent by a single streamed PUT, without a POST first."""
+    methods = []
+    received = []
+
+    @all_requests
+    def gcs(url, request):
+        methods.append(request.method)
+        received.append(b"".join(request.body))
+        return response(200)
+
+    with HTTMock(gcs):
+        assert upload(GCS_URL, io.BytesIO(b"x" * 100), "text/csv", chunk_size=10) == 100
+
+    assert methods == ["PUT"]
+    assert received == [b"x" * 100]
+
+
+def test_resumable_upload_falls_back_to_single_upload():
+    """Upload URLs whose resumable session cannot be started are used for a single streamed upload."""
+    methods = []
+    received = []
+
+    @all_requests
+    def gcs(url, request):
+        methods.append(request.method)
+        if request.method == "POST":
+            return response(403)
+        received.append(b"".join(request.body))
+        return response(200)
+
+    with HTTMock(gcs):
+        assert upload(GCS_RESUMABLE_URL, io.BytesIO(b"x" * 100), "text/csv", chunk_size=10) == 100
+
+    assert methods == ["POST", "PUT"]
+    assert received == [b"x" * 100]